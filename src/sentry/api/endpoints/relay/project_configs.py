@@ -21,6 +21,10 @@ logger = logging.getLogger(__name__)
 PROJECT_CONFIG_SIZE_THRESHOLD = 10000
 
 
+def _is_unchanged(config, revision):
+    return revision is not None and isinstance(config, dict) and config.get("revision") == revision
+
+
 def _sample_apm():
     return random.random() < getattr(settings, "SENTRY_RELAY_ENDPOINT_APM_SAMPLING", 0)
 
@@ -102,19 +106,33 @@ class RelayProjectConfigsEndpoint(Endpoint):
 
     def _post_or_schedule_by_key(self, request: Request):
         public_keys = set(request.relay_request_data.get("publicKeys") or ())
+        # Revisions of the configs the Relay already has. Configs that did not
+        # change since are listed as unchanged instead of being sent again.
+        revisions = request.relay_request_data.get("revisions")
+        if revisions is not None and not (
+            isinstance(revisions, dict)
+            and all(isinstance(k, str) and isinstance(v, str) for k, v in revisions.items())
+        ):
+            return Response("Revisions must map public keys to revision strings.", 400)
 
         proj_configs = {}
         pending = []
+        unchanged = []
         for key in public_keys:
             computed = self._get_cached_or_schedule(key)
             if not computed:
                 pending.append(key)
+            elif revisions and _is_unchanged(computed, revisions.get(key)):
+                unchanged.append(key)
             else:
                 proj_configs[key] = computed
 
         metrics.incr("relay.project_configs.post_v3.pending", amount=len(pending))
         metrics.incr("relay.project_configs.post_v3.fetched", amount=len(proj_configs))
         res = {"configs": proj_configs, "pending": pending}
+        if revisions is not None:
+            metrics.incr("relay.project_configs.post_v3.unchanged", amount=len(unchanged))
+            res["unchanged"] = unchanged
 
         return Response(res, status=200)
 
@@ -8,6 +8,7 @@ from rest_framework.response import Response
 
 from sentry import eventstream
 from sentry.api.base import audit_logger
+from sentry.grouping import grouphash_cache
 from sentry.models import Group, GroupHash, GroupInbox, GroupStatus, Project
 from sentry.signals import issue_deleted
 from sentry.tasks.deletion import delete_groups as delete_groups_task
@@ -40,6 +41,12 @@ def delete_group_list(
     eventstream_state = eventstream.start_delete_groups(project.id, group_ids)
     transaction_id = uuid4().hex
 
+    hashes = list(
+        GroupHash.objects.filter(project_id=project.id, group__id__in=group_ids).values_list(
+            "hash", flat=True
+        )
+    )
+
     # We do not want to delete split hashes as they are necessary for keeping groups... split.
     GroupHash.objects.filter(
         project_id=project.id, group__id__in=group_ids, state=GroupHash.State.SPLIT
@@ -47,6 +54,7 @@ def delete_group_list(
     GroupHash.objects.filter(project_id=project.id, group__id__in=group_ids).exclude(
         state=GroupHash.State.SPLIT
     ).delete()
+    grouphash_cache.invalidate_hashes(project.id, hashes)
 
     # We remove `GroupInbox` rows here so that they don't end up influencing queries for
     # `Group` instances that are pending deletion
@@ -15,6 +15,7 @@ from sentry import analytics, eventstream, features
 from sentry.api.serializers import serialize
 from sentry.api.serializers.models.actor import ActorSerializer
 from sentry.db.models.query import create_or_update
+from sentry.grouping import grouphash_cache
 from sentry.models import (
     TOMBSTONE_FIELDS_FROM_GROUP,
     Activity,
@@ -73,6 +74,7 @@ def handle_discard(
 
     # grouped by project_id
     groups_to_delete = defaultdict(list)
+    tombstone_ids = defaultdict(list)
 
     for group in group_list:
         with transaction.atomic():
@@ -92,6 +94,15 @@ def handle_discard(
                 GroupHash.objects.filter(group=group).update(
                     group=None, group_tombstone_id=tombstone.id
                 )
+                tombstone_ids[group.project_id].append(tombstone.id)
+
+    for project_id, project_tombstone_ids in tombstone_ids.items():
+        grouphash_cache.invalidate_hashes(
+            project_id,
+            GroupHash.objects.filter(
+                project_id=project_id, group_tombstone_id__in=project_tombstone_ids
+            ).values_list("hash", flat=True),
+        )
 
     for project in projects:
         delete_group_list(
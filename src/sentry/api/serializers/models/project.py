@@ -147,13 +147,18 @@ def get_features_for_projects(
 
                     batch_checked.add(feature_name)
 
-    for feature_name in project_features:
-        if feature_name in batch_checked:
-            continue
-        abbreviated_feature = feature_name[len(_PROJECT_SCOPE_PREFIX) :]
-        for (organization, projects) in projects_by_org.items():
-            result = features.has_for_batch(feature_name, organization, projects, user)
-            for (project, flag) in result.items():
+    # Check the remaining features with one batch call per handler, which
+    # also memoizes the results for the rest of the request.
+    remaining_features = [
+        feature_name for feature_name in project_features if feature_name not in batch_checked
+    ]
+    for (organization, projects) in projects_by_org.items():
+        result = features.prefetch_for_projects(
+            remaining_features, organization, projects, user, skip_entity=True
+        )
+        for (feature_name, flags) in result.items():
+            abbreviated_feature = feature_name[len(_PROJECT_SCOPE_PREFIX) :]
+            for (project, flag) in flags.items():
                 if flag:
                     features_by_project[project].append(abbreviated_feature)
 
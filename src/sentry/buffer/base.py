@@ -1,9 +1,12 @@
 import logging
 
+from django.db import connections, router
 from django.db.models import F
+from django.db.models.signals import post_save
 
 from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr
+from sentry.utils.dates import to_timestamp
 from sentry.utils.services import Service
 
 
@@ -102,3 +105,114 @@ class Buffer(Service, metaclass=BufferMount):
             created=created,
             sender=model,
         )
+
+    def process_batch(self, updates):
+        """
+        Applies many buffered updates at once. ``updates`` is a list of
+        ``(model, columns, filters, extra, signal_only)`` tuples as passed to
+        ``process``.
+
+        Updates of groups by primary key that touch the same columns are
+        applied with a single ``UPDATE`` statement. Everything else goes
+        through ``process`` one by one.
+        """
+        from sentry.models import Group
+
+        group_updates = {}
+        for model, columns, filters, extra, signal_only in updates:
+            group_id = _get_pk_filter(filters)
+            if model is Group and group_id is not None and not signal_only:
+                key = (tuple(sorted(columns)), tuple(sorted(extra or ())))
+                group_updates.setdefault(key, []).append((group_id, columns, filters, extra))
+            else:
+                # Subclasses override ``process`` to read from their storage,
+                # we want the plain database update here.
+                Buffer.process(self, model, columns, filters, extra, signal_only)
+
+        for (columns, extra_columns), rows in group_updates.items():
+            _update_groups(columns, extra_columns, rows)
+
+            for _, row_columns, filters, extra in rows:
+                buffer_incr_complete.send_robust(
+                    model=Group,
+                    columns=row_columns,
+                    filters=filters,
+                    extra=extra,
+                    created=False,
+                    sender=Group,
+                )
+
+
+def _get_pk_filter(filters):
+    if len(filters) == 1:
+        for key in ("id", "pk"):
+            if key in filters:
+                return filters[key]
+    return None
+
+
+def _get_cast_type(field, connection):
+    # ``db_type`` can't be used for casts, the primary key for example is a
+    # ``serial`` or ``bigserial``. Use the type a foreign key to the field has,
+    # like ``FlexibleForeignKey`` does.
+    if hasattr(field, "get_related_db_type"):
+        return field.get_related_db_type(connection)
+    return field.rel_db_type(connection)
+
+
+def _update_groups(columns, extra_columns, rows):
+    """
+    Applies the same kind of update ``Buffer.process`` does for a group to
+    many groups, with one ``UPDATE ... FROM (VALUES ...)`` statement.
+    """
+    from sentry.models import Group
+
+    if not columns and not extra_columns:
+        return
+
+    using = router.db_for_write(Group)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    fields = [Group._meta.get_field(c) for c in columns + extra_columns]
+    set_clauses = [
+        f"{qn(f.column)} = g.{qn(f.column)} + v.{qn(f.column)}" for f in fields[: len(columns)]
+    ]
+    set_clauses += [f"{qn(f.column)} = v.{qn(f.column)}" for f in fields[len(columns) :]]
+    value_columns = [qn(Group._meta.pk.column)] + [qn(f.column) for f in fields]
+    value_types = [_get_cast_type(f, connection) for f in [Group._meta.pk] + fields]
+
+    # See ``ScoreClause``, the score is calculated from the old times_seen
+    # plus the increment, and the new last_seen.
+    with_score = "times_seen" in columns and "last_seen" in extra_columns
+    if with_score:
+        set_clauses.append(
+            f"{qn('score')} = log(g.{qn('times_seen')} + v.{qn('times_seen')}) * 600 + v.score_ts"
+        )
+        value_columns.append("score_ts")
+        value_types.append("integer")
+
+    params = []
+    for group_id, row_columns, _, extra in rows:
+        params.append(group_id)
+        params.extend(row_columns[c] for c in columns)
+        params.extend(f.get_db_prep_save(extra[f.name], connection) for f in fields[len(columns) :])
+        if with_score:
+            params.append(int(to_timestamp(extra["last_seen"])))
+
+    pk = qn(Group._meta.pk.column)
+    row_sql = "(%s)" % ", ".join(f"%s::{t}" for t in value_types)
+    sql = (
+        f"UPDATE {qn(Group._meta.db_table)} AS g SET {', '.join(set_clauses)} "
+        f"FROM (VALUES {', '.join([row_sql] * len(rows))}) AS v({', '.join(value_columns)}) "
+        f"WHERE g.{pk} = v.{pk} RETURNING g.{pk}"
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        updated_ids = [row[0] for row in cursor.fetchall()]
+
+    # ``Group.update`` sends ``post_save`` for the cache and receivers.
+    # Groups deleted in the meantime are skipped like in ``process``.
+    for group in Group.objects.using(using).filter(id__in=updated_ids):
+        post_save.send(sender=Group, instance=group, created=False)
@@ -7,6 +7,7 @@ from django.db import models
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
 
+from sentry import options
 from sentry.buffer import Buffer
 from sentry.exceptions import InvalidConfiguration
 from sentry.tasks.process_buffer import process_incr, process_pending
@@ -50,13 +51,18 @@ class PendingBuffer:
 class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
+    # Bulk flushes stop picking up new batches after this many seconds, so
+    # they finish before the pending lock (60 seconds) expires.
+    bulk_flush_timeout = 45
 
-    def __init__(self, pending_partitions=1, incr_batch_size=2, **options):
+    def __init__(self, pending_partitions=1, incr_batch_size=2, bulk_batch_size=500, **options):
         self.cluster, options = get_cluster_from_options("SENTRY_BUFFER_OPTIONS", options)
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
+        self.bulk_batch_size = bulk_batch_size
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
+        assert self.bulk_batch_size > 0
 
     def validate(self):
         try:
@@ -229,6 +235,13 @@ class RedisBuffer(Buffer):
         if not client.set(lock_key, "1", nx=True, ex=60):
             return
 
+        if options.get("buffer.redis.bulk-flush"):
+            try:
+                self._process_pending_bulk(pending_key)
+            finally:
+                client.delete(lock_key)
+            return
+
         pending_buffer = PendingBuffer(self.incr_batch_size)
 
         try:
@@ -265,6 +278,96 @@ class RedisBuffer(Buffer):
         for key in batch_keys:
             self._process_single_incr(key)
 
+    def _process_pending_bulk(self, pending_key):
+        """
+        Flushes all keys of a pending buffer in batches of
+        ``bulk_batch_size``, under the lock of the pending buffer, instead of
+        spawning ``process_incr`` tasks. Keys that were not flushed before
+        ``bulk_flush_timeout`` stay pending for the next run.
+        """
+        deadline = time() + self.bulk_flush_timeout
+        keycount = 0
+
+        with self.cluster.all() as conn:
+            results = conn.zrange(pending_key, 0, -1)
+
+        for host_id, keys in results.value.items():
+            keys = [key.decode("utf-8") for key in keys]
+            for i in range(0, len(keys), self.bulk_batch_size):
+                if time() > deadline:
+                    metrics.incr("buffer.bulk-flush.timeout", skip_internal=False)
+                    break
+                batch_keys = keys[i : i + self.bulk_batch_size]
+                self._process_batch(host_id, pending_key, batch_keys)
+                keycount += len(batch_keys)
+
+        metrics.timing("buffer.pending-size", keycount)
+
+    def _process_batch(self, host_id, pending_key, keys):
+        # All keys of a pending buffer live on the same host as the pending
+        # buffer itself, so they can be read and removed in one transaction.
+        conn = self.cluster.get_local_client(host_id)
+        pipe = conn.pipeline()
+        for key in keys:
+            pipe.hgetall(key)
+        pipe.zrem(pending_key, *keys)
+        pipe.delete(*keys)
+        results = pipe.execute()[: len(keys)]
+
+        updates = []
+        for key, values in zip(keys, results):
+            update = self._load_buffered_values(values)
+            if update is None:
+                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+                self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+                continue
+            updates.append(update)
+
+        metrics.timing("buffer.bulk-flush.batch-size", len(updates))
+        super().process_batch(updates)
+
+    def _load_buffered_values(self, values):
+        """
+        Turns the hash of a buffered key into the ``(model, columns, filters,
+        extra, signal_only)`` arguments of ``Buffer.process``. Returns
+        ``None`` for empty hashes.
+        """
+        # XXX(python3): In python2 this isn't as important since redis will
+        # return string tyes (be it, byte strings), but in py3 we get bytes
+        # back, and really we just want to deal with keys as strings.
+        values = {force_text(k): v for k, v in values.items()}
+
+        if not values:
+            return None
+
+        # XXX(py3): Note that ``import_string`` explicitly wants a str in
+        # python2, so we'll decode (for python3) and then translate back to
+        # a byte string (in python2) for import_string.
+        model = import_string(str(values.pop("m").decode("utf-8")))
+
+        if values["f"].startswith(b"{"):
+            filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(values.pop("f"))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"["):
+                    extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(v)
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
+
     def _process_single_incr(self, key):
         client = self.cluster.get_routing_client()
         lock_key = self._make_lock_key(key)
@@ -285,42 +388,12 @@ class RedisBuffer(Buffer):
             pipe.delete(key)
             values = pipe.execute()[0]
 
-            # XXX(python3): In python2 this isn't as important since redis will
-            # return string tyes (be it, byte strings), but in py3 we get bytes
-            # back, and really we just want to deal with keys as strings.
-            values = {force_text(k): v for k, v in values.items()}
-
-            if not values:
+            update = self._load_buffered_values(values)
+            if update is None:
                 metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
                 self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
                 return
 
-            # XXX(py3): Note that ``import_string`` explicitly wants a str in
-            # python2, so we'll decode (for python3) and then translate back to
-            # a byte string (in python2) for import_string.
-            model = import_string(str(values.pop("m").decode("utf-8")))
-
-            if values["f"].startswith(b"{"):
-                filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            super().process(model, incr_values, filters, extra_values, signal_only)
+            super().process(*update)
         finally:
             client.delete(lock_key)
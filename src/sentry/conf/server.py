@@ -1408,6 +1408,13 @@ SENTRY_DEFAULT_MAX_EVENTS_PER_MINUTE = "90%"
 SENTRY_SNUBA = os.environ.get("SNUBA", "http://127.0.0.1:1218")
 SENTRY_SNUBA_TIMEOUT = 30
 SENTRY_SNUBA_CACHE_TTL_SECONDS = 60
+# Results of the Snuba query cache are served for this long past their TTL,
+# while a single caller runs the query again to refresh them.
+SENTRY_SNUBA_CACHE_STALE_SECONDS = 0
+# Callers that miss the Snuba query cache wait up to this long for another
+# caller that is running the same query, instead of running it as well. 0
+# disables the coalescing of queries.
+SENTRY_SNUBA_CACHE_COALESCE_TIMEOUT_SECONDS = 0
 
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
@@ -1456,6 +1463,9 @@ SENTRY_METRICS_SKIP_INTERNAL_PREFIXES = []  # Order this by most frequent prefix
 SENTRY_METRICS_INDEXER = "sentry.sentry_metrics.indexer.postgres_v2.StaticStringsIndexerDecorator"
 SENTRY_METRICS_INDEXER_OPTIONS = {}
 SENTRY_METRICS_INDEXER_CACHE_TTL = 3600 * 2
+# The number of strings per use case the indexer keeps in an in-process cache
+# in front of the shared cache. The in-process cache is disabled if 0.
+SENTRY_METRICS_INDEXER_LOCAL_CACHE_SIZE = 0
 
 # Release Health
 SENTRY_RELEASE_HEALTH = "sentry.release_health.sessions.SessionsReleaseHealthBackend"
@@ -1511,6 +1521,14 @@ SENTRY_SOURCE_FETCH_SOCKET_TIMEOUT = 2
 # Maximum content length for source files before we abort fetching
 SENTRY_SOURCE_FETCH_MAX_SIZE = 40 * 1024 * 1024
 
+# Number of source files and sourcemaps that are fetched concurrently, in total
+# and per host, if the sourcemaps.concurrent-fetch-enabled option is set
+SENTRY_SOURCE_FETCH_CONCURRENCY = 8
+SENTRY_SOURCE_FETCH_CONCURRENCY_PER_HOST = 4
+
+# Timeout (in seconds) shared by all concurrent fetches for the sources of an event
+SENTRY_SOURCE_FETCH_CONCURRENT_TIMEOUT = 20
+
 # Maximum content length for cache value.  Currently used only to avoid
 # pointless compression of sourcemaps and other release files because we
 # silently fail to cache the compressed result anyway.  Defaults to None which
@@ -1750,6 +1768,16 @@ SENTRY_TEAM_ROLES = (
 SENTRY_OPTIONS = {}
 SENTRY_DEFAULT_OPTIONS = {}
 
+# Serve options from a per-process snapshot of all stored options, which is
+# reloaded when the stored options change. This is how often, in seconds, the
+# version of the stored options is checked. 0 disables snapshots.
+SENTRY_OPTIONS_SNAPSHOT_INTERVAL = 0
+
+# Redis connection (``redis.StrictRedis`` arguments) used to notify processes
+# about changed options, so that they reload their snapshot right away.
+SENTRY_OPTIONS_PUBSUB = None
+SENTRY_OPTIONS_PUBSUB_CHANNEL = "sentry-options"
+
 # You should not change this setting after your database has been created
 # unless you have altered all schemas first
 SENTRY_USE_BIG_INTS = False
@@ -2602,6 +2630,14 @@ SENTRY_REALTIME_METRICS_OPTIONS = {
     "backoff_timer": 5 * 60,
 }
 
+# Which cluster is used for the (project, hash) -> group cache used when saving
+# events, see sentry.grouping.grouphash_cache.
+SENTRY_GROUPHASH_CACHE_REDIS_CLUSTER = "default"
+
+# Which cluster is used for the Redis tier of the calculated hashes cache, see
+# sentry.grouping.hash_cache.
+SENTRY_GROUPING_HASH_CACHE_REDIS_CLUSTER = "default"
+
 # XXX(meredith): Temporary metrics indexer
 SENTRY_METRICS_INDEXER_REDIS_CLUSTER = "default"
 
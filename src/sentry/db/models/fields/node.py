@@ -1,15 +1,20 @@
 import logging
 import pickle
+import threading
+import weakref
 from base64 import b64encode
 from collections.abc import MutableMapping
 from uuid import uuid4
 
+from django.core.signals import request_finished
 from django.db.models.signals import post_delete
 
 from sentry import nodestore
 from sentry.db.models.utils import Creator
+from sentry.nodestore.base import LazyNodePayload
+from sentry.utils import metrics
 from sentry.utils.cache import memoize
-from sentry.utils.canonical import CANONICAL_TYPES, CanonicalKeyDict
+from sentry.utils.canonical import CANONICAL_TYPES, CanonicalKeyDict, CanonicalKeyView
 from sentry.utils.strings import compress, decompress
 
 from .gzippeddict import GzippedDictField
@@ -19,10 +24,75 @@ __all__ = ("NodeField", "NodeData")
 logger = logging.getLogger("sentry")
 
 
+# Upper bound for the number of unfetched nodes remembered per request.
+MAX_PENDING_NODES = 1000
+
+_pending = threading.local()
+
+
 class NodeIntegrityFailure(Exception):
     pass
 
 
+def _is_request_batching_enabled():
+    from sentry import options
+    from sentry.app import env
+
+    return env.request is not None and options.get("nodestore.request-batching-enabled")
+
+
+def _is_lazy_decode_enabled():
+    from sentry import options
+
+    return options.get("nodestore.lazy-decode")
+
+
+def _get_pending_nodes():
+    if not hasattr(_pending, "nodes"):
+        _pending.nodes = []
+    return _pending.nodes
+
+
+def _register_pending_node(node):
+    """
+    Remember an unfetched node for the current request, so that the first
+    access to any of them can fetch all of them with a single ``get_multi``.
+    """
+    if not _is_request_batching_enabled():
+        return
+
+    nodes = _get_pending_nodes()
+    if len(nodes) < MAX_PENDING_NODES:
+        nodes.append(weakref.ref(node))
+
+
+def _fetch_pending_nodes(node, lazy=False):
+    """
+    Fetch ``node`` together with all other unfetched nodes of the current
+    request and bind the results.
+    """
+    nodes = [node]
+    for ref in _get_pending_nodes():
+        pending = ref()
+        if pending is not None and pending is not node and pending._node_data is None:
+            nodes.append(pending)
+    _pending.nodes = []
+
+    node_ids = list({n.id for n in nodes})
+    metrics.timing("nodestore.request_batch.size", len(node_ids))
+    node_results = nodestore.get_multi(node_ids, lazy=lazy)
+
+    for n in nodes:
+        n._bind_fetched(node_results.get(n.id))
+
+
+def clear_pending_nodes(**kwargs):
+    _pending.nodes = []
+
+
+request_finished.connect(clear_pending_nodes)
+
+
 class NodeData(MutableMapping):
     """
     A wrapper for nodestore data that fetches the underlying data
@@ -31,6 +101,11 @@ class NodeData(MutableMapping):
     Initializing with:
     data=None means, this is a node that needs to be fetched from nodestore.
     data={...} means, this is an object that should be saved to nodestore.
+
+    With ``nodestore.lazy-decode``, reading single keys of an unfetched node
+    that is stored in the framed layout only decodes those keys. Such reads
+    see the payload as it was stored and skip the ``wrapper``, except for
+    key canonicalization. Any other access loads the full node.
     """
 
     def __init__(self, id, data=None, wrapper=None, ref_version=None, ref_func=None):
@@ -45,9 +120,18 @@ class NodeData(MutableMapping):
         if data is not None and self.wrapper is not None:
             data = self.wrapper(data)
         self._node_data = data
+        self._lazy_node_data = None
+        self._lazy_view = None
+        if data is None and id:
+            _register_pending_node(self)
 
     def __getstate__(self):
+        if self._lazy_node_data is not None:
+            # Load the full node, the lazy view cannot be pickled.
+            self.data
         data = dict(self.__dict__)
+        data.pop("_lazy_node_data", None)
+        data.pop("_lazy_view", None)
         # downgrade this into a normal dict in case it's a shim dict.
         # This is needed as older workers might not know about newer
         # collection types.  For instance we have events where this is a
@@ -63,11 +147,22 @@ class NodeData(MutableMapping):
         state.pop("data", None)
         if state.pop("_node_data_CANONICAL", False):
             state["_node_data"] = CanonicalKeyDict(state["_node_data"])
+        state.setdefault("_lazy_node_data", None)
+        state.setdefault("_lazy_view", None)
         self.__dict__ = state
 
     def __getitem__(self, key):
+        lazy_view = self._get_lazy_view()
+        if lazy_view is not None:
+            return lazy_view[key]
         return self.data[key]
 
+    def __contains__(self, key):
+        lazy_view = self._get_lazy_view()
+        if lazy_view is not None:
+            return key in lazy_view
+        return key in self.data
+
     def __setitem__(self, key, value):
         self.data[key] = value
 
@@ -100,11 +195,16 @@ class NodeData(MutableMapping):
         Get the current data object, fetching from nodestore if necessary.
         """
 
-        if self._node_data is not None:
-            return self._node_data
+        if self._node_data is None and self.id:
+            if self._lazy_node_data is None:
+                self._fetch()
 
-        elif self.id:
-            self.bind_data(nodestore.get(self.id) or {})
+            if self._lazy_node_data is not None:
+                payload = self._lazy_node_data
+                self._lazy_node_data = self._lazy_view = None
+                self.bind_data(payload.to_dict())
+
+        if self._node_data is not None:
             return self._node_data
 
         rv = {}
@@ -112,6 +212,43 @@ class NodeData(MutableMapping):
             rv = self.wrapper(rv)
         return rv
 
+    def _supports_lazy_data(self):
+        return self.wrapper is None or (
+            isinstance(self.wrapper, type) and issubclass(self.wrapper, CanonicalKeyDict)
+        )
+
+    def _get_lazy_view(self):
+        """
+        Return a read-only view of an unfetched node that decodes keys on
+        access, or ``None`` if the full node has to be loaded instead.
+        """
+        if self._node_data is not None or not self.id:
+            return None
+
+        if self._lazy_node_data is None:
+            if not _is_lazy_decode_enabled() or not self._supports_lazy_data():
+                return None
+            self._fetch(lazy=True)
+
+        return self._lazy_view
+
+    def _fetch(self, lazy=False):
+        if _is_request_batching_enabled():
+            _fetch_pending_nodes(self, lazy=lazy)
+        else:
+            self._bind_fetched(nodestore.get(self.id, lazy=lazy))
+
+    def _bind_fetched(self, payload):
+        if isinstance(payload, LazyNodePayload):
+            if self._supports_lazy_data():
+                self.ref = payload.get("_ref")
+                self._lazy_node_data = payload
+                self._lazy_view = CanonicalKeyView(payload) if self.wrapper is not None else payload
+                return
+            payload = payload.to_dict()
+
+        self.bind_data(payload or {})
+
     def bind_data(self, data, ref=None):
         self.ref = data.pop("_ref", ref)
         ref_version = data.pop("_ref_version", None)
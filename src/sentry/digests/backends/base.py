@@ -58,7 +58,16 @@ class Backend(Service):
     be transitioned to "waiting" instead.)
     """
 
-    __all__ = ("add", "delete", "digest", "enabled", "maintenance", "schedule", "validate")
+    __all__ = (
+        "add",
+        "delete",
+        "digest",
+        "digest_many",
+        "enabled",
+        "maintenance",
+        "schedule",
+        "validate",
+    )
 
     def __init__(self, **options: Any) -> None:
         # The ``minimum_delay`` option defines the default minimum amount of
@@ -168,6 +177,32 @@ class Backend(Service):
         """
         raise NotImplementedError
 
+    def digest_many(self, keys: Mapping[str, Optional[int]]) -> Any:
+        """
+        Extract records from several timelines for processing.
+
+        ``keys`` maps the key of each timeline to its minimum delay (``None``
+        uses the backend default.) This method acts as a context manager like
+        ``digest``. The target of the ``as`` clause is a mapping of timeline
+        key to the records of its digest. Timelines that are not in the "ready"
+        state or that are being digested concurrently are left out of the
+        mapping.
+
+        If the context manager successfully exits, all timelines that are
+        still part of the mapping are closed. Removing a timeline from the
+        mapping preserves its records, as if an exception was raised while
+        processing that timeline on its own::
+
+            with timelines.digest_many({'project:1': None, 'project:2': None}) as digests:
+                for key, records in list(digests.items()):
+                    try:
+                        messages[key] = build_digest_email(records)
+                    except Exception:
+                        del digests[key]
+
+        """
+        raise NotImplementedError
+
     def schedule(
         self, deadline: float, timestamp: Optional[float] = None
     ) -> Optional[Iterable["ScheduleEntry"]]:
@@ -1,14 +1,15 @@
 import logging
 import time
-from contextlib import contextmanager
-from typing import Any, Iterable, Optional, Tuple
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from typing import Any, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 
 from rb.clients import LocalClient
 from redis.exceptions import ResponseError
 
 from sentry.digests import Record, ScheduleEntry
 from sentry.digests.backends.base import Backend, InvalidState
-from sentry.utils.compat import map
+from sentry.utils.locking import UnableToAcquireLock
 from sentry.utils.locking.backends.redis import RedisLockBackend
 from sentry.utils.locking.lock import Lock
 from sentry.utils.locking.manager import LockManager
@@ -187,6 +188,45 @@ class RedisBackend(Backend):
                     exc_info=True,
                 )
 
+    def _decode_digests(
+        self, responses: Mapping[str, Sequence[Any]]
+    ) -> Mapping[str, Tuple[Sequence[Record], Sequence[Record]]]:
+        """
+        Decode the records of several digests with a single codec call.
+
+        Returns all records of each digest (these are removed when the digest
+        is closed) along with the records that still had a value.
+        """
+        values = iter(
+            self.codec.decode_many(
+                [value for response in responses.values() for _, value, _ in response]
+            )
+        )
+
+        results = {}
+        for key, response in responses.items():
+            records = [
+                Record(record_key.decode("utf-8"), next(values), float(timestamp))
+                for record_key, _, timestamp in response
+            ]
+
+            # If the record value is `None`, this means the record data was
+            # missing (it was presumably evicted by Redis) so we don't need to
+            # return it here.
+            filtered_records = [record for record in records if record.value is not None]
+            if len(records) != len(filtered_records):
+                logger.warning(
+                    "Filtered out missing records when fetching digest",
+                    extra={
+                        "key": key,
+                        "record_count": len(records),
+                        "filtered_record_count": len(filtered_records),
+                    },
+                )
+            results[key] = (records, filtered_records)
+
+        return results
+
     @contextmanager
     def digest(
         self, key: str, minimum_delay: Optional[int] = None, timestamp: Optional[float] = None
@@ -218,30 +258,7 @@ class RedisBackend(Backend):
                 else:
                     raise
 
-            records = map(
-                lambda key__value__timestamp: Record(
-                    key__value__timestamp[0].decode("utf-8"),
-                    self.codec.decode(key__value__timestamp[1])
-                    if key__value__timestamp[1] is not None
-                    else None,
-                    float(key__value__timestamp[2]),
-                ),
-                response,
-            )
-
-            # If the record value is `None`, this means the record data was
-            # missing (it was presumably evicted by Redis) so we don't need to
-            # return it here.
-            filtered_records = [record for record in records if record.value is not None]
-            if len(records) != len(filtered_records):
-                logger.warning(
-                    "Filtered out missing records when fetching digest",
-                    extra={
-                        "key": key,
-                        "record_count": len(records),
-                        "filtered_record_count": len(filtered_records),
-                    },
-                )
+            records, filtered_records = self._decode_digests({key: response})[key]
             yield filtered_records
 
             script(
@@ -251,6 +268,76 @@ class RedisBackend(Backend):
                 + [record.key for record in records],
             )
 
+    @contextmanager
+    def digest_many(
+        self, keys: Mapping[str, Optional[int]], timestamp: Optional[float] = None
+    ) -> Any:
+        if timestamp is None:
+            timestamp = time.time()
+
+        router = self.cluster.get_router()
+        with ExitStack() as stack:
+            partitions: MutableMapping[int, List[str]] = defaultdict(list)
+            for key in keys:
+                try:
+                    stack.enter_context(self._get_timeline_lock(key, duration=30).acquire())
+                except UnableToAcquireLock as error:
+                    logger.info(f"Skipped digest of timeline {key} due to error: {error}")
+                    continue
+                partitions[router.get_host_for_key(f"{self.namespace}:t:{key}")].append(key)
+
+            responses: MutableMapping[str, Sequence[Any]] = {}
+            hosts: MutableMapping[str, int] = {}
+            for host, partition_keys in partitions.items():
+                try:
+                    response = script(
+                        self.cluster.get_local_client(host),
+                        ["-"],
+                        [
+                            "DIGEST_OPEN_MANY",
+                            self.namespace,
+                            self.ttl,
+                            timestamp,
+                            self.capacity if self.capacity else -1,
+                        ]
+                        + partition_keys,
+                    )
+                except Exception as error:
+                    logger.error(
+                        f"Failed to open digests on partition {host} due to error: {error}",
+                        exc_info=True,
+                    )
+                    continue
+
+                for key, records in response:
+                    key = key.decode("utf-8")
+                    responses[key] = records
+                    hosts[key] = host
+
+            decoded = self._decode_digests(responses)
+            digests = {key: filtered_records for key, (_, filtered_records) in decoded.items()}
+            yield digests
+
+            arguments: MutableMapping[int, List[Any]] = defaultdict(list)
+            for key in digests:
+                records, _ = decoded[key]
+                minimum_delay = keys[key]
+                arguments[hosts[key]].extend(
+                    [
+                        key,
+                        minimum_delay if minimum_delay is not None else self.minimum_delay,
+                        len(records),
+                    ]
+                    + [record.key for record in records]
+                )
+
+            for host, host_arguments in arguments.items():
+                script(
+                    self.cluster.get_local_client(host),
+                    ["-"],
+                    ["DIGEST_CLOSE_MANY", self.namespace, self.ttl, timestamp] + host_arguments,
+                )
+
     def delete(self, key: str, timestamp: Optional[float] = None) -> None:
         if timestamp is None:
             timestamp = time.time()
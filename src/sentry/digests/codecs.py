@@ -1,6 +1,8 @@
 import pickle
 import zlib
-from typing import Any
+from typing import Any, List, Optional, Sequence
+
+import msgpack
 
 
 class Codec:
@@ -10,6 +12,12 @@ class Codec:
     def decode(self, value: bytes) -> Any:
         raise NotImplementedError
 
+    def decode_many(self, values: Sequence[Optional[bytes]]) -> Sequence[Any]:
+        """
+        Decode a batch of values. Missing values (``None``) are passed through.
+        """
+        return [self.decode(value) if value is not None else None for value in values]
+
 
 class CompressedPickleCodec(Codec):
     def encode(self, value: Any) -> bytes:
@@ -17,3 +25,55 @@ class CompressedPickleCodec(Codec):
 
     def decode(self, value: bytes) -> Any:
         return pickle.loads(zlib.decompress(value))
+
+
+class NotificationReferenceCodec(Codec):
+    """
+    Stores digest notifications as references to their event instead of a
+    pickled copy of it: only the project, event, group and rule ids are
+    written to the timeline.
+
+    Decoding a batch binds the event payloads with a single nodestore request.
+    Records whose event payload is no longer available decode to ``None`` and
+    are treated as missing. Values written by ``CompressedPickleCodec`` are
+    still decoded, so a backend can switch to this codec with records in
+    flight.
+    """
+
+    prefix = b"n1:"
+
+    def __init__(self) -> None:
+        self.fallback = CompressedPickleCodec()
+
+    def encode(self, value: Any) -> bytes:
+        event = value.event
+        return self.prefix + msgpack.packb(
+            [event.project_id, event.event_id, event.group_id, list(value.rules)]
+        )
+
+    def decode(self, value: bytes) -> Any:
+        (notification,) = self.decode_many([value])
+        return notification
+
+    def decode_many(self, values: Sequence[Optional[bytes]]) -> Sequence[Any]:
+        from sentry import eventstore
+        from sentry.digests.notifications import Notification
+        from sentry.eventstore.models import Event
+
+        results: List[Any] = []
+        references = []
+        for value in values:
+            if value is not None and value.startswith(self.prefix):
+                project_id, event_id, group_id, rules = msgpack.unpackb(value[len(self.prefix) :])
+                references.append(len(results))
+                results.append(Notification(Event(project_id, event_id, group_id=group_id), rules))
+            else:
+                results.append(self.fallback.decode(value) if value is not None else None)
+
+        if references:
+            eventstore.bind_nodes([results[i].event for i in references], "data")
+            for i in references:
+                if not results[i].event.data:
+                    results[i] = None
+
+        return results
@@ -33,6 +33,7 @@ from sentry.constants import (
 )
 from sentry.culprit import generate_culprit
 from sentry.eventstore.processing import event_processing_store
+from sentry.grouping import grouphash_cache, hash_cache
 from sentry.grouping.api import (
     BackgroundGroupingConfigLoader,
     GroupingConfigNotFound,
@@ -350,37 +351,254 @@ class EventManager:
 
             return jobs[0]["event"]
 
-        with metrics.timer("event_manager.save.organization.get_from_cache"):
-            project.set_cached_field_value(
-                "organization", Organization.objects.get_from_cache(id=project.organization_id)
+        job = {
+            "data": self._data,
+            "project_id": project_id,
+            "raw": raw,
+            "start_time": start_time,
+            "cache_key": cache_key,
+        }
+
+        save_error_events([job], projects)
+
+        if job.get("hash_discarded") is not None:
+            raise job["hash_discarded"]
+
+        self._data = job["event"].data.data
+
+        return job["event"]
+
+
+@metrics.wraps("event_manager.save_error_events")
+def save_error_events(jobs, projects):
+    """
+    Save a batch of normalized and processed error events. ``jobs`` is a list
+    of dicts with at least ``data``, ``project_id`` and ``start_time`` set,
+    ``projects`` maps every project ID referenced by a job to its ``Project``.
+
+    Postgres lookups that only depend on the project (organization, releases,
+    environments, grouphashes) are resolved once per batch, while grouping and
+    group creation remain per event.
+
+    Events whose hash has been discarded (tombstones, load shedding) are
+    dropped from the batch after their outcome has been tracked. The
+    ``HashDiscarded`` exception is stored on the job under
+    ``hash_discarded``. Returns the jobs that were saved.
+
+    If this raises, jobs without ``aggregated`` set have not changed any
+    group or counter yet and can be saved again from scratch. Jobs with
+    ``aggregated`` set must be passed to ``finish_error_events`` instead,
+    which skips the steps that already ran for them.
+    """
+
+    _set_organization_cache_many(projects)
+
+    for job in jobs:
+        job.setdefault("raw", False)
+        job.setdefault("cache_key", None)
+        job["is_reprocessed"] = is_reprocessed_event(job["data"])
+
+    with sentry_sdk.start_span(op="event_manager.save.pull_out_data"):
+        _pull_out_data(jobs, projects)
+
+    with sentry_sdk.start_span(op="event_manager.save.get_or_create_release_many"):
+        _get_or_create_release_many(jobs, projects)
+
+    with sentry_sdk.start_span(op="event_manager.save.get_event_user_many"):
+        _get_event_user_many(jobs, projects)
+
+    _get_project_key_many(jobs)
+
+    _derive_plugin_tags_many(jobs, projects)
+    _derive_interface_tags_many(jobs)
+
+    _calculate_event_grouping_many(jobs, projects)
+
+    _materialize_metadata_many(jobs)
+
+    # Load attachments first, but persist them at the very last after
+    # posting to eventstream to make sure all counters and eventstream are
+    # incremented for sure. Also wait for grouping to remove attachments
+    # based on the group counter.
+    with metrics.timer("event_manager.get_attachments"):
+        with sentry_sdk.start_span(op="event_manager.save.get_attachments"):
+            for job in jobs:
+                job["attachments"] = get_attachments(job["cache_key"], job)
+
+    with sentry_sdk.start_span(op="event_manager.save.get_group_from_grouphash_cache"):
+        for job in jobs:
+            job["grouphash_cache_lookup"] = _get_group_from_grouphash_cache(
+                projects[job["project_id"]], job["hashes"]
             )
 
-        job = {"data": self._data, "project_id": project_id, "raw": raw, "start_time": start_time}
-        jobs = [job]
+    _get_or_create_grouphashes_many(jobs, projects)
+
+    saved_jobs = []
+    for job in jobs:
+        kwargs = {
+            "platform": job["platform"],
+            "message": job["event"].search_message,
+            "culprit": job["culprit"],
+            "logger": job["logger_name"],
+            "level": LOG_LEVELS_MAP.get(job["level"]),
+            "last_seen": job["event"].datetime,
+            "first_seen": job["event"].datetime,
+            "active_at": job["event"].datetime,
+        }
+
+        if job["release"]:
+            kwargs["first_release"] = job["release"]
+
+        try:
+            with sentry_sdk.start_span(op="event_manager.save.save_aggregate_fn"):
+                job["group"], job["is_new"], job["is_regression"] = _save_aggregate(
+                    event=job["event"],
+                    hashes=job["hashes"],
+                    release=job["release"],
+                    metadata=dict(job["event_metadata"]),
+                    received_timestamp=job["received_timestamp"],
+                    flat_grouphashes=job.get("flat_grouphashes"),
+                    grouphash_cache_lookup=job["grouphash_cache_lookup"],
+                    **kwargs,
+                )
+        except HashDiscarded as e:
+            discard_event(job, job["attachments"])
+            job["hash_discarded"] = e
+            continue
+
+        job["aggregated"] = True
+        job["event"].group = job["group"]
+
+        # store a reference to the group id to guarantee validation of isolation
+        # XXX(markus): No clue what this does
+        job["event"].data.bind_ref(job["event"])
+
+        saved_jobs.append(job)
 
-        is_reprocessed = is_reprocessed_event(job["data"])
+    return finish_error_events(saved_jobs, projects)
 
-        with sentry_sdk.start_span(op="event_manager.save.pull_out_data"):
-            _pull_out_data(jobs, projects)
 
-        with sentry_sdk.start_span(op="event_manager.save.get_or_create_release_many"):
-            _get_or_create_release_many(jobs, projects)
+def _run_once_many(step, jobs, *args):
+    """
+    Runs a step of ``finish_error_events`` that must not be repeated for a
+    job, e.g. because it increments counters, on the jobs that have not
+    completed it yet.
+    """
+    name = step.__name__
+    pending = [job for job in jobs if name not in job.setdefault("completed_steps", set())]
+    if pending:
+        step(pending, *args)
+    for job in pending:
+        job["completed_steps"].add(name)
 
-        with sentry_sdk.start_span(op="event_manager.save.get_event_user_many"):
-            _get_event_user_many(jobs, projects)
 
-        job["project_key"] = None
-        if job["key_id"] is not None:
+def finish_error_events(jobs, projects):
+    """
+    Saves error events that have been attached to their group by
+    ``save_error_events``. Steps that are not idempotent are skipped for jobs
+    that completed them in an earlier, failed call, so events of a failed
+    batch can be finished one by one without counting them twice.
+    """
+    if not jobs:
+        return jobs
+
+    _get_or_create_environment_many(jobs, projects)
+    _get_or_create_group_environment_many(jobs)
+    _get_or_create_release_associated_models(jobs, projects)
+    _get_or_create_group_release_many(jobs)
+
+    _run_once_many(_tsdb_record_all_metrics, jobs)
+
+    for job in jobs:
+        if job["group"]:
+            UserReport.objects.filter(
+                project_id=job["project_id"], event_id=job["event"].event_id
+            ).update(group_id=job["group"].id, environment_id=job["environment"].id)
+
+    with metrics.timer("event_manager.filter_attachments_for_group"):
+        for job in jobs:
+            job["attachments"] = filter_attachments_for_group(job["attachments"], job)
+
+    # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
+    _run_once_many(_materialize_event_metrics, jobs)
+    _run_once_many(_materialize_attachment_metrics_many, jobs)
+
+    _nodestore_save_many(jobs)
+
+    for job in jobs:
+        save_unprocessed_event(projects[job["project_id"]], job["event"].event_id)
+
+    _run_once_many(_buffer_incr_release_counters_many, jobs)
+    _run_once_many(_send_first_event_received_many, jobs, projects)
+    _run_once_many(_delete_old_primary_hash_many, jobs)
+    _run_once_many(_eventstream_insert_many, jobs)
+
+    # Do this last to ensure signals get emitted even if connection to the
+    # file store breaks temporarily.
+    #
+    # We do not need this for reprocessed events as for those we update the
+    # group_id on existing models in post_process_group, which already does
+    # this because of indiv. attachments.
+    with metrics.timer("event_manager.save_attachments"):
+        for job in jobs:
+            if not job["is_reprocessed"]:
+                save_attachments(job["cache_key"], job["attachments"], job)
+
+    for job in jobs:
+        metric_tags = {"from_relay": "_relay_processed" in job["data"]}
+
+        metrics.timing(
+            "events.latency",
+            job["received_timestamp"] - job["recorded_timestamp"],
+            tags=metric_tags,
+        )
+        metrics.timing("events.size.data.post_save", job["event"].size, tags=metric_tags)
+        metrics.incr(
+            "events.post_save.normalize.errors",
+            amount=len(job["data"].get("errors") or ()),
+            tags=metric_tags,
+        )
+
+    _run_once_many(_track_outcome_accepted_many, jobs)
+
+    return jobs
+
+
+@metrics.wraps("save_event.set_organization_cache_many")
+def _set_organization_cache_many(projects):
+    organization_ids = {project.organization_id for project in projects.values()}
+    organizations = {o.id: o for o in Organization.objects.get_many_from_cache(organization_ids)}
+
+    for project in projects.values():
+        try:
+            project.set_cached_field_value("organization", organizations[project.organization_id])
+        except KeyError:
+            continue
+
+
+@metrics.wraps("save_event.get_project_key_many")
+def _get_project_key_many(jobs):
+    project_keys = {}
+
+    for job in jobs:
+        key_id = job["key_id"]
+        if key_id is not None and key_id not in project_keys:
             with metrics.timer("event_manager.load_project_key"):
                 try:
-                    job["project_key"] = ProjectKey.objects.get_from_cache(id=job["key_id"])
+                    project_keys[key_id] = ProjectKey.objects.get_from_cache(id=key_id)
                 except ProjectKey.DoesNotExist:
-                    pass
+                    project_keys[key_id] = None
+
+        job["project_key"] = project_keys.get(key_id)
 
-        _derive_plugin_tags_many(jobs, projects)
-        _derive_interface_tags_many(jobs)
 
-        do_background_grouping_before = options.get("store.background-grouping-before")
+@metrics.wraps("save_event.calculate_event_grouping_many")
+def _calculate_event_grouping_many(jobs, projects):
+    do_background_grouping_before = options.get("store.background-grouping-before")
+
+    for job in jobs:
+        project = projects[job["project_id"]]
+
         if do_background_grouping_before:
             _run_background_grouping(project, job)
 
@@ -403,7 +621,7 @@ class EventManager:
         with metrics.timer("event_manager.load_grouping_config"):
             # At this point we want to normalize the in_app values in case the
             # clients did not set this appropriately so far.
-            if is_reprocessed:
+            if job["is_reprocessed"]:
                 # The customer might have changed grouping enhancements since
                 # the event was ingested -> make sure we get the fresh one for reprocessing.
                 grouping_config = get_grouping_config_dict_for_project(project)
@@ -421,7 +639,7 @@ class EventManager:
         ):
             hashes = _calculate_event_grouping(project, job["event"], grouping_config)
 
-        hashes = CalculatedHashes(
+        job["hashes"] = hashes = CalculatedHashes(
             hashes=hashes.hashes + (secondary_hashes and secondary_hashes.hashes or []),
             hierarchical_hashes=hashes.hierarchical_hashes,
             tree_labels=hashes.tree_labels,
@@ -433,54 +651,44 @@ class EventManager:
         if hashes.tree_labels:
             job["finest_tree_label"] = hashes.finest_tree_label
 
-        _materialize_metadata_many(jobs)
 
-        kwargs = {
-            "platform": job["platform"],
-            "message": job["event"].search_message,
-            "culprit": job["culprit"],
-            "logger": job["logger_name"],
-            "level": LOG_LEVELS_MAP.get(job["level"]),
-            "last_seen": job["event"].datetime,
-            "first_seen": job["event"].datetime,
-            "active_at": job["event"].datetime,
-        }
+@metrics.wraps("save_event.get_or_create_grouphashes_many")
+def _get_or_create_grouphashes_many(jobs, projects):
+    """
+    Resolve the flat grouphashes of all jobs with one query per project
+    instead of one ``get_or_create`` per hash and event. The result is only a
+    starting point for ``_save_aggregate``: group creation re-reads all hashes
+    under a row lock, so grouphashes that became stale while earlier events
+    of the same batch created groups are harmless.
 
-        if job["release"]:
-            kwargs["first_release"] = job["release"]
+    Jobs that already found their group in the grouphash cache are skipped.
+    """
+    jobs = [job for job in jobs if job.get("grouphash_cache_lookup", (None, None))[0] is None]
 
-        # Load attachments first, but persist them at the very last after
-        # posting to eventstream to make sure all counters and eventstream are
-        # incremented for sure. Also wait for grouping to remove attachments
-        # based on the group counter.
-        with metrics.timer("event_manager.get_attachments"):
-            with sentry_sdk.start_span(op="event_manager.save.get_attachments"):
-                attachments = get_attachments(cache_key, job)
+    hashes_by_project = {}
+    for job in jobs:
+        hashes_by_project.setdefault(job["project_id"], set()).update(job["hashes"].hashes)
 
-        try:
-            with sentry_sdk.start_span(op="event_manager.save.save_aggregate_fn"):
-                job["group"], job["is_new"], job["is_regression"] = _save_aggregate(
-                    event=job["event"],
-                    hashes=hashes,
-                    release=job["release"],
-                    metadata=dict(job["event_metadata"]),
-                    received_timestamp=job["received_timestamp"],
-                    **kwargs,
-                )
-        except HashDiscarded:
-            discard_event(job, attachments)
-            raise
+    for project_id, hashes in hashes_by_project.items():
+        project = projects[project_id]
+        grouphashes = {
+            gh.hash: gh for gh in GroupHash.objects.filter(project=project, hash__in=hashes)
+        }
 
-        job["event"].group = job["group"]
+        for hash in hashes:
+            if hash not in grouphashes:
+                grouphashes[hash] = GroupHash.objects.get_or_create(project=project, hash=hash)[0]
 
-        # store a reference to the group id to guarantee validation of isolation
-        # XXX(markus): No clue what this does
-        job["event"].data.bind_ref(job["event"])
+        for job in jobs:
+            if job["project_id"] == project_id:
+                job["flat_grouphashes"] = [grouphashes[hash] for hash in job["hashes"].hashes]
 
-        _get_or_create_environment_many(jobs, projects)
 
+@metrics.wraps("save_event.get_or_create_group_environment_many")
+def _get_or_create_group_environment_many(jobs):
+    for job in jobs:
         if job["group"]:
-            group_environment, job["is_new_group_environment"] = GroupEnvironment.get_or_create(
+            _, job["is_new_group_environment"] = GroupEnvironment.get_or_create(
                 group_id=job["group"].id,
                 environment_id=job["environment"].id,
                 defaults={"first_release": job["release"] or None},
@@ -488,8 +696,10 @@ class EventManager:
         else:
             job["is_new_group_environment"] = False
 
-        _get_or_create_release_associated_models(jobs, projects)
 
+@metrics.wraps("save_event.get_or_create_group_release_many")
+def _get_or_create_group_release_many(jobs):
+    for job in jobs:
         if job["release"] and job["group"]:
             job["grouprelease"] = GroupRelease.get_or_create(
                 group=job["group"],
@@ -498,94 +708,41 @@ class EventManager:
                 datetime=job["event"].datetime,
             )
 
-        _tsdb_record_all_metrics(jobs)
-
-        if job["group"]:
-            UserReport.objects.filter(project_id=project.id, event_id=job["event"].event_id).update(
-                group_id=job["group"].id, environment_id=job["environment"].id
-            )
-
-        with metrics.timer("event_manager.filter_attachments_for_group"):
-            attachments = filter_attachments_for_group(attachments, job)
-
-        # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
-        _materialize_event_metrics(jobs)
 
-        for attachment in attachments:
-            key = f"bytes.stored.{attachment.type}"
-            old_bytes = job["event_metrics"].get(key) or 0
-            job["event_metrics"][key] = old_bytes + attachment.size
-
-        _nodestore_save_many(jobs)
-        save_unprocessed_event(project, job["event"].event_id)
-
-        if job["release"]:
-            if job["is_new"]:
-                buffer_incr(
-                    ReleaseProject,
-                    {"new_groups": 1},
-                    {"release_id": job["release"].id, "project_id": project.id},
-                )
-            if job["is_new_group_environment"]:
-                buffer_incr(
-                    ReleaseProjectEnvironment,
-                    {"new_issues_count": 1},
-                    {
-                        "project_id": project.id,
-                        "release_id": job["release"].id,
-                        "environment_id": job["environment"].id,
-                    },
-                )
-        if not raw:
-            if not project.first_event:
-                project.update(first_event=job["event"].datetime)
-                first_event_received.send_robust(
-                    project=project, event=job["event"], sender=Project
-                )
+@metrics.wraps("save_event.buffer_incr_release_counters_many")
+def _buffer_incr_release_counters_many(jobs):
+    for job in jobs:
+        if not job["release"]:
+            continue
 
-        if is_reprocessed:
-            safe_execute(
-                reprocessing2.buffered_delete_old_primary_hash,
-                project_id=job["event"].project_id,
-                group_id=reprocessing2.get_original_group_id(job["event"]),
-                event_id=job["event"].event_id,
-                datetime=job["event"].datetime,
-                old_primary_hash=reprocessing2.get_original_primary_hash(job["event"]),
-                current_primary_hash=job["event"].get_primary_hash(),
-                _with_transaction=False,
+        if job["is_new"]:
+            buffer_incr(
+                ReleaseProject,
+                {"new_groups": 1},
+                {"release_id": job["release"].id, "project_id": job["project_id"]},
+            )
+        if job["is_new_group_environment"]:
+            buffer_incr(
+                ReleaseProjectEnvironment,
+                {"new_issues_count": 1},
+                {
+                    "project_id": job["project_id"],
+                    "release_id": job["release"].id,
+                    "environment_id": job["environment"].id,
+                },
             )
 
-        _eventstream_insert_many(jobs)
-
-        # Do this last to ensure signals get emitted even if connection to the
-        # file store breaks temporarily.
-        #
-        # We do not need this for reprocessed events as for those we update the
-        # group_id on existing models in post_process_group, which already does
-        # this because of indiv. attachments.
-        if not is_reprocessed:
-            with metrics.timer("event_manager.save_attachments"):
-                save_attachments(cache_key, attachments, job)
-
-        metric_tags = {"from_relay": "_relay_processed" in job["data"]}
-
-        metrics.timing(
-            "events.latency",
-            job["received_timestamp"] - job["recorded_timestamp"],
-            tags=metric_tags,
-        )
-        metrics.timing("events.size.data.post_save", job["event"].size, tags=metric_tags)
-        metrics.incr(
-            "events.post_save.normalize.errors",
-            amount=len(job["data"].get("errors") or ()),
-            tags=metric_tags,
-        )
-
-        _track_outcome_accepted_many(jobs)
 
-        self._data = job["event"].data.data
+@metrics.wraps("save_event.send_first_event_received_many")
+def _send_first_event_received_many(jobs, projects):
+    for job in jobs:
+        if job["raw"]:
+            continue
 
-        return job["event"]
+        project = projects[job["project_id"]]
+        if not project.first_event:
+            project.update(first_event=job["event"].datetime)
+            first_event_received.send_robust(project=project, event=job["event"], sender=Project)
 
 
 @metrics.wraps("event_manager.background_grouping")
@@ -774,10 +931,16 @@ def _materialize_metadata_many(jobs):
 
 @metrics.wraps("save_event.get_or_create_environment_many")
 def _get_or_create_environment_many(jobs, projects):
+    environments = {}
+
     for job in jobs:
-        job["environment"] = Environment.get_or_create(
-            project=projects[job["project_id"]], name=job["environment"]
-        )
+        environment_key = (job["project_id"], job["environment"])
+        if environment_key not in environments:
+            environments[environment_key] = Environment.get_or_create(
+                project=projects[job["project_id"]], name=job["environment"]
+            )
+
+        job["environment"] = environments[environment_key]
 
 
 @metrics.wraps("save_event.get_or_create_release_associated_models")
@@ -808,21 +971,34 @@ def _tsdb_record_all_metrics(jobs):
     """
     Do all tsdb-related things for save_event in here s.t. we can potentially
     put everything in a single redis pipeline someday.
+
+    Jobs are grouped by environment and by the rollup buckets their timestamp
+    falls into. Every group is written with one call per kind of write.
     """
 
     # XXX: validate whether anybody actually uses those metrics
 
-    for job in jobs:
-        incrs = []
-        frequencies = []
-        records = []
+    rollups = list(tsdb.get_rollups())
 
-        incrs.append((tsdb.models.project, job["project_id"]))
+    # (environment ID, rollup buckets) -> (timestamp, incrs, records, frequencies)
+    batches = {}
+
+    for job in jobs:
         event = job["event"]
         group = job["group"]
         release = job["release"]
         environment = job["environment"]
 
+        batch_key = (
+            environment.id,
+            tuple(tsdb.normalize_to_epoch(event.datetime, rollup) for rollup in rollups),
+        )
+        if batch_key not in batches:
+            batches[batch_key] = (event.datetime, [], [], [])
+        _, incrs, records, frequencies = batches[batch_key]
+
+        incrs.append((tsdb.models.project, job["project_id"]))
+
         if group:
             incrs.append((tsdb.models.group, group.id))
             frequencies.append(
@@ -849,14 +1025,15 @@ def _tsdb_record_all_metrics(jobs):
             if group:
                 records.append((tsdb.models.users_affected_by_group, group.id, (user.tag_value,)))
 
+    for (environment_id, _), (timestamp, incrs, records, frequencies) in batches.items():
         if incrs:
-            tsdb.incr_multi(incrs, timestamp=event.datetime, environment_id=environment.id)
+            tsdb.incr_multi(incrs, timestamp=timestamp, environment_id=environment_id)
 
         if records:
-            tsdb.record_multi(records, timestamp=event.datetime, environment_id=environment.id)
+            tsdb.record_multi(records, timestamp=timestamp, environment_id=environment_id)
 
         if frequencies:
-            tsdb.record_frequency_multi(frequencies, timestamp=event.datetime)
+            tsdb.record_frequency_multi(frequencies, timestamp=timestamp)
 
 
 @metrics.wraps("save_event.nodestore_save_many")
@@ -905,6 +1082,29 @@ def _eventstream_insert_many(jobs):
         )
 
 
+def _materialize_attachment_metrics_many(jobs):
+    for job in jobs:
+        for attachment in job["attachments"]:
+            key = f"bytes.stored.{attachment.type}"
+            old_bytes = job["event_metrics"].get(key) or 0
+            job["event_metrics"][key] = old_bytes + attachment.size
+
+
+def _delete_old_primary_hash_many(jobs):
+    for job in jobs:
+        if job["is_reprocessed"]:
+            safe_execute(
+                reprocessing2.buffered_delete_old_primary_hash,
+                project_id=job["event"].project_id,
+                group_id=reprocessing2.get_original_group_id(job["event"]),
+                event_id=job["event"].event_id,
+                datetime=job["event"].datetime,
+                old_primary_hash=reprocessing2.get_original_primary_hash(job["event"]),
+                current_primary_hash=job["event"].get_primary_hash(),
+                _with_transaction=False,
+            )
+
+
 @metrics.wraps("save_event.track_outcome_accepted_many")
 def _track_outcome_accepted_many(jobs):
     for job in jobs:
@@ -1031,12 +1231,42 @@ def get_culprit(data):
     )
 
 
-def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwargs):
+def _save_aggregate(
+    event,
+    hashes,
+    release,
+    metadata,
+    received_timestamp,
+    flat_grouphashes=None,
+    grouphash_cache_lookup=None,
+    **kwargs,
+):
     project = event.project
 
-    flat_grouphashes = [
-        GroupHash.objects.get_or_create(project=project, hash=hash)[0] for hash in hashes.hashes
-    ]
+    # The cache has to be consulted before any ``GroupHash`` row is read, see
+    # ``grouphash_cache.set_group_id``.
+    if grouphash_cache_lookup is None:
+        grouphash_cache_lookup = _get_group_from_grouphash_cache(project, hashes)
+    cached_group, grouphash_cache_generation = grouphash_cache_lookup
+
+    if cached_group is not None:
+        kwargs["data"] = materialize_metadata(
+            event.data,
+            get_event_type(event.data),
+            metadata,
+        )
+        kwargs["data"]["last_received"] = received_timestamp
+
+        is_regression = _process_existing_aggregate(
+            group=cached_group, event=event, data=kwargs, release=release
+        )
+
+        return cached_group, False, is_regression
+
+    if flat_grouphashes is None:
+        flat_grouphashes = [
+            GroupHash.objects.get_or_create(project=project, hash=hash)[0] for hash in hashes.hashes
+        ]
 
     # The root_hierarchical_hash is the least specific hash within the tree, so
     # typically hierarchical_hashes[0], unless a hash `n` has been split in
@@ -1209,6 +1439,19 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
             state=GroupHash.State.LOCKED_IN_MIGRATION
         ).update(group=group)
 
+    if root_hierarchical_grouphash is None and grouphash_cache_generation is not None:
+        grouphash_cache.set_group_id(
+            project.id,
+            {
+                h.hash
+                for h in flat_grouphashes
+                if h.state != GroupHash.State.LOCKED_IN_MIGRATION
+                and (h.group_id == group.id or h in new_hashes)
+            },
+            group.id,
+            grouphash_cache_generation,
+        )
+
     is_regression = _process_existing_aggregate(
         group=group, event=event, data=kwargs, release=release
     )
@@ -1216,6 +1459,42 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
     return group, is_new, is_regression
 
 
+def _get_group_from_grouphash_cache(project, hashes):
+    """
+    Look up the group of an event in the grouphash cache. Hierarchical
+    grouping needs the full ``GroupHash`` rows to detect splits, so it always
+    takes the slow path.
+
+    Returns the cached group or ``None``, and the cache generation that has to
+    be passed to ``grouphash_cache.set_group_id`` after a miss. The generation
+    is ``None`` if the cache must not be populated for this event.
+    """
+    if hashes.hierarchical_hashes or not grouphash_cache.is_enabled():
+        return None, None
+
+    group_id, generation = grouphash_cache.lookup_group_id(project.id, hashes.hashes)
+    if group_id is None:
+        return None, generation
+
+    try:
+        group = Group.objects.get(id=group_id)
+    except Group.DoesNotExist:
+        grouphash_cache.invalidate_hashes(project.id, hashes.hashes)
+        return None, None
+
+    # The hashes of these groups are about to be moved or deleted, let the
+    # slow path look at the rows.
+    if group.status in (
+        GroupStatus.PENDING_DELETION,
+        GroupStatus.DELETION_IN_PROGRESS,
+        GroupStatus.PENDING_MERGE,
+        GroupStatus.REPROCESSING,
+    ):
+        return None, None
+
+    return group, generation
+
+
 def _find_existing_grouphash(
     project,
     flat_grouphashes,
@@ -1727,9 +2006,11 @@ def _calculate_event_grouping(project, event, grouping_config) -> CalculatedHash
         "platform": event.platform or "unknown",
     }
 
+    loaded_grouping_config = load_grouping_config(grouping_config)
+
     with metrics.timer("event_manager.normalize_stacktraces_for_grouping", tags=metric_tags):
         with sentry_sdk.start_span(op="event_manager.normalize_stacktraces_for_grouping"):
-            event.normalize_stacktraces_for_grouping(load_grouping_config(grouping_config))
+            event.normalize_stacktraces_for_grouping(loaded_grouping_config)
 
     # Detect & set synthetic marker if necessary
     detect_synthetic_exception(event.data, grouping_config)
@@ -1749,6 +2030,19 @@ def _calculate_event_grouping(project, event, grouping_config) -> CalculatedHash
             ),
         )
 
+    # Identical stacktraces can skip building the grouping components, see
+    # sentry.grouping.hash_cache.
+    hash_cache_fingerprint = cached_hashes = None
+    if hash_cache.is_enabled():
+        hash_cache_fingerprint = hash_cache.get_fingerprint(
+            event.data, grouping_config, loaded_grouping_config
+        )
+        if hash_cache_fingerprint is not None:
+            cached_hashes = hash_cache.get_hashes(hash_cache_fingerprint)
+            if cached_hashes is not None and not hash_cache.should_verify():
+                cached_hashes.write_to_event(event.data)
+                return cached_hashes
+
     with metrics.timer("event_manager.event.get_hashes", tags=metric_tags):
         # Here we try to use the grouping config that was requested in the
         # event.  If that config has since been deleted (because it was an
@@ -1758,6 +2052,13 @@ def _calculate_event_grouping(project, event, grouping_config) -> CalculatedHash
         except GroupingConfigNotFound:
             event.data["grouping_config"] = get_grouping_config_dict_for_project(project)
             hashes = event.get_hashes()
+            hash_cache_fingerprint = None
+
+    if hash_cache_fingerprint is not None:
+        if cached_hashes is None:
+            hash_cache.set_hashes(hash_cache_fingerprint, hashes)
+        else:
+            hash_cache.verify(hash_cache_fingerprint, cached_hashes, hashes)
 
     hashes.write_to_event(event.data)
     return hashes
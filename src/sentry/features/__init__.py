@@ -230,3 +230,4 @@ all = default_manager.all
 add_handler = default_manager.add_handler
 add_entity_handler = default_manager.add_entity_handler
 has_for_batch = default_manager.has_for_batch
+prefetch_for_projects = default_manager.prefetch_for_projects
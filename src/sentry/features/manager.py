@@ -14,12 +14,15 @@ from typing import (
     MutableSet,
     Optional,
     Sequence,
+    Tuple,
     Type,
 )
 
 import sentry_sdk
 from django.conf import settings
 
+from sentry.utils import metrics
+
 from .base import Feature
 from .exceptions import FeatureNotRegistered
 
@@ -28,6 +31,38 @@ if TYPE_CHECKING:
     from sentry.models import Organization, Project, User
 
 
+def _get_entity_key(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int)):
+        return value
+    pk = getattr(value, "pk", None)
+    if pk is None:
+        raise TypeError("Cannot memoize feature checks for unsaved or unknown entities")
+    return (type(value).__name__, pk)
+
+
+def _get_cache_key(
+    name: str,
+    args: Sequence[Any],
+    kwargs: Mapping[str, Any],
+    actor: Optional[User],
+    skip_entity: Optional[bool],
+) -> Optional[Tuple[Any, ...]]:
+    """
+    Returns the key of a feature check in the request cache, or None if the
+    check cannot be memoized.
+    """
+    try:
+        return (
+            name,
+            tuple(_get_entity_key(arg) for arg in args),
+            tuple(sorted((k, _get_entity_key(v)) for k, v in kwargs.items())),
+            "anonymous" if getattr(actor, "is_anonymous", False) else _get_entity_key(actor),
+            bool(skip_entity),
+        )
+    except (TypeError, AttributeError):
+        return None
+
+
 class RegisteredFeatureManager:
     """
     Feature functions that are built around the need to register feature
@@ -95,6 +130,26 @@ class RegisteredFeatureManager:
         >>> FeatureManager.has_for_batch('projects:feature', organization, [project1, project2], actor=request.user)
         """
 
+        result = self._get_handlers_for_batch(name, organization, objects, actor)
+
+        default_flag = settings.SENTRY_FEATURES.get(name, False)
+        for obj in objects:
+            if obj not in result:
+                result[obj] = default_flag
+
+        return result
+
+    def _get_handlers_for_batch(
+        self,
+        name: str,
+        organization: Organization,
+        objects: Sequence[Project],
+        actor: Optional[User] = None,
+    ) -> MutableMapping[Project, bool]:
+        """
+        Check a feature for a batch of objects with the registered feature
+        handlers only. Objects that no handler has a result for are omitted.
+        """
         result = dict()
         remaining = set(objects)
 
@@ -120,10 +175,6 @@ class RegisteredFeatureManager:
                         result[obj] = flag
                 span.set_data("Flags Found", batch_size - len(remaining))
 
-        default_flag = settings.SENTRY_FEATURES.get(name, False)
-        for obj in remaining:
-            result[obj] = default_flag
-
         return result
 
 
@@ -212,6 +263,30 @@ class FeatureManager(RegisteredFeatureManager):
 
         """
         actor = kwargs.pop("actor", None)
+
+        # Results are memoized for the duration of a request
+        request_cache = self._get_request_cache()
+        cache_key = None
+        if request_cache is not None:
+            cache_key = _get_cache_key(name, args, kwargs, actor, skip_entity)
+            if cache_key in request_cache:
+                return request_cache[cache_key]
+
+        with metrics.timer("features.has", tags={"feature": name}):
+            rv = self._has(name, args, kwargs, actor, skip_entity)
+
+        if cache_key is not None:
+            request_cache[cache_key] = rv
+        return rv
+
+    def _has(
+        self,
+        name: str,
+        args: Sequence[Any],
+        kwargs: Mapping[str, Any],
+        actor: Optional[User],
+        skip_entity: Optional[bool],
+    ) -> bool:
         feature = self.get(name, *args, **kwargs)
 
         # Check registered feature handlers
@@ -231,6 +306,66 @@ class FeatureManager(RegisteredFeatureManager):
         # Features are by default disabled if no plugin or default enables them
         return False
 
+    def _get_request_cache(self) -> Optional[MutableMapping[Any, bool]]:
+        from sentry.utils.request_cache import get_request_cache
+
+        return get_request_cache(self)
+
+    def prefetch_for_projects(
+        self,
+        feature_names: Sequence[str],
+        organization: Organization,
+        projects: Sequence[Project],
+        actor: Optional[User] = None,
+        skip_entity: Optional[bool] = False,
+    ) -> Mapping[str, Mapping[Project, bool]]:
+        """
+        Determine for many project features whether they are enabled for the
+        projects of an organization.
+
+        The entity handler is asked once for all features and projects, unless
+        ``skip_entity`` is set, and every registered handler once per feature
+        for all projects. Each result is what ``has`` would return for the
+        feature and project, and is memoized for the rest of the request, so
+        that serializers can prefetch the flags of a page of projects before
+        calling ``has``.
+
+        >>> FeatureManager.prefetch_for_projects(['projects:feature'], organization, projects, actor=request.user)
+        """
+        entity_results: Mapping[str, Mapping[str, bool]] = {}
+        if self._entity_handler and not skip_entity:
+            entity_results = (
+                self.batch_has(feature_names, actor, projects=projects, organization=organization)
+                or {}
+            )
+
+        request_cache = self._get_request_cache()
+        result = {}
+        for name in feature_names:
+            with metrics.timer("features.prefetch_for_projects", tags={"feature": name}):
+                flags = self._get_handlers_for_batch(name, organization, projects, actor)
+
+            default_flag = settings.SENTRY_FEATURES.get(name, False)
+            if default_flag is None:
+                default_flag = False
+
+            for project in projects:
+                flag = flags.get(project)
+                if flag is None:
+                    flag = entity_results.get(f"project:{project.id}", {}).get(name)
+                if flag is None:
+                    flag = default_flag
+                flags[project] = flag
+
+                if request_cache is not None:
+                    cache_key = _get_cache_key(name, (project,), {}, actor, skip_entity)
+                    if cache_key is not None:
+                        request_cache[cache_key] = flag
+
+            result[name] = flags
+
+        return result
+
     def batch_has(
         self,
         feature_names: Sequence[str],
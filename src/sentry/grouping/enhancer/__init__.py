@@ -8,10 +8,12 @@ from parsimonious.grammar import Grammar, NodeVisitor
 
 from sentry import projectoptions
 from sentry.grouping.component import GroupingComponent
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.strings import unescape_string
 
 from .actions import Action, FlagAction, VarAction
 from .exceptions import InvalidEnhancerConfig
+from .index import RuleIndex
 from .matchers import (
     CalleeMatch,
     CallerMatch,
@@ -70,6 +72,9 @@ _        = space*
 VERSIONS = [1, 2]
 LATEST_VERSION = VERSIONS[-1]
 
+# Loaded enhancements by their serialized form, see ``Enhancements.loads``.
+_loaded_enhancements = LRUCache(maxsize=1000)
+
 
 class StacktraceState:
     def __init__(self):
@@ -116,6 +121,9 @@ class Enhancements:
         self._modifier_rules = [rule for rule in self.iter_rules() if rule.is_modifier]
         self._updater_rules = [rule for rule in self.iter_rules() if rule.is_updater]
 
+        self._modifier_index = RuleIndex(self._modifier_rules)
+        self._updater_index = RuleIndex(self._updater_rules)
+
     def apply_modifications_to_frame(self, frames, platform, exception_data):
         """This applies the frame modifications to the frames itself.  This
         does not affect grouping.
@@ -125,9 +133,9 @@ class Enhancements:
 
         match_frames = [create_match_frame(frame, platform) for frame in frames]
 
-        for rule in self._modifier_rules:
+        for rule, frame_indices in self._modifier_index.iter_candidates(match_frames):
             for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
+                match_frames, platform, exception_data, cache, frame_indices
             ):
                 action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
 
@@ -139,10 +147,10 @@ class Enhancements:
 
         stacktrace_state = StacktraceState()
         # Apply direct frame actions and update the stack state alongside
-        for rule in self._updater_rules:
+        for rule, frame_indices in self._updater_index.iter_candidates(match_frames):
 
             for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
+                match_frames, platform, exception_data, cache, frame_indices
             ):
                 action.update_frame_components_contributions(components, frames, idx, rule=rule)
                 action.modify_stacktrace_state(stacktrace_state, rule)
@@ -249,8 +257,21 @@ class Enhancements:
 
     @classmethod
     def loads(cls, data):
+        """Loads enhancements from their serialized form. Enhancements are
+        immutable, so instances (and their compiled rule indexes) are shared
+        between all callers loading the same string.
+        """
         if isinstance(data, str):
             data = data.encode("ascii", "ignore")
+
+        rv = _loaded_enhancements.get(data)
+        if rv is None:
+            rv = cls._loads(data)
+            _loaded_enhancements.set(data, rv)
+        return rv
+
+    @classmethod
+    def _loads(cls, data):
         padded = data + b"=" * (4 - (len(data) % 4))
         try:
             return cls._from_config_structure(
@@ -312,9 +333,14 @@ class Rule:
             matchers[matcher.key] = matcher.pattern
         return {"match": matchers, "actions": [str(x) for x in self.actions]}
 
-    def get_matching_frame_actions(self, frames, platform, exception_data=None, cache=None):
+    def get_matching_frame_actions(
+        self, frames, platform, exception_data=None, cache=None, frame_indices=None
+    ):
         """Given a frame returns all the matching actions based on this rule.
         If the rule does not match `None` is returned.
+
+        If ``frame_indices`` is given, only the frames at those indices are
+        considered (see ``RuleIndex``).
         """
         if not self.matchers:
             return []
@@ -326,8 +352,11 @@ class Rule:
 
         rv = []
 
+        if frame_indices is None:
+            frame_indices = range(len(frames))
+
         # 2 - Check if frame matchers match
-        for idx, frame in enumerate(frames):
+        for idx in frame_indices:
             if all(
                 m.matches_frame(frames, idx, platform, exception_data, cache)
                 for m in self._other_matchers
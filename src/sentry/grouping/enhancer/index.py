@@ -0,0 +1,100 @@
+from .matchers import FamilyMatch, FrameMatch
+
+
+def _get_path_like_values(value):
+    # Path-like matchers normalize separators and also try a leading slash,
+    # see ``path_like_match``.
+    value = value.replace(b"\\", b"/")
+    if value.startswith(b"/"):
+        return (value,)
+    return (value, b"/" + value)
+
+
+class RuleIndex:
+    """A precompiled lookup structure over a list of rules.
+
+    Every rule is indexed by one of its frame matchers that can only match if
+    a frame field starts with a literal string (``function:std::*`` needs
+    ``function`` to start with ``std::``), or if the frame has a certain
+    family. Rules without such a matcher are candidates for every frame.
+
+    ``iter_candidates`` uses the index to find the frames each rule could
+    possibly match. The rules themselves still run their full matchers on
+    those frames, the index only skips frames that can never match.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+
+        self._unindexed = set()
+        # field -> literal prefix -> positions of rules in ``self.rules``
+        self._prefixes = {}
+        # field -> distinct lengths of the prefixes in ``self._prefixes``
+        self._prefix_lengths = {}
+        # family -> positions of rules in ``self.rules``
+        self._families = {}
+
+        for pos, rule in enumerate(rules):
+            if not self._index_rule(pos, rule):
+                self._unindexed.add(pos)
+
+        for field, prefixes in self._prefixes.items():
+            self._prefix_lengths[field] = sorted({len(prefix) for prefix in prefixes})
+
+    def _index_rule(self, pos, rule):
+        frame_matchers = [m for m in rule._other_matchers if isinstance(m, FrameMatch)]
+
+        for matcher in frame_matchers:
+            prefix = matcher.literal_prefix
+            if prefix is not None:
+                field_prefixes = self._prefixes.setdefault(matcher.prefix_field, {})
+                field_prefixes.setdefault(prefix, []).append(pos)
+                return True
+
+        for matcher in frame_matchers:
+            if isinstance(matcher, FamilyMatch) and not matcher.negated:
+                if b"all" in matcher._flags:
+                    continue
+                for family in matcher._flags:
+                    self._families.setdefault(family, []).append(pos)
+                return True
+
+        return False
+
+    def _get_candidate_rules(self, match_frame):
+        rv = set()
+
+        for field, lengths in self._prefix_lengths.items():
+            value = match_frame[field]
+            if value is None:
+                continue
+
+            values = _get_path_like_values(value) if field in ("path", "package") else (value,)
+            prefixes = self._prefixes[field]
+            for value in values:
+                for length in lengths:
+                    if length > len(value):
+                        break
+                    rv.update(prefixes.get(value[:length], ()))
+
+        rv.update(self._families.get(match_frame["family"], ()))
+
+        return rv
+
+    def iter_candidates(self, match_frames):
+        """Yields ``(rule, frame_indices)`` in rule order, where
+        ``frame_indices`` are the indices of all frames the rule might match.
+        Rules that cannot match any frame are skipped.
+        """
+        all_indices = range(len(match_frames))
+        candidates = [[] for _ in self.rules]
+
+        for idx, match_frame in enumerate(match_frames):
+            for pos in self._get_candidate_rules(match_frame):
+                candidates[pos].append(idx)
+
+        for pos, rule in enumerate(self.rules):
+            if pos in self._unindexed:
+                yield rule, all_indices
+            elif candidates[pos]:
+                yield rule, candidates[pos]
@@ -25,6 +25,10 @@ SHORT_MATCH_KEYS = {v: k for k, v in MATCH_KEYS.items()}
 
 assert len(SHORT_MATCH_KEYS) == len(MATCH_KEYS)  # assert short key names are not reused
 
+# Characters that have a special meaning in glob patterns. Everything in front
+# of the first one of those is matched literally.
+GLOB_SPECIAL_CHARS = frozenset(b"*?[]{}\\")
+
 FAMILIES = {"native": "N", "javascript": "J", "all": "a"}
 REVERSE_FAMILIES = {v: k for k, v in FAMILIES.items()}
 
@@ -112,11 +116,23 @@ class Match:
         return FrameMatch.from_key(key, arg, negated)
 
 
+def get_literal_prefix(pattern: bytes) -> bytes:
+    """Returns the part of a glob pattern that is matched literally."""
+    for idx, char in enumerate(pattern):
+        if char in GLOB_SPECIAL_CHARS:
+            return pattern[:idx]
+    return pattern
+
+
 class FrameMatch(Match):
 
     # Global registry of matchers
     instances = {}
 
+    # The ``match_frame`` field that has to start with ``literal_prefix`` for
+    # this matcher to match. Used by ``RuleIndex`` to skip frames cheaply.
+    prefix_field = None
+
     @classmethod
     def from_key(cls, key, pattern, negated):
 
@@ -163,6 +179,13 @@ class FrameMatch(Match):
             self.pattern.split() != [self.pattern] and '"%s"' % self.pattern or self.pattern,
         )
 
+    @property
+    def literal_prefix(self):
+        """The literal prefix of the pattern, if the matcher can be indexed by it."""
+        if self.prefix_field is None or self.negated:
+            return None
+        return get_literal_prefix(self._encoded_pattern) or None
+
     def matches_frame(self, frames, idx, platform, exception_data, cache):
         match_frame = frames[idx]
         rv = self._positive_frame_match(match_frame, platform, exception_data, cache)
@@ -200,6 +223,10 @@ class PathLikeMatch(FrameMatch):
     def __init__(self, key, pattern, negated=False):
         super().__init__(key, pattern.lower(), negated)
 
+    @property
+    def prefix_field(self):
+        return self.field
+
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
         value = match_frame[self.field]
         if value is None:
@@ -241,12 +268,19 @@ class InAppMatch(FrameMatch):
 
 
 class FunctionMatch(FrameMatch):
+
+    prefix_field = "function"
+
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
 
         return cached(cache, glob_match, match_frame["function"], self._encoded_pattern)
 
 
 class FrameFieldMatch(FrameMatch):
+    @property
+    def prefix_field(self):
+        return self.field
+
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
         field = match_frame[self.field]
         if field is None:
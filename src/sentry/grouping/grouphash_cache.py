@@ -0,0 +1,162 @@
+"""
+A cache for resolving ``(project_id, hash)`` to the group the hash is
+attached to, used by ``_save_aggregate`` to skip the ``GroupHash`` lookups
+for events of existing groups.
+
+Only hashes that are attached to a group and not locked by an unmerge are ever
+written, so a hit means the event can be attached to that group without
+looking at ``GroupHash`` at all.
+
+Any code that moves a hash to another group, detaches it or tombstones it has
+to call ``invalidate_hashes`` or ``invalidate_groups`` afterwards. Besides
+deleting the entries, this bumps a per-project generation. Writers pass the
+generation they observed *before* reading ``GroupHash`` to ``set_group_id``,
+which drops the write if the generation has changed in the meantime. This
+keeps a write that is based on rows read before a concurrent merge, unmerge or
+deletion from outliving the invalidation.
+
+There is intentionally no in-process tier: it could not be invalidated across
+processes and would keep serving moved hashes.
+"""
+
+from typing import Iterable, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from sentry import options
+from sentry.utils import metrics, redis
+
+REDIS_CACHE_TTL = 600  # 10 min
+# Needs to outlive any single ``_save_aggregate`` by far, an expired
+# generation restarts counting at zero.
+GENERATION_TTL = 86400  # 1 day
+
+set_group_id_script = redis.load_script("grouping/grouphash_cache.lua")
+
+
+def _get_redis_client():
+    return redis.redis_clusters.get(settings.SENTRY_GROUPHASH_CACHE_REDIS_CLUSTER)
+
+
+# All keys of a project share a hash tag so that the generation check and the
+# write in ``set_group_id`` can run in one script on Redis Cluster.
+def _get_redis_key(project_id: int, hash: str) -> str:
+    return f"gh:{{{project_id}}}:{hash}"
+
+
+def _get_generation_key(project_id: int) -> str:
+    return f"gh:{{{project_id}}}:generation"
+
+
+def is_enabled() -> bool:
+    return options.get("store.grouphash-cache-enabled")
+
+
+def get_generation(project_id: int) -> int:
+    return int(_get_redis_client().get(_get_generation_key(project_id)) or 0)
+
+
+def lookup(project_id: int, hashes: Sequence[str]) -> Tuple[Mapping[str, int], int]:
+    """
+    Return the cached group IDs for all given hashes that have a cache entry,
+    together with the current generation of the project.
+    """
+    hashes = list(dict.fromkeys(hashes))
+
+    with _get_redis_client().pipeline() as p:
+        p.get(_get_generation_key(project_id))
+        for hash in hashes:
+            p.get(_get_redis_key(project_id, hash))
+        generation, *results = p.execute()
+
+    rv: MutableMapping[str, int] = {}
+    for hash, group_id in zip(hashes, results):
+        if group_id is not None:
+            rv[hash] = int(group_id)
+
+    metrics.incr("grouphash_cache.lookup", amount=len(rv), tags={"hit": "true"})
+    metrics.incr("grouphash_cache.lookup", amount=len(hashes) - len(rv), tags={"hit": "false"})
+
+    return rv, int(generation or 0)
+
+
+def get_group_ids(project_id: int, hashes: Sequence[str]) -> Mapping[str, int]:
+    return lookup(project_id, hashes)[0]
+
+
+def lookup_group_id(project_id: int, hashes: Sequence[str]) -> Tuple[Optional[int], int]:
+    """
+    Return the group ID of the first hash if every hash is cached, and the
+    current generation of the project. A partial hit is treated as a miss so
+    that ``_save_aggregate`` still gets the chance to attach new hashes to the
+    group.
+    """
+    group_ids, generation = lookup(project_id, hashes)
+    if not hashes or any(hash not in group_ids for hash in hashes):
+        return None, generation
+
+    return group_ids[hashes[0]], generation
+
+
+def get_group_id(project_id: int, hashes: Sequence[str]) -> Optional[int]:
+    return lookup_group_id(project_id, hashes)[0]
+
+
+def set_group_id(project_id: int, hashes: Iterable[str], group_id: int, generation: int) -> bool:
+    """
+    Cache ``group_id`` for all given hashes unless the project has been
+    invalidated since ``generation`` was looked up. Returns whether the
+    entries were written.
+    """
+    hashes = list(hashes)
+    if not hashes:
+        return False
+
+    written = bool(
+        set_group_id_script(
+            _get_redis_client(),
+            [_get_generation_key(project_id)]
+            + [_get_redis_key(project_id, hash) for hash in hashes],
+            [generation, REDIS_CACHE_TTL, group_id],
+        )
+    )
+
+    if not written:
+        metrics.incr("grouphash_cache.set_conflict")
+
+    return written
+
+
+def invalidate_hashes(project_id: int, hashes: Iterable[str]) -> None:
+    hashes = list(hashes)
+    if not hashes:
+        return
+
+    with _get_redis_client().pipeline() as p:
+        # Bump the generation first so that concurrent writers fail their
+        # check before the entries are gone.
+        p.incr(_get_generation_key(project_id))
+        p.expire(_get_generation_key(project_id), GENERATION_TTL)
+        for hash in hashes:
+            p.delete(_get_redis_key(project_id, hash))
+        p.execute()
+
+    metrics.incr("grouphash_cache.invalidate", amount=len(hashes))
+
+
+def invalidate_groups(group_ids: Iterable[int]) -> None:
+    """
+    Invalidate all hashes that are currently attached to the given groups.
+    Call this *after* the hashes have been moved, while the rows still point
+    to a group.
+    """
+    from sentry.models import GroupHash
+
+    hashes_by_project: MutableMapping[int, list] = {}
+    for project_id, hash in GroupHash.objects.filter(group_id__in=list(group_ids)).values_list(
+        "project_id", "hash"
+    ):
+        hashes_by_project.setdefault(project_id, []).append(hash)
+
+    for project_id, hashes in hashes_by_project.items():
+        invalidate_hashes(project_id, hashes)
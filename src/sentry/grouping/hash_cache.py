@@ -0,0 +1,190 @@
+"""
+A content-addressed cache for the ``CalculatedHashes`` of an event.
+
+Calculating hashes builds the full ``GroupingComponent`` tree of an event,
+which is the most expensive part of grouping. Events of the same project
+very often carry the exact same stacktrace (think crash loops), so the
+result is cached under a fingerprint of everything grouping looks at:
+
+- the grouping config id and its enhancements,
+- the event platform,
+- the (normalized) data of every interface a grouping strategy of the config
+  reads, minus frame attributes grouping never looks at.
+
+Only events without custom fingerprints or checksums are cached, as those
+resolve values from arbitrary parts of the event.
+
+Lookups go through an in-process LRU first and, if enabled, a Redis tier
+second. ``store.grouping-hash-cache-verify-sample-rate`` recomputes a share
+of cache hits and reports mismatches, to catch grouping inputs this module
+does not know about.
+"""
+
+import logging
+import random
+from typing import Any, Mapping, Optional
+
+from django.conf import settings
+
+from sentry import options
+from sentry.grouping.result import CalculatedHashes
+from sentry.utils import json, metrics, redis
+from sentry.utils.datastructures import LRUCache
+from sentry.utils.hashlib import md5_text
+
+logger = logging.getLogger(__name__)
+
+REDIS_CACHE_TTL = 3600  # 1 hr
+
+LOCAL_CACHE_SIZE = 5000
+
+# Frame attributes that are not read by any grouping strategy or
+# enhancement matcher. They are left out of the fingerprint because they
+# differ between otherwise identical crashes.
+IGNORED_FRAME_KEYS = frozenset(["vars", "pre_context", "post_context"])
+
+_local_cache = LRUCache(LOCAL_CACHE_SIZE)
+
+
+def _get_redis_client():
+    return redis.redis_clusters.get(settings.SENTRY_GROUPING_HASH_CACHE_REDIS_CLUSTER)
+
+
+def _get_redis_key(fingerprint: str) -> str:
+    return f"ghc:{fingerprint}"
+
+
+def is_enabled() -> bool:
+    return options.get("store.grouping-hash-cache-enabled")
+
+
+def _canonicalize(value: Any) -> Any:
+    """Sort all keys and strip ignored frame attributes."""
+    if isinstance(value, dict):
+        rv = {k: _canonicalize(value[k]) for k in sorted(value)}
+        frames = rv.get("frames")
+        if isinstance(frames, list):
+            rv["frames"] = [
+                {k: v for k, v in frame.items() if k not in IGNORED_FRAME_KEYS}
+                if isinstance(frame, dict)
+                else frame
+                for frame in frames
+            ]
+        return rv
+    elif isinstance(value, list):
+        return [_canonicalize(v) for v in value]
+    return value
+
+
+def get_fingerprint(event_data: Mapping[str, Any], grouping_config, config) -> Optional[str]:
+    """
+    Return the cache key for the hashes of an event, or ``None`` if the
+    hashes of the event cannot be cached.
+
+    ``grouping_config`` is the grouping config dict of the event, ``config``
+    the loaded strategy configuration for it.
+    """
+    if event_data.get("checksum"):
+        return None
+
+    fingerprint = event_data.get("fingerprint") or ["{{ default }}"]
+    if fingerprint != ["{{ default }}"] or event_data.get("_fingerprint_info"):
+        return None
+
+    interfaces = sorted({strategy.interface for strategy in config.iter_strategies()})
+    payload = {
+        "platform": event_data.get("platform"),
+        "interfaces": {
+            interface: _canonicalize(event_data.get(interface)) for interface in interfaces
+        },
+    }
+
+    return md5_text(
+        grouping_config["id"],
+        "\x00",
+        grouping_config.get("enhancements") or "",
+        "\x00",
+        json.dumps(payload),
+    ).hexdigest()
+
+
+def _encode(hashes: CalculatedHashes) -> str:
+    return json.dumps(
+        {
+            "hashes": list(hashes.hashes),
+            "hierarchical_hashes": list(hashes.hierarchical_hashes),
+            "tree_labels": list(hashes.tree_labels),
+        }
+    )
+
+
+def _decode(value: str) -> CalculatedHashes:
+    # Every hit gets a fresh instance, events write these lists into their
+    # payload.
+    data = json.loads(value)
+    return CalculatedHashes(
+        hashes=data["hashes"],
+        hierarchical_hashes=data["hierarchical_hashes"],
+        tree_labels=data["tree_labels"],
+    )
+
+
+def get_hashes(fingerprint: str) -> Optional[CalculatedHashes]:
+    value = _local_cache.get(fingerprint)
+    if value is not None:
+        metrics.incr("grouping.hash_cache.lookup", tags={"tier": "local", "hit": "true"})
+        return _decode(value)
+
+    if options.get("store.grouping-hash-cache-redis-enabled"):
+        value = _get_redis_client().get(_get_redis_key(fingerprint))
+        if value is not None:
+            if isinstance(value, bytes):
+                value = value.decode("utf-8")
+            metrics.incr("grouping.hash_cache.lookup", tags={"tier": "redis", "hit": "true"})
+            _local_cache.set(fingerprint, value)
+            return _decode(value)
+
+    metrics.incr("grouping.hash_cache.lookup", tags={"hit": "false"})
+    return None
+
+
+def set_hashes(fingerprint: str, hashes: CalculatedHashes) -> None:
+    value = _encode(hashes)
+    _local_cache.set(fingerprint, value)
+
+    if options.get("store.grouping-hash-cache-redis-enabled"):
+        _get_redis_client().setex(_get_redis_key(fingerprint), REDIS_CACHE_TTL, value)
+
+
+def delete_hashes(fingerprint: str) -> None:
+    _local_cache.delete(fingerprint)
+
+    if options.get("store.grouping-hash-cache-redis-enabled"):
+        _get_redis_client().delete(_get_redis_key(fingerprint))
+
+
+def should_verify() -> bool:
+    return random.random() < options.get("store.grouping-hash-cache-verify-sample-rate")
+
+
+def verify(fingerprint: str, cached: CalculatedHashes, computed: CalculatedHashes) -> bool:
+    """
+    Compare a cache hit against freshly computed hashes. On a mismatch the
+    entry is dropped and the mismatch is logged, the caller should continue
+    with the computed hashes.
+    """
+    matches = _encode(cached) == _encode(computed)
+    metrics.incr("grouping.hash_cache.verify", tags={"result": "match" if matches else "mismatch"})
+
+    if not matches:
+        logger.warning(
+            "grouping.hash_cache.mismatch",
+            extra={
+                "fingerprint": fingerprint,
+                "cached_hashes": list(cached.hashes),
+                "computed_hashes": list(computed.hashes),
+            },
+        )
+        delete_hashes(fingerprint)
+
+    return matches
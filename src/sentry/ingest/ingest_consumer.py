@@ -22,7 +22,7 @@ import sentry_sdk
 from django.conf import settings
 from django.core.cache import cache
 
-from sentry import eventstore, features
+from sentry import eventstore, features, options
 from sentry.attachments import CachedAttachment, attachment_cache
 from sentry.event_manager import save_attachment
 from sentry.eventstore.processing import event_processing_store
@@ -31,10 +31,16 @@ from sentry.ingest.userreport import Conflict, save_userreport
 from sentry.killswitches import killswitch_matches_context
 from sentry.models import Project
 from sentry.signals import event_accepted
-from sentry.tasks.store import preprocess_event, save_event_transaction
+from sentry.tasks.store import (
+    preprocess_event,
+    save_event_transaction,
+    should_process,
+    time_synthetic_monitoring_event,
+)
 from sentry.utils import json, metrics
 from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.utils.cache import cache_key_for_event
+from sentry.utils.canonical import CanonicalKeyDict
 from sentry.utils.dates import to_datetime
 from sentry.utils.kafka import create_batching_kafka_consumer
 from sentry.utils.sdk import mark_scope_as_unsafe
@@ -94,14 +100,20 @@ class IngestConsumerWorker(AbstractBatchWorker):
             ]
         ] = []
 
+        event_messages = []
+
         projects_to_fetch = set()
 
+        save_events_in_batch = options.get("store.save-errors-ingest-consumer-batch")
+
         with metrics.timer("ingest_consumer.prepare_messages"):
             for message in batch:
                 message_type = message["type"]
                 projects_to_fetch.add(message["project_id"])
 
-                if message_type == "event":
+                if message_type == "event" and save_events_in_batch:
+                    event_messages.append(message)
+                elif message_type == "event":
                     other_messages.append((self.__process_event, message))
                 elif message_type == "attachment_chunk":
                     attachment_chunks.append(message)
@@ -124,6 +136,12 @@ class IngestConsumerWorker(AbstractBatchWorker):
                 for attachment_chunk in attachment_chunks:
                     process_attachment_chunk(attachment_chunk, projects=projects)
 
+        # Save events before the attachments and user reports of the same
+        # batch that may refer to them.
+        if event_messages:
+            with metrics.timer("ingest_consumer.process_event_batch"):
+                process_event_batch(event_messages, projects)
+
         if other_messages:
             with metrics.timer("ingest_consumer.process_other_messages_batch"):
                 other_messages_flush_start = time.monotonic()
@@ -186,7 +204,8 @@ def _load_event(
     event should be stored, the deserialized payload is returned along with a
     function that can be called with the event's storage key to resume
     processing after the event has been persisted and is available to be read by
-    other processing components.
+    other processing components. Pass ``saved=True`` to that function if the
+    event has already been saved by ``process_event_batch``.
     """
     payload = message["payload"]
     start_time = float(message["start_time"])
@@ -267,7 +286,7 @@ def _load_event(
     ):
         return
 
-    def dispatch_task(cache_key: str) -> None:
+    def dispatch_task(cache_key: str, saved: bool = False) -> None:
         if attachments:
             with sentry_sdk.start_span(op="ingest_consumer.set_attachment_cache"):
                 attachment_objects = [
@@ -289,7 +308,7 @@ def _load_event(
                 event_id=event_id,
                 project_id=project_id,
             )
-        else:
+        elif not saved:
             # Preprocess this event, which spawns either process_event or
             # save_event. Pass data explicitly to avoid fetching it again from the
             # cache.
@@ -335,6 +354,115 @@ def process_event_async(
     )
 
 
+def _can_save_in_batch(message: Message, data: Any) -> bool:
+    """
+    Only error events that would be sent straight from ``preprocess_event`` to
+    ``save_event`` can skip the task pipeline.
+    """
+    from sentry.lang.native.processing import should_process_with_symbolicator
+
+    if data.get("type") == "transaction" or message.get("attachments"):
+        return False
+
+    canonical_data = CanonicalKeyDict(data)
+    if should_process_with_symbolicator(canonical_data) or should_process(canonical_data):
+        return False
+
+    return not killswitch_matches_context(
+        "store.load-shed-save-event-projects",
+        {
+            "project_id": int(message["project_id"]),
+            "event_type": data.get("type") or "null",
+            "platform": data.get("platform") or "none",
+        },
+    )
+
+
+@trace_func(name="ingest_consumer.process_event_batch")
+@metrics.wraps("ingest_consumer.process_event_batch")
+def process_event_batch(messages: Sequence[Message], projects: Mapping[int, Project]) -> None:
+    """
+    Save all error events of a consumer batch that need no processing with a
+    single call to ``save_error_events``, so that release, environment and
+    grouphash lookups are shared across the batch. All other events are
+    dispatched to the regular preprocess pipeline.
+    """
+    from sentry.event_manager import finish_error_events, save_error_events
+
+    jobs = []
+
+    for message in messages:
+        result = _load_event(message, projects)
+        if result is None:
+            continue
+
+        data, callback = result
+        cache_key = _store_event(data)
+
+        if not _can_save_in_batch(message, data):
+            callback(cache_key)
+            continue
+
+        jobs.append(
+            {
+                "data": CanonicalKeyDict(data),
+                "project_id": int(message["project_id"]),
+                "start_time": float(message["start_time"]),
+                "cache_key": cache_key,
+                "callback": callback,
+            }
+        )
+
+    if not jobs:
+        return
+
+    metrics.timing("ingest_consumer.process_event_batch.size", len(jobs))
+
+    try:
+        save_error_events(jobs, projects)
+    except Exception:
+        # Do not fail or retry the whole batch for one bad event. Events that
+        # have not been attached to a group yet have not been counted
+        # anywhere, they take the task pipeline instead. Events that have
+        # been are finished one by one here, as saving them again would count
+        # them twice.
+        logger.exception("ingest_consumer.process_event_batch.failed")
+        done_jobs = []
+        for job in jobs:
+            if job.get("hash_discarded") is not None:
+                done_jobs.append(job)
+            elif not job.get("aggregated"):
+                metrics.incr("ingest_consumer.process_event_batch.fallback")
+                job["callback"](job["cache_key"])
+            else:
+                try:
+                    finish_error_events([job], projects)
+                except Exception:
+                    logger.exception("ingest_consumer.process_event_batch.finish_failed")
+                    continue
+                done_jobs.append(job)
+        jobs = done_jobs
+
+    for job in jobs:
+        if job.get("hash_discarded") is not None:
+            # Delete the event payload from cache since it won't show up in post-processing.
+            event_processing_store.delete_by_key(job["cache_key"])
+        else:
+            # Put the updated event back into the cache so that post_process
+            # has the most recent data.
+            event_processing_store.store(dict(job["event"].data.data.items()))
+
+        metrics.timing(
+            "events.time-to-process",
+            time.time() - job["start_time"],
+            instance=job["data"].get("platform"),
+            tags={"is_reprocessing2": "false"},
+        )
+        time_synthetic_monitoring_event(job["data"], job["project_id"], job["start_time"])
+
+        job["callback"](job["cache_key"], saved=True)
+
+
 @trace_func(name="ingest_consumer.process_attachment_chunk")
 @metrics.wraps("ingest_consumer.process_attachment_chunk")
 def process_attachment_chunk(message, projects):
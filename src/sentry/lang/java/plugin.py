@@ -34,8 +34,10 @@ class JavaStacktraceProcessor(StacktraceProcessor):
             self.project, self.images, features=["mapping"]
         )
         self.mapping_views = []
+        self.mapping_debug_ids = []
 
-        for debug_id in self.images:
+        # Iterate in a stable order, the first mapping that remaps a frame wins
+        for debug_id in sorted(self.images):
             error_type = None
 
             dif_path = dif_paths.get(debug_id)
@@ -47,6 +49,7 @@ class JavaStacktraceProcessor(StacktraceProcessor):
                     error_type = EventError.PROGUARD_MISSING_LINENO
                 else:
                     self.mapping_views.append(view)
+                    self.mapping_debug_ids.append(debug_id)
 
             if error_type is None:
                 continue
@@ -85,6 +88,11 @@ class JavaStacktraceProcessor(StacktraceProcessor):
 
         return False
 
+    def get_frame_result_cache_values(self, processable_frame):
+        # Mapping files never change for a debug id. A mapping uploaded after
+        # it was missing changes the key.
+        return self.mapping_debug_ids
+
     def process_frame(self, processable_frame, processing_task):
         frame = processable_frame.frame
         raw_frame = dict(frame)
@@ -1,10 +1,14 @@
 import base64
 import errno
+import hashlib
 import logging
 import re
 import sys
+import threading
 import time
 import zlib
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from io import BytesIO
 from os.path import splitext
@@ -13,9 +17,11 @@ from urllib.parse import urlsplit
 
 import sentry_sdk
 from django.conf import settings
+from django.db import close_old_connections
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
 from requests.utils import get_encoding_from_headers
+from sentry_sdk import Hub
 from symbolic import SourceMapView
 
 from sentry import http, options
@@ -29,6 +35,7 @@ from sentry.utils import json, metrics
 # holding the results of attempting to fetch both kinds of files, either from the
 # database or from the internet
 from sentry.utils.cache import cache
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.files import compress_file
 from sentry.utils.hashlib import md5_text
 from sentry.utils.http import is_valid_origin
@@ -75,6 +82,23 @@ MAX_RESOURCE_FETCHES = 100
 
 CACHE_MAX_VALUE_SIZE = settings.SENTRY_CACHE_MAX_VALUE_SIZE
 
+# Parsed sourcemaps are shared between the events a worker processes, keyed by
+# the checksum of their contents and bounded by the total size of those.
+SOURCEMAP_VIEW_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_sourcemap_view_cache = LRUCache(SOURCEMAP_VIEW_CACHE_MAX_BYTES, sizeof=lambda value: value[0])
+
+# Shared by all processors for prefetching the sources of an event, see
+# ``JavaScriptStacktraceProcessor.prefetch_sources``.
+_fetch_thread_pool = ThreadPoolExecutor(max_workers=settings.SENTRY_SOURCE_FETCH_CONCURRENCY)
+
+# Open release archives and decoded artifact indexes, shared between the events
+# a worker processes if the sourcemaps.release-archive-pool-enabled option is set.
+# Evicted archives are closed once the last reader drops them.
+RELEASE_ARCHIVE_POOL_SIZE = 32
+ARTIFACT_INDEX_LOCAL_CACHE_TTL = 10
+_release_archive_pool = LRUCache(RELEASE_ARCHIVE_POOL_SIZE)
+_artifact_index_cache = LRUCache(RELEASE_ARCHIVE_POOL_SIZE, ttl=ARTIFACT_INDEX_LOCAL_CACHE_TTL)
+
 logger = logging.getLogger(__name__)
 
 
@@ -407,6 +431,13 @@ def get_artifact_index(release, dist):
 
     ident = ReleaseFile.get_ident(ARTIFACT_INDEX_FILENAME, dist_name)
     cache_key = f"artifact-index:v1:{release.id}:{ident}"
+
+    use_local_cache = options.get("sourcemaps.release-archive-pool-enabled")
+    if use_local_cache:
+        index = _artifact_index_cache.get(cache_key)
+        if index is not None:
+            return index
+
     result = cache.get(cache_key)
     if result == -1:
         index = None
@@ -418,6 +449,9 @@ def get_artifact_index(release, dist):
         # Only cache for a short time to keep the manifest up-to-date
         cache.set(cache_key, cache_value, timeout=60)
 
+    if use_local_cache and index is not None:
+        _artifact_index_cache.set(cache_key, index)
+
     return index
 
 
@@ -453,7 +487,10 @@ def fetch_release_archive_for_url(release, dist, url) -> Optional[IO]:
         # is not yet known
         return None
 
-    archive_ident = info["archive_ident"]
+    return _fetch_release_archive(release, dist, info["archive_ident"])
+
+
+def _fetch_release_archive(release, dist, archive_ident) -> Optional[IO]:
 
     # TODO(jjbayer): Could already extract filename from info and return
     # it later
@@ -514,6 +551,53 @@ def fetch_release_archive_for_url(release, dist, url) -> Optional[IO]:
             return file_
 
 
+def open_release_archive(release, archive_file) -> Optional[ReleaseArchive]:
+    try:
+        return ReleaseArchive(archive_file)
+    except Exception as exc:
+        archive_file.seek(0)
+        logger.error(
+            "Failed to initialize archive for release %s",
+            release.id,
+            exc_info=exc,
+            extra={"contents": base64.b64encode(archive_file.read(256))},
+        )
+        # TODO(jjbayer): cache error and return here
+        return None
+
+
+def get_pooled_release_archive_for_url(release, dist, url) -> Optional[ReleaseArchive]:
+    """
+    Like ``fetch_release_archive_for_url``, but returns an open archive that is
+    kept in a pool shared between events. The caller must not close it.
+
+    Archives are pooled by release, dist, archive ident and upload time of the
+    archive, so uploading a new archive under the same name never hits an
+    outdated handle.
+    """
+    with sentry_sdk.start_span(op="get_pooled_release_archive_for_url.get_index_entry"):
+        info = get_index_entry(release, dist, url)
+    if info is None:
+        return None
+
+    archive_ident = info["archive_ident"]
+    pool_key = (release.id, dist.id if dist else None, archive_ident, info.get("date_created"))
+
+    archive = _release_archive_pool.get(pool_key)
+    metrics.incr(
+        "sourcemaps.release_archive_pool.lookup", tags={"hit": str(archive is not None).lower()}
+    )
+    if archive is None:
+        archive_file = _fetch_release_archive(release, dist, archive_ident)
+        if archive_file is None:
+            return None
+        archive = open_release_archive(release, archive_file)
+        if archive is not None:
+            _release_archive_pool.set(pool_key, archive)
+
+    return archive
+
+
 def compress(fp: IO) -> Tuple[bytes, bytes]:
     """Alternative for compress_file when fp does not support chunks"""
     content = fp.read()
@@ -538,55 +622,50 @@ def fetch_release_artifact(url, release, dist):
         return result_from_cache(url, result)
 
     start = time.monotonic()
-    with sentry_sdk.start_span(
-        op="JavaScriptStacktraceProcessor.fetch_release_artifact.fetch_release_archive_for_url"
-    ):
-        archive_file = fetch_release_archive_for_url(release, dist, url)
-    if archive_file is not None:
-        try:
-            archive = ReleaseArchive(archive_file)
-        except Exception as exc:
-            archive_file.seek(0)
-            logger.error(
-                "Failed to initialize archive for release %s",
-                release.id,
-                exc_info=exc,
-                extra={"contents": base64.b64encode(archive_file.read(256))},
-            )
-            # TODO(jjbayer): cache error and return here
-        else:
-            with archive:
-                try:
-                    fp, headers = get_from_archive(url, archive)
-                except KeyError:
-                    # The manifest mapped the url to an archive, but the file
-                    # is not there.
-                    logger.error(
-                        "Release artifact %r not found in archive %s", url, archive_file.id
-                    )
-                    cache.set(cache_key, -1, 60)
-                    metrics.timing(
-                        "sourcemaps.release_artifact_from_archive", time.monotonic() - start
-                    )
-                    return None
-                except Exception as exc:
-                    logger.error("Failed to read %s from release %s", url, release.id, exc_info=exc)
-                    # TODO(jjbayer): cache error and return here
-                else:
-                    result = fetch_and_cache_artifact(
-                        url,
-                        lambda: fp,
-                        cache_key,
-                        cache_key_meta,
-                        headers,
-                        # Cannot use `compress_file` because `ZipExtFile` does not support chunks
-                        compress_fn=compress,
-                    )
-                    metrics.timing(
-                        "sourcemaps.release_artifact_from_archive", time.monotonic() - start
-                    )
+    if options.get("sourcemaps.release-archive-pool-enabled"):
+        with sentry_sdk.start_span(
+            op="JavaScriptStacktraceProcessor.fetch_release_artifact.get_pooled_release_archive_for_url"
+        ):
+            archive = get_pooled_release_archive_for_url(release, dist, url)
+        # Pooled archives stay open for later events
+        archive_context = nullcontext(archive)
+    else:
+        with sentry_sdk.start_span(
+            op="JavaScriptStacktraceProcessor.fetch_release_artifact.fetch_release_archive_for_url"
+        ):
+            archive_file = fetch_release_archive_for_url(release, dist, url)
+        archive = open_release_archive(release, archive_file) if archive_file is not None else None
+        archive_context = archive
 
-                    return result
+    if archive is not None:
+        with archive_context:
+            try:
+                fp, headers = get_from_archive(url, archive)
+            except KeyError:
+                # The manifest mapped the url to an archive, but the file
+                # is not there.
+                logger.error(
+                    "Release artifact %r not found in archive of release %s", url, release.id
+                )
+                cache.set(cache_key, -1, 60)
+                metrics.timing("sourcemaps.release_artifact_from_archive", time.monotonic() - start)
+                return None
+            except Exception as exc:
+                logger.error("Failed to read %s from release %s", url, release.id, exc_info=exc)
+                # TODO(jjbayer): cache error and return here
+            else:
+                result = fetch_and_cache_artifact(
+                    url,
+                    lambda: fp,
+                    cache_key,
+                    cache_key_meta,
+                    headers,
+                    # Cannot use `compress_file` because `ZipExtFile` does not support chunks
+                    compress_fn=compress,
+                )
+                metrics.timing("sourcemaps.release_artifact_from_archive", time.monotonic() - start)
+
+                return result
 
     # Fall back to maintain compatibility with old releases and versions of
     # sentry-cli which upload files individually
@@ -598,7 +677,7 @@ def fetch_release_artifact(url, release, dist):
     return result
 
 
-def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
+def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True, host_limits=None):
     """
     Pull down a URL, returning a UrlResult object.
 
@@ -606,6 +685,9 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
     event), then the internet. Caches the result of each of those two attempts
     separately, whether or not those attempts are successful. Used for both
     source files and source maps.
+
+    If ``host_limits`` is given, fetches from the internet wait for a free slot
+    for their host.
     """
     # If our url has been truncated, it'd be impossible to fetch
     # so we check for this early and bail
@@ -656,7 +738,9 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
                 headers[token_header] = token
 
         with metrics.timer("sourcemaps.fetch"):
-            with sentry_sdk.start_span(op="JavaScriptStacktraceProcessor.fetch_file.http"):
+            with sentry_sdk.start_span(
+                op="JavaScriptStacktraceProcessor.fetch_file.http"
+            ), host_limits.acquire(url) if host_limits is not None else nullcontext():
                 result = http.fetch_file(url, headers=headers, verify_ssl=verify_ssl)
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.fetch_file.compress_for_cache"
@@ -739,7 +823,9 @@ def get_max_age(headers):
     return min(max_age, CACHE_CONTROL_MAX)
 
 
-def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=True):
+def fetch_sourcemap(
+    url, project=None, release=None, dist=None, allow_scraping=True, host_limits=None
+):
     if is_data_uri(url):
         try:
             body = base64.b64decode(
@@ -760,18 +846,87 @@ def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=T
                 release=release,
                 dist=dist,
                 allow_scraping=allow_scraping,
+                host_limits=host_limits,
             )
         body = result.body
+
+    use_view_cache = options.get("sourcemaps.view-cache-enabled")
+    if use_view_cache:
+        checksum = hashlib.sha1(body).hexdigest()
+        cached = _sourcemap_view_cache.get(checksum)
+        metrics.incr("sourcemaps.view_cache.lookup", tags={"hit": str(cached is not None).lower()})
+        if cached is not None:
+            return cached[1]
+
     try:
         with sentry_sdk.start_span(
             op="JavaScriptStacktraceProcessor.fetch_sourcemap.SourceMapView.from_json_bytes"
         ):
-            return SourceMapView.from_json_bytes(body)
+            sourcemap_view = SourceMapView.from_json_bytes(body)
     except Exception as exc:
         # This is in debug because the product shows an error already.
         logger.debug(str(exc), exc_info=True)
         raise UnparseableSourcemap({"url": http.expose_url(url)})
 
+    if use_view_cache:
+        _sourcemap_view_cache.set(checksum, (len(body), sourcemap_view))
+    return sourcemap_view
+
+
+class HostLimits:
+    """Bounds the number of concurrent fetches from the same host."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.limit)
+        with semaphore:
+            yield
+
+
+def fetch_concurrently(fetch_func, urls, deadline, **kwargs):
+    """
+    Call ``fetch_func`` for all urls in the fetch thread pool and return a
+    dictionary of url to finished future. Fetches still running at
+    ``deadline`` (a ``time.monotonic`` value) fail with a fetch timeout.
+    """
+    hub = Hub(Hub.current)
+
+    def fetch(url):
+        try:
+            with hub:
+                return fetch_func(url, **kwargs)
+        finally:
+            close_old_connections()
+
+    futures = {url: _fetch_thread_pool.submit(fetch, url) for url in urls}
+    wait(futures.values(), timeout=max(deadline - time.monotonic(), 0))
+
+    for url, future in futures.items():
+        if not future.done():
+            future.cancel()
+            futures[url] = timed_out = Future()
+            timed_out.set_exception(
+                http.CannotFetch(
+                    {
+                        "type": EventError.FETCH_TIMEOUT,
+                        "url": http.expose_url(url),
+                        "timeout": settings.SENTRY_SOURCE_FETCH_CONCURRENT_TIMEOUT,
+                    }
+                )
+            )
+            metrics.incr("sourcemaps.prefetch.timeout", skip_internal=True)
+
+    return futures
+
 
 def is_data_uri(url):
     return url[:BASE64_PREAMBLE_LENGTH] == BASE64_SOURCEMAP_PREAMBLE
@@ -840,6 +995,10 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
         self.fetch_count = 0
         self.sourcemaps_touched = set()
 
+        # url -> finished future of fetch_file/fetch_sourcemap, see prefetch_sources
+        self._prefetched_files = {}
+        self._prefetched_sourcemaps = {}
+
         # cache holding mangled code, original code, and errors associated with
         # each abs_path in the stacktrace
         self.cache = SourceCache()
@@ -1162,13 +1321,16 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 op="JavaScriptStacktraceProcessor.cache_source.fetch_file"
             ) as span:
                 span.set_data("filename", filename)
-                result = fetch_file(
-                    filename,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
-                )
+                if filename in self._prefetched_files:
+                    result = self._prefetched_files.pop(filename).result()
+                else:
+                    result = fetch_file(
+                        filename,
+                        project=self.project,
+                        release=self.release,
+                        dist=self.dist,
+                        allow_scraping=self.allow_scraping,
+                    )
         except http.BadSource as exc:
             # most people don't upload release artifacts for their third-party libraries,
             # so ignore missing node_modules files
@@ -1200,13 +1362,16 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 op="JavaScriptStacktraceProcessor.cache_source.fetch_sourcemap"
             ) as span:
                 span.set_data("sourcemap_url", sourcemap_url)
-                sourcemap_view = fetch_sourcemap(
-                    sourcemap_url,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
-                )
+                if sourcemap_url in self._prefetched_sourcemaps:
+                    sourcemap_view = self._prefetched_sourcemaps.pop(sourcemap_url).result()
+                else:
+                    sourcemap_view = fetch_sourcemap(
+                        sourcemap_url,
+                        project=self.project,
+                        release=self.release,
+                        dist=self.dist,
+                        allow_scraping=self.allow_scraping,
+                    )
         except http.BadSource as exc:
             # we don't perform the same check here as above, because if someone has
             # uploaded a node_modules file, which has a sourceMappingURL, they
@@ -1230,6 +1395,50 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 if source_view is not None:
                     self.cache.add(non_standard_url_join(sourcemap_url, source_name), source_view)
 
+    def prefetch_sources(self, filenames):
+        """
+        Fetch source files and then their sourcemaps concurrently, ahead of
+        ``cache_source``. Results and errors are only recorded once
+        ``cache_source`` picks them up, so they end up in the caches in the
+        same order as without prefetching.
+        """
+        deadline = time.monotonic() + settings.SENTRY_SOURCE_FETCH_CONCURRENT_TIMEOUT
+        fetch_kwargs = {
+            "project": self.project,
+            "release": self.release,
+            "dist": self.dist,
+            "allow_scraping": self.allow_scraping,
+            "host_limits": HostLimits(settings.SENTRY_SOURCE_FETCH_CONCURRENCY_PER_HOST),
+        }
+
+        # cache_source gives up on files past max_fetches without fetching them
+        filenames = filenames[: max(self.max_fetches - self.fetch_count, 0)]
+        self._prefetched_files = fetch_concurrently(fetch_file, filenames, deadline, **fetch_kwargs)
+
+        sourcemap_urls = []
+        for future in self._prefetched_files.values():
+            if future.exception() is not None:
+                continue
+            try:
+                sourcemap_url = discover_sourcemap(future.result())
+            except Exception:
+                # Left for cache_source to run into
+                continue
+            if (
+                sourcemap_url
+                and sourcemap_url not in self.sourcemaps
+                and sourcemap_url not in sourcemap_urls
+            ):
+                sourcemap_urls.append(sourcemap_url)
+
+        self._prefetched_sourcemaps = fetch_concurrently(
+            fetch_sourcemap, sourcemap_urls, deadline, **fetch_kwargs
+        )
+        metrics.timing(
+            "sourcemaps.prefetch.count",
+            len(self._prefetched_files) + len(self._prefetched_sourcemaps),
+        )
+
     def populate_source_cache(self, frames):
         """
         Fetch all sources that we know are required (being referenced directly
@@ -1251,6 +1460,13 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 continue
             pending_file_list.add(f["abs_path"])
 
+        pending_file_list = list(pending_file_list)
+        if len(pending_file_list) > 1 and options.get("sourcemaps.concurrent-fetch-enabled"):
+            with sentry_sdk.start_span(
+                op="JavaScriptStacktraceProcessor.populate_source_cache.prefetch_sources"
+            ):
+                self.prefetch_sources(pending_file_list)
+
         for idx, filename in enumerate(pending_file_list):
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.populate_source_cache.cache_source"
@@ -4,6 +4,9 @@ from typing import Set
 
 from symbolic import ParseDebugIdError, normalize_debug_id
 
+from sentry import options
+from sentry.app import locks
+from sentry.cache import default_cache
 from sentry.lang.native.error import SymbolicationFailed, write_error
 from sentry.lang.native.symbolicator import Symbolicator
 from sentry.lang.native.utils import (
@@ -20,7 +23,12 @@ from sentry.lang.native.utils import (
 from sentry.models import EventError, Project
 from sentry.stacktraces.functions import trim_function_name
 from sentry.stacktraces.processing import find_stacktraces_in_data
+from sentry.tasks.symbolication import RetrySymbolication
+from sentry.utils import json, metrics
+from sentry.utils.cache import cache
+from sentry.utils.hashlib import md5_text
 from sentry.utils.in_app import is_known_third_party, is_optional_package
+from sentry.utils.locking import UnableToAcquireLock
 from sentry.utils.safe import get_path, set_path, setdefault_path, trim
 
 logger = logging.getLogger(__name__)
@@ -34,6 +42,15 @@ MINIDUMP_ATTACHMENT_TYPE = "event.minidump"
 # Attachment type used for Apple Crash Reports
 APPLECRASHREPORT_ATTACHMENT_TYPE = "event.applecrashreport"
 
+# Seconds to keep completed Symbolicator responses for identical payloads
+PAYLOAD_RESPONSE_CACHE_TIMEOUT = 300
+
+# Seconds a worker may hold the lock while it creates a payload request
+PAYLOAD_COALESCE_LOCK_DURATION = 30
+
+# Seconds to wait before retrying while another worker creates the request
+PAYLOAD_COALESCE_RETRY_AFTER = 1
+
 
 def _merge_frame(new_frame, symbolicated, platform="native"):
     # il2cpp events which have the "csharp" platform have good (C#) names
@@ -343,6 +360,78 @@ def get_frames_for_symbolication(frames, data, modules):
     return rv
 
 
+def _get_payload_cache_key(project_id, stacktraces, modules, signal):
+    payload = json.dumps([stacktraces, modules, signal])
+    return f"symbolicator:payload:{project_id}:{md5_text(payload).hexdigest()}"
+
+
+def _symbolicate_payload(symbolicator, project, stacktraces, modules, signal):
+    """
+    Symbolicate the payload, sharing the response with identical payloads of
+    the same project.
+
+    Crash loops send bursts of events with the same modules and stacktraces.
+    Only one worker creates the Symbolicator request of a payload. Its
+    request ID is stored under the payload, so that all workers poll the same
+    request, and the completed response is cached for the following events.
+    """
+    cache_key = _get_payload_cache_key(project.id, stacktraces, modules, signal)
+    response = cache.get(cache_key)
+    if response is not None:
+        metrics.incr("symbolicator.payload_cache.lookup", tags={"result": "hit"})
+        return response
+
+    task_id_cache_key = f"{cache_key}:task"
+    if default_cache.get(task_id_cache_key) is not None:
+        # The request is in flight, poll it like the worker that created it
+        metrics.incr("symbolicator.payload_cache.lookup", tags={"result": "in_flight"})
+        response = symbolicator.process_payload(
+            stacktraces=stacktraces,
+            modules=modules,
+            signal=signal,
+            task_id_cache_key=task_id_cache_key,
+        )
+    else:
+        # The lock is only held while the request is created, never while
+        # polling it.
+        lock = locks.get(
+            f"{cache_key}:lock",
+            duration=PAYLOAD_COALESCE_LOCK_DURATION,
+            name="symbolicator_payload",
+        )
+        try:
+            lock_context = lock.acquire()
+        except UnableToAcquireLock:
+            # Another worker is creating the request. Retry once its request
+            # ID or response is stored instead of sending a duplicate.
+            metrics.incr("symbolicator.payload_cache.lookup", tags={"result": "locked"})
+            raise RetrySymbolication(retry_after=PAYLOAD_COALESCE_RETRY_AFTER)
+
+        with lock_context:
+            # Another worker may have completed the same payload in the meantime
+            response = cache.get(cache_key)
+            if response is not None:
+                metrics.incr("symbolicator.payload_cache.lookup", tags={"result": "coalesced"})
+                return response
+
+            metrics.incr("symbolicator.payload_cache.lookup", tags={"result": "miss"})
+            response = symbolicator.process_payload(
+                stacktraces=stacktraces,
+                modules=modules,
+                signal=signal,
+                task_id_cache_key=task_id_cache_key,
+            )
+            # Cache the response before releasing the lock, so that the next
+            # worker to acquire it does not resend the request.
+            if response.get("status") == "completed":
+                cache.set(cache_key, response, PAYLOAD_RESPONSE_CACHE_TIMEOUT)
+            return response
+
+    if response.get("status") == "completed":
+        cache.set(cache_key, response, PAYLOAD_RESPONSE_CACHE_TIMEOUT)
+    return response
+
+
 def process_payload(data):
     project = Project.objects.get_from_cache(id=data["project"])
 
@@ -371,7 +460,12 @@ def process_payload(data):
 
     signal = signal_from_data(data)
 
-    response = symbolicator.process_payload(stacktraces=stacktraces, modules=modules, signal=signal)
+    if options.get("symbolicator.payload-coalescing-enabled"):
+        response = _symbolicate_payload(symbolicator, project, stacktraces, modules, signal)
+    else:
+        response = symbolicator.process_payload(
+            stacktraces=stacktraces, modules=modules, signal=signal
+        )
 
     if not _handle_response_status(data, response):
         return data
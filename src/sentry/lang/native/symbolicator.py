@@ -153,8 +153,11 @@ class Symbolicator:
 
         self.task_id_cache_key = _task_id_cache_key_for_event(project.id, event_id)
 
-    def _process(self, create_task, task_name):
-        task_id = default_cache.get(self.task_id_cache_key)
+    def _process(self, create_task, task_name, task_id_cache_key=None):
+        if task_id_cache_key is None:
+            task_id_cache_key = self.task_id_cache_key
+
+        task_id = default_cache.get(task_id_cache_key)
         json_response = None
 
         with self.sess:
@@ -190,13 +193,13 @@ class Symbolicator:
             # first one to poll it.
             if json_response["status"] == "pending":
                 default_cache.set(
-                    self.task_id_cache_key, json_response["request_id"], REQUEST_CACHE_TIMEOUT
+                    task_id_cache_key, json_response["request_id"], REQUEST_CACHE_TIMEOUT
                 )
                 raise RetrySymbolication(retry_after=json_response["retry_after"])
             else:
                 # Once we arrive here, we are done processing. Clean up the
                 # task id from the cache.
-                default_cache.delete(self.task_id_cache_key)
+                default_cache.delete(task_id_cache_key)
                 metrics.timing(
                     "events.symbolicator.response.completed.size", len(json.dumps(json_response))
                 )
@@ -211,12 +214,13 @@ class Symbolicator:
             "process_applecrashreport",
         )
 
-    def process_payload(self, stacktraces, modules, signal=None):
+    def process_payload(self, stacktraces, modules, signal=None, task_id_cache_key=None):
         return self._process(
             lambda: self.sess.symbolicate_stacktraces(
                 stacktraces=stacktraces, modules=modules, signal=signal
             ),
             "symbolicate_stacktraces",
+            task_id_cache_key=task_id_cache_key,
         )
 
 
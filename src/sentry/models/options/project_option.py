@@ -71,6 +71,37 @@ class ProjectOptionManager(OptionManager["Project"]):
         values: Mapping[str, Value] = self._option_cache.get(cache_key, {})
         return values
 
+    def get_all_values_bulk(self, projects: Sequence[Project]) -> Mapping[int, Mapping[str, Value]]:
+        """
+        Like ``get_all_values`` for many projects, with a single cache and
+        database lookup for all projects that are not in the local cache.
+        """
+        cache_keys = {}
+        for project in projects:
+            cache_key = self._make_key(project.id)
+            if cache_key not in self._option_cache:
+                cache_keys[cache_key] = project.id
+
+        if cache_keys:
+            cached = cache.get_many(list(cache_keys))
+            missing: dict[int, dict[str, Value]] = {}
+            for cache_key, project_id in cache_keys.items():
+                if cached.get(cache_key) is None:
+                    missing[project_id] = {}
+                else:
+                    self._option_cache[cache_key] = cached[cache_key]
+
+            if missing:
+                for option in self.filter(project_id__in=list(missing)):
+                    missing[option.project_id][option.key] = option.value
+                results = {
+                    self._make_key(project_id): values for project_id, values in missing.items()
+                }
+                cache.set_many(results)
+                self._option_cache.update(results)
+
+        return {project.id: self._option_cache[self._make_key(project.id)] for project in projects}
+
     def reload_cache(self, project_id: int, update_reason: str) -> Mapping[str, Value]:
         if update_reason != "projectoption.get_all_values":
             # this hook may be called from model hooks during an
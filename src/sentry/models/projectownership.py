@@ -4,10 +4,12 @@ from django.db import models
 from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 
+from sentry import options
 from sentry.db.models import Model, sane_repr
 from sentry.db.models.fields import FlexibleForeignKey, JSONField
 from sentry.models import ActorTuple
 from sentry.ownership.grammar import Rule, load_schema, resolve_actors
+from sentry.ownership.matcher import get_compiled_schema
 from sentry.utils import metrics
 from sentry.utils.cache import cache
 
@@ -107,7 +109,17 @@ class ProjectOwnership(Model):
         codeowners = ProjectCodeOwners.get_codeowners_cached(project_id)
         ownership.schema = cls.get_combined_schema(ownership, codeowners)
 
-        rules = cls._matching_ownership_rules(ownership, project_id, data)
+        rules = cls._matching_ownership_rules(
+            ownership,
+            project_id,
+            data,
+            schema_key=(
+                "combined",
+                project_id,
+                ownership.last_updated if ownership.pk else None,
+                codeowners.date_updated if codeowners else None,
+            ),
+        )
 
         if not rules:
             return cls.Everyone if ownership.fallthrough else [], None
@@ -159,9 +171,21 @@ class ProjectOwnership(Model):
             if not ownership:
                 ownership = cls(project_id=project_id)
 
-            ownership_rules = cls._matching_ownership_rules(ownership, project_id, data)
+            ownership_rules = cls._matching_ownership_rules(
+                ownership,
+                project_id,
+                data,
+                schema_key=("ownership", project_id, ownership.last_updated),
+            )
             codeowners_rules = (
-                cls._matching_ownership_rules(codeowners, project_id, data) if codeowners else []
+                cls._matching_ownership_rules(
+                    codeowners,
+                    project_id,
+                    data,
+                    schema_key=("codeowners", project_id, codeowners.date_updated),
+                )
+                if codeowners
+                else []
             )
 
             if not (codeowners_rules or ownership_rules):
@@ -193,10 +217,23 @@ class ProjectOwnership(Model):
 
     @classmethod
     def _matching_ownership_rules(
-        cls, ownership: "ProjectOwnership", project_id: int, data: Mapping[str, Any]
+        cls,
+        ownership: "ProjectOwnership",
+        project_id: int,
+        data: Mapping[str, Any],
+        schema_key: Optional[Tuple[Any, ...]] = None,
     ) -> Sequence["Rule"]:
+        """
+        Return the rules of the ownership's schema that match the event data.
+
+        ``schema_key`` identifies the version of the schema, it enables
+        matching with a compiled schema cached in-process.
+        """
         rules = []
         if ownership.schema is not None:
+            if schema_key is not None and options.get("ownership.compiled-matcher-enabled"):
+                return get_compiled_schema(schema_key, ownership.schema).matching_rules(data)
+
             for rule in load_schema(ownership.schema):
                 if rule.test(data):
                     rules.append(rule)
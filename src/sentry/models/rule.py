@@ -74,14 +74,16 @@ class Rule(Model):
 
     def delete(self, *args, **kwargs):
         rv = super().delete(*args, **kwargs)
-        cache_key = f"project:{self.project_id}:rules"
-        cache.delete(cache_key)
+        cache.delete_many(
+            [f"project:{self.project_id}:rules", f"project:{self.project_id}:rules-prefilter"]
+        )
         return rv
 
     def save(self, *args, **kwargs):
         rv = super().save(*args, **kwargs)
-        cache_key = f"project:{self.project_id}:rules"
-        cache.delete(cache_key)
+        cache.delete_many(
+            [f"project:{self.project_id}:rules", f"project:{self.project_id}:rules-prefilter"]
+        )
         return rv
 
     def get_audit_log_data(self):
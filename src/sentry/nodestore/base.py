@@ -1,10 +1,13 @@
+from collections.abc import Mapping
 from threading import local
 
 import sentry_sdk
 from django.core.cache import InvalidCacheBackendError, caches
 
-from sentry.utils import json
+from sentry import options
+from sentry.utils import json, metrics
 from sentry.utils.cache import memoize
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.services import Service
 
 # Cache an instance of the encoder we want to use
@@ -22,6 +25,58 @@ json_dumps = json.JSONEncoder(
 
 json_loads = json._default_decoder.decode
 
+# The in-process cache holds the raw (decompressed) bytes of a node, so that
+# all subkeys can be served from it and every hit decodes into a fresh object
+# that callers are free to mutate.
+LOCAL_CACHE_MAX_BYTES = 50 * 1024 * 1024
+LOCAL_CACHE_TTL = 30
+
+_local_cache = LRUCache(LOCAL_CACHE_MAX_BYTES, ttl=LOCAL_CACHE_TTL, sizeof=len)
+
+# Prefix of the framed layout, see ``NodeStorage._encode_framed``. Legacy
+# payloads always start with a JSON value and can never start with a NUL byte.
+FRAMED_MAGIC = b"\x00nsf1\n"
+
+
+class LazyNodePayload(Mapping):
+    """
+    A read-only view of a framed node payload that decodes every top-level
+    key on first access. The view keeps a reference to the decompressed
+    bytes, so values are decoded straight from the buffer they were read
+    into.
+    """
+
+    def __init__(self, buffer, fields):
+        self._buffer = buffer
+        self._fields = {key: (start, end) for key, start, end in fields}
+        self._values = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        start, end = self._fields[key]
+        rv = self._values[key] = json_loads(bytes(self._buffer[start:end]))
+        return rv
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: keys={list(self._fields)!r}>"
+
+    def to_dict(self):
+        """Decode all remaining keys and return the payload as a regular dict."""
+        return {key: self[key] for key in self._fields}
+
 
 class NodeStorage(local, Service):
     """
@@ -88,10 +143,13 @@ class NodeStorage(local, Service):
         for id in id_list:
             self.delete(id)
 
-    def _decode(self, value, subkey):
+    def _decode(self, value, subkey, lazy=False):
         if value is None:
             return None
 
+        if value.startswith(FRAMED_MAGIC):
+            return self._decode_framed(value, subkey, lazy=lazy)
+
         lines_iter = iter(value.splitlines())
         try:
             if subkey is not None:
@@ -112,6 +170,29 @@ class NodeStorage(local, Service):
         except StopIteration:
             return None
 
+    def _decode_framed(self, value, subkey, lazy=False):
+        """
+        Decode a payload written by ``_encode_framed``. Only the requested
+        subkey is decoded. With ``lazy``, dictionaries are returned as a
+        ``LazyNodePayload`` that decodes its keys on access.
+        """
+        header_end = value.index(b"\n", len(FRAMED_MAGIC))
+        sections = json_loads(value[len(FRAMED_MAGIC) : header_end])
+        buffer = memoryview(value)[header_end + 1 :]
+
+        for section_subkey, span, fields in sections:
+            if section_subkey != subkey:
+                continue
+
+            if fields is None:
+                start, end = span
+                return json_loads(bytes(buffer[start:end]))
+
+            rv = LazyNodePayload(buffer, fields)
+            return rv if lazy else rv.to_dict()
+
+        return None
+
     def _get_bytes(self, id):
         """
         >>> nodestore._get_bytes('key1')
@@ -119,13 +200,21 @@ class NodeStorage(local, Service):
         """
         raise NotImplementedError
 
-    def get(self, id, subkey=None):
+    def get(self, id, subkey=None, lazy=False):
         """
         >>> nodestore.get('key1')
         {"message": "hello world"}
+
+        With ``lazy``, nodes stored in the framed layout are returned as a
+        ``LazyNodePayload``. Other nodes are returned as usual.
         """
         with sentry_sdk.start_span(op="nodestore.get") as span:
             span.set_tag("node_id", id)
+            bytes_data = self._get_local_cache_items([id]).get(id)
+            if bytes_data is not None:
+                span.set_tag("origin", "from_local_cache")
+                return self._decode(bytes_data, subkey=subkey, lazy=lazy)
+
             if subkey is None:
                 item_from_cache = self._get_cache_item(id)
                 if item_from_cache:
@@ -135,10 +224,12 @@ class NodeStorage(local, Service):
 
             span.set_tag("subkey", str(subkey))
             bytes_data = self._get_bytes(id)
-            rv = self._decode(bytes_data, subkey=subkey)
-            if subkey is None:
+            self._record_fetch({id: bytes_data})
+            rv = self._decode(bytes_data, subkey=subkey, lazy=lazy)
+            if subkey is None and not isinstance(rv, LazyNodePayload):
                 # set cache item only after we know decoding did not fail
                 self._set_cache_item(id, rv)
+            self._set_local_cache_items({id: bytes_data})
 
             span.set_tag("result", "from_service")
             if bytes_data:
@@ -157,7 +248,7 @@ class NodeStorage(local, Service):
         """
         return {id: self._get_bytes(id) for id in id_list}
 
-    def get_multi(self, id_list, subkey=None):
+    def get_multi(self, id_list, subkey=None, lazy=False):
         """
         >>> nodestore.get_multi(['key1', 'key2')
         {
@@ -169,23 +260,44 @@ class NodeStorage(local, Service):
             span.set_tag("subkey", str(subkey))
             span.set_tag("num_ids", len(id_list))
 
+            local_items = {
+                id: self._decode(value, subkey=subkey, lazy=lazy)
+                for id, value in self._get_local_cache_items(id_list).items()
+            }
+            if len(local_items) == len(id_list):
+                span.set_tag("result", "from_local_cache")
+                return local_items
+
+            id_list = [id for id in id_list if id not in local_items]
+
             if subkey is None:
                 cache_items = self._get_cache_items(id_list)
                 if len(cache_items) == len(id_list):
                     span.set_tag("result", "from_cache")
+                    cache_items.update(local_items)
                     return cache_items
 
                 uncached_ids = [id for id in id_list if id not in cache_items]
             else:
                 uncached_ids = id_list
 
+            bytes_items = self._get_bytes_multi(uncached_ids)
+            self._record_fetch(bytes_items)
             items = {
-                id: self._decode(value, subkey=subkey)
-                for id, value in self._get_bytes_multi(uncached_ids).items()
+                id: self._decode(value, subkey=subkey, lazy=lazy)
+                for id, value in bytes_items.items()
             }
             if subkey is None:
-                self._set_cache_items(items)
+                self._set_cache_items(
+                    {
+                        id: value
+                        for id, value in items.items()
+                        if not isinstance(value, LazyNodePayload)
+                    }
+                )
                 items.update(cache_items)
+            self._set_local_cache_items(bytes_items)
+            items.update(local_items)
 
             span.set_tag("result", "from_service")
             span.set_tag("found", len(items))
@@ -201,6 +313,9 @@ class NodeStorage(local, Service):
         >>> _encode({"unprocessed": {}, None: {"stacktrace": {}}})
         b'{"stacktrace": {}}\nunprocessed\n{}'
         """
+        if options.get("nodestore.framed-encoding"):
+            return self._encode_framed(data)
+
         lines = [json_dumps(data.pop(None)).encode("utf8")]
         for key, value in data.items():
             lines.append(key.encode("ascii"))
@@ -208,6 +323,37 @@ class NodeStorage(local, Service):
 
         return b"\n".join(lines)
 
+    def _encode_framed(self, data):
+        """
+        Encode data dict into a framed layout, where every top-level key of
+        every subkey can be decoded on its own.
+
+        The payload starts with ``FRAMED_MAGIC``, followed by a JSON header
+        line and the concatenated JSON values. The header lists
+        ``[subkey, span, fields]`` for every subkey, where ``fields`` holds
+        ``[key, start, end]`` for every top-level key of a dict value, and
+        ``span`` is ``[start, end]`` of any other value.
+        """
+        chunks = []
+        offset = 0
+
+        def write(value):
+            nonlocal offset
+            chunk = json_dumps(value).encode("utf8")
+            chunks.append(chunk)
+            offset += len(chunk)
+            return [offset - len(chunk), offset]
+
+        sections = []
+        for subkey, value in [(None, data.pop(None))] + list(data.items()):
+            if isinstance(value, dict):
+                fields = [[key, *write(value[key])] for key in sorted(value)]
+                sections.append([subkey, None, fields])
+            else:
+                sections.append([subkey, write(value), None])
+
+        return b"".join([FRAMED_MAGIC, json_dumps(sections).encode("utf8"), b"\n", *chunks])
+
     def _set_bytes(self, id, data, ttl=None):
         """
         >>> nodestore.set('key1', b"{'foo': 'bar'}")
@@ -245,6 +391,7 @@ class NodeStorage(local, Service):
             self._set_bytes(id, bytes_data, ttl=ttl)
             # set cache only after encoding and write to nodestore has succeeded
             self._set_cache_item(id, cache_item)
+            _local_cache.delete(id)
 
     def cleanup(self, cutoff_timestamp):
         raise NotImplementedError
@@ -270,13 +417,44 @@ class NodeStorage(local, Service):
             self.cache.set_many(items)
 
     def _delete_cache_item(self, id):
+        _local_cache.delete(id)
         if self.cache:
             self.cache.delete(id)
 
     def _delete_cache_items(self, id_list):
+        _local_cache.delete_many(id_list)
         if self.cache:
             self.cache.delete_many([id for id in id_list])
 
+    def _is_local_cache_enabled(self):
+        return options.get("nodestore.local-cache-enabled")
+
+    def _get_local_cache_items(self, id_list):
+        if not self._is_local_cache_enabled():
+            return {}
+
+        rv = _local_cache.get_many(id_list)
+        metrics.incr("nodestore.local_cache.lookup", amount=len(rv), tags={"hit": "true"})
+        metrics.incr(
+            "nodestore.local_cache.lookup", amount=len(id_list) - len(rv), tags={"hit": "false"}
+        )
+        return rv
+
+    def _set_local_cache_items(self, items):
+        if not self._is_local_cache_enabled():
+            return
+
+        for id, bytes_data in items.items():
+            if bytes_data is not None:
+                _local_cache.set(id, bytes_data)
+
+    def _record_fetch(self, items):
+        """Report how many nodes, and how many bytes, were read from the backend."""
+        metrics.incr("nodestore.fetch", amount=len(items))
+        for bytes_data in items.values():
+            if bytes_data is not None:
+                metrics.timing("nodestore.fetch.bytes", len(bytes_data))
+
     @memoize
     def cache(self):
         try:
@@ -5,7 +5,7 @@ import pickle
 from django.utils import timezone
 
 from sentry.db.models import create_or_update
-from sentry.nodestore.base import NodeStorage
+from sentry.nodestore.base import FRAMED_MAGIC, NodeStorage
 from sentry.utils.strings import compress, decompress
 
 from .models import Node
@@ -18,13 +18,13 @@ class DjangoNodeStorage(NodeStorage):
         Node.objects.filter(id=id).delete()
         self._delete_cache_item(id)
 
-    def _decode(self, value, subkey):
+    def _decode(self, value, subkey, lazy=False):
         if value is None:
             return None
 
         try:
-            if value.startswith(b"{"):
-                return NodeStorage._decode(self, value, subkey=subkey)
+            if value.startswith(b"{") or value.startswith(FRAMED_MAGIC):
+                return NodeStorage._decode(self, value, subkey=subkey, lazy=lazy)
 
             if subkey is None:
                 return pickle.loads(value)
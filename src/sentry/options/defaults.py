@@ -49,6 +49,11 @@ register(
 )
 register("redis.options", type=Dict, flags=FLAG_NOSTORE)
 
+# Buffers
+# Flush the pending keys of the Redis buffer in bulk under the pending lock
+# instead of spawning one process_incr task per batch of keys.
+register("buffer.redis.bulk-flush", default=False)
+
 # Processing worker caches
 register(
     "dsym.cache-path", type=String, default="/tmp/sentry-dsym-cache", flags=FLAG_PRIORITIZE_DISK
@@ -66,6 +71,18 @@ register(
     default=1024 * 1024 * 1024,
     flags=FLAG_PRIORITIZE_DISK,
 )
+# Keep parsed sourcemaps in-process across events, see
+# sentry.lang.javascript.processor.fetch_sourcemap.
+register("sourcemaps.view-cache-enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Fetch the sources and sourcemaps of an event concurrently, see
+# JavaScriptStacktraceProcessor.prefetch_sources.
+register("sourcemaps.concurrent-fetch-enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Keep release archives open and artifact indexes decoded across events, see
+# sentry.lang.javascript.processor.get_pooled_release_archive_for_url.
+register("sourcemaps.release-archive-pool-enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Share the results of stacktrace processors for identical frames across events, see
+# sentry.stacktraces.processing.lookup_frame_results.
+register("processing.frame-result-cache-enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
 
 
 # Mail
@@ -161,6 +178,13 @@ register(
 # it break everywhere.
 register("symbolicator.ignored_sources", type=Sequence, default=(), flags=FLAG_ALLOW_EMPTY)
 
+# Share Symbolicator responses between events with identical native stacktraces and modules, with
+# a single request in flight per payload.
+register("symbolicator.payload-coalescing-enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Deliver up to this many due digests per task, see sentry.tasks.digests.deliver_digests. Digests
+# are delivered one per task if this is 0.
+register("digests.delivery-batch-size", default=0, flags=FLAG_PRIORITIZE_DISK)
+
 # Backend chart rendering via chartcuterie
 register("chart-rendering.enabled", default=False, flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
 register(
@@ -319,9 +343,31 @@ register("outcomes.tsdb-in-consumer-sample-rate", default=0.0)  # unused
 register("nodedata.cache-sample-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
 register("nodedata.cache-on-save", default=False, flags=FLAG_PRIORITIZE_DISK)
 
+# Keep recently read node payloads in an in-process LRU
+register("nodestore.local-cache-enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Fetch all unfetched nodes of a request with one get_multi on first access
+register("nodestore.request-batching-enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Write nodes in the framed layout that allows decoding single keys. Only
+# enable once every reader understands the layout.
+register("nodestore.framed-encoding", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Decode top-level keys of framed nodes on access
+register("nodestore.lazy-decode", default=False, flags=FLAG_PRIORITIZE_DISK)
+
 # Use nodestore for eventstore.get_events
 register("eventstore.use-nodestore", default=False, flags=FLAG_PRIORITIZE_DISK)
 
+# Serve EventFrequencyCondition from batched TSDB range reads and a short-lived
+# per-group cache, see sentry.rules.conditions.event_frequency.
+register("rules.event-frequency-batching", default=False, flags=FLAG_PRIORITIZE_DISK)
+
+# Skip rules whose cheap conditions (event state, level, tag presence, some event
+# attributes) cannot match an event, see sentry.rules.prefilter.
+register("rules.prefilter-enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+
+# Match ownership rules and CODEOWNERS with a compiled schema cached in-process,
+# see sentry.ownership.matcher.
+register("ownership.compiled-matcher-enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+
 # Alerts / Workflow incremental rollout rate. Tied to feature handlers in getsentry
 register("workflow.rollout-rate", default=0, flags=FLAG_PRIORITIZE_DISK)
 
@@ -360,6 +406,17 @@ register("store.reprocessing-force-disable", default=False)
 
 register("store.race-free-group-creation-force-disable", default=False)
 
+# Resolve grouphashes of existing groups through sentry.grouping.grouphash_cache
+# instead of querying GroupHash for every event.
+register("store.grouphash-cache-enabled", default=False)
+
+# Cache the calculated hashes of events by their grouping inputs, see
+# sentry.grouping.hash_cache. The Redis tier is optional, the verify sample
+# rate is the share of cache hits that are recomputed and compared.
+register("store.grouping-hash-cache-enabled", default=False)
+register("store.grouping-hash-cache-redis-enabled", default=False)
+register("store.grouping-hash-cache-verify-sample-rate", default=0.0)
+
 
 # ## sentry.killswitches
 #
@@ -408,6 +465,10 @@ register("relay.drop-transaction-metrics", default=[])
 #       given fraction of orgs even if the corresponding feature flag is disabled.
 register("relay.transaction-metrics-org-sample-rate", default=0.0)
 
+# Store the ``config`` section of cached project configs once per distinct
+# content, referenced by its digest, instead of once per public key.
+register("relay.project-config-cache.shared-sections", default=False, flags=FLAG_PRIORITIZE_DISK)
+
 # Write new kafka headers in eventstream
 register("eventstream:kafka-headers", default=False)
 
@@ -435,6 +496,10 @@ register("performance.suspect-spans-ingestion.rollout-rate", default=0)
 # special save_event task for transactions avoiding the preprocess.
 register("store.save-transactions-ingest-consumer-rate", default=0.0)
 
+# Save error events that need no processing directly in the ingest consumer,
+# one batch per consumer flush, instead of spawning preprocess/save_event tasks.
+register("store.save-errors-ingest-consumer-batch", default=False)
+
 # Drop delete_old_primary_hash messages for a particular project.
 register("reprocessing2.drop-delete-old-primary-hash", default=[])
 
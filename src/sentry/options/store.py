@@ -2,6 +2,8 @@ import logging
 from collections import namedtuple
 from random import random
 from time import time
+from types import MappingProxyType
+from uuid import uuid4
 
 from django.db.utils import OperationalError, ProgrammingError
 from django.utils import timezone
@@ -11,9 +13,14 @@ from sentry.utils.hashlib import md5_text
 
 Key = namedtuple("Key", ("name", "default", "type", "flags", "ttl", "grace", "cache_key"))
 
+Snapshot = namedtuple("Snapshot", ("version", "values"))
+
 CACHE_FETCH_ERR = "Unable to fetch option cache for %s"
 CACHE_UPDATE_ERR = "Unable to update option cache for %s"
 
+# Network cache key holding the current version of the stored options.
+VERSION_CACHE_KEY = "o:version"
+
 logger = logging.getLogger("sentry")
 
 
@@ -41,6 +48,10 @@ class OptionsStore:
     def __init__(self, cache=None, ttl=None):
         self.cache = cache
         self.ttl = ttl
+        self.snapshot_interval = 0
+        self.publisher = None
+        self.channel = None
+        self.subscriber = None
         self.flush_local_cache()
 
     @cached_property
@@ -56,6 +67,11 @@ class OptionsStore:
         """
         Fetches a value from the options store.
         """
+        if self.snapshot_interval:
+            snapshot = self.get_snapshot(silent=silent)
+            if snapshot is not None:
+                return snapshot.values.get(key.name)
+
         result = self.get_cache(key, silent=silent)
         if result is not None:
             return result
@@ -93,6 +109,90 @@ class OptionsStore:
 
         return value
 
+    def enable_snapshots(self, interval, publisher=None, channel=None, subscriber=None):
+        """
+        Serve options from a snapshot of all stored options, instead of
+        fetching them one by one through the caches.
+
+        The snapshot is reloaded when the version of the stored options
+        changes, which is checked at most every ``interval`` seconds. If a
+        ``publisher`` is given, writers also publish the new version to
+        ``channel``, so that subscribed processes can call
+        ``invalidate_snapshot`` to pick up changes right away.
+
+        ``subscriber`` is started on the first snapshot read of every
+        process, so that forked workers listen as well.
+        """
+        self.snapshot_interval = interval
+        self.publisher = publisher
+        self.channel = channel
+        self.subscriber = subscriber
+
+    def get_snapshot(self, silent=False):
+        """
+        Returns the current snapshot of all stored options, reloading it if
+        the version of the stored options has changed.
+
+        Returns None if no snapshot can be loaded, in which case options are
+        fetched through the caches.
+        """
+        if self.cache is None:
+            return None
+
+        if self.subscriber is not None:
+            self.subscriber.start()
+
+        now = time()
+        snapshot = self._snapshot
+        if snapshot is not None and now < self._snapshot_checked + self.snapshot_interval:
+            return snapshot
+
+        try:
+            version = self.cache.get(VERSION_CACHE_KEY)
+        except Exception:
+            if not silent:
+                logger.warning(CACHE_FETCH_ERR, VERSION_CACHE_KEY, exc_info=True)
+            return snapshot
+
+        if snapshot is None or snapshot.version != version:
+            try:
+                values = dict(self.model.objects.values_list("key", "value"))
+            except Exception:
+                if not silent:
+                    logger.exception("option.failed-snapshot")
+                return snapshot
+            # The version is read before the options, so a concurrent write
+            # can at worst cause another reload.
+            snapshot = self._snapshot = Snapshot(version, MappingProxyType(values))
+
+        self._snapshot_checked = now
+        return snapshot
+
+    def invalidate_snapshot(self, *args, **kwargs):
+        """
+        Check the version of the stored options on the next read.
+        """
+        self._snapshot_checked = 0
+
+    def bump_version(self):
+        """
+        Changes the version of the stored options, which makes all processes
+        reload their snapshot.
+        """
+        if self.cache is None:
+            return
+
+        version = uuid4().hex
+        try:
+            self.cache.set(VERSION_CACHE_KEY, version, None)
+        except Exception:
+            logger.warning(CACHE_UPDATE_ERR, VERSION_CACHE_KEY, exc_info=True)
+            return
+
+        self.invalidate_snapshot()
+        if self.publisher is not None:
+            self.publisher.publish(self.channel, version)
+
     def get_local_cache(self, key, force_grace=False):
         """
         Attempt to fetch a key out of the local cache.
@@ -190,6 +290,7 @@ class OptionsStore:
         create_or_update(
             model=self.model, key=key.name, values={"value": value, "last_updated": timezone.now()}
         )
+        self.bump_version()
 
     def set_cache(self, key, value):
         if self.cache is None:
@@ -221,6 +322,7 @@ class OptionsStore:
 
     def delete_store(self, key):
         self.model.objects.filter(key=key.name).delete()
+        self.bump_version()
 
     def delete_cache(self, key):
         cache_key = key.cache_key
@@ -269,6 +371,8 @@ class OptionsStore:
         Empty store's local in-process cache.
         """
         self._local_cache = {}
+        self._snapshot = None
+        self._snapshot_checked = 0
 
     def maybe_clean_local_cache(self, **kwargs):
         # Periodically force an expire on the local cache.
@@ -0,0 +1,245 @@
+"""
+A compiled form of an ownership schema, for matching many rules against an
+event at once.
+
+``Rule.test`` extracts the stack frames of the event for every rule and then
+matches every frame value against the rule pattern one by one. Projects that
+sync large CODEOWNERS files end up with thousands of rules, most of which can
+never match a given event. ``CompiledSchema`` instead:
+
+- extracts frame values once per event and matcher type,
+- indexes ``path``, ``module`` and anchored ``codeowners`` rules by the
+  literal prefix of their pattern, so each frame value is only tested
+  against the rules whose prefix it starts with,
+- merges the regexes of all other ``codeowners`` rules into one alternation
+  that rejects frame values none of them match.
+
+Compiled schemas are kept in an in-process cache, keyed by the last modified
+time of the schema's models.
+"""
+
+from __future__ import annotations
+
+import copy
+import re
+from typing import (
+    Any,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+)
+
+from sentry.ownership.grammar import (
+    CODEOWNERS,
+    MODULE,
+    PATH,
+    Matcher,
+    Rule,
+    _path_to_regex,
+    load_schema,
+)
+from sentry.utils import metrics
+from sentry.utils.datastructures import LRUCache
+from sentry.utils.event_frames import find_stack_frames
+from sentry.utils.glob import glob_match
+from sentry.utils.safe import PathSearchable
+
+LOCAL_CACHE_SIZE = 200
+
+# Characters with a special meaning in globs. A literal prefix ends before
+# the first of them.
+GLOB_SPECIAL_CHARS = frozenset("*?[]{}!\\")
+CODEOWNERS_SPECIAL_CHARS = frozenset("*?\\")
+
+_local_cache = LRUCache(LOCAL_CACHE_SIZE)
+
+
+def _get_literal_prefix(pattern: str, special_chars: frozenset[str]) -> str:
+    # Stop at the first non-ASCII character as well, case insensitive globs
+    # fold those differently than ``str.lower``.
+    for i, ch in enumerate(pattern):
+        if ch in special_chars or not ch.isascii():
+            return pattern[:i]
+    return pattern
+
+
+def _get_glob_prefix(pattern: str) -> str:
+    return _get_literal_prefix(pattern, GLOB_SPECIAL_CHARS).lower()
+
+
+def _normalize_glob_value(value: str) -> str:
+    # Path globs match case insensitive and with backslashes as separators.
+    return value.replace("\\", "/").lower()
+
+
+def _get_codeowners_prefix(pattern: str) -> str:
+    """
+    Return the literal prefix of an anchored codeowners pattern, see
+    ``_path_to_regex``. Unanchored patterns can match at any path segment and
+    have no prefix.
+    """
+    if pattern[0] == "\\":
+        return ""
+
+    slash_pos = pattern.find("/")
+    if slash_pos == -1 or slash_pos == len(pattern) - 1:
+        return ""
+
+    if pattern[0] == "/":
+        pattern = pattern[1:]
+    return _get_literal_prefix(pattern.rstrip("/"), CODEOWNERS_SPECIAL_CHARS)
+
+
+def _get_frame_values(frames: Sequence[Mapping[str, Any]], keys: Sequence[str]) -> List[Any]:
+    values = []
+    for frame in frames:
+        if not isinstance(frame, Mapping):
+            continue
+        for key in keys:
+            value = frame.get(key)
+            if value:
+                values.append(value)
+    return values
+
+
+class PrefixIndex:
+    """Maps literal prefixes to the positions of the rules that start with them."""
+
+    def __init__(self) -> None:
+        self._prefixes: MutableMapping[str, List[int]] = {}
+        self._lengths: List[int] = []
+        # Positions of rules without a literal prefix
+        self.unindexed: List[int] = []
+
+    def add(self, prefix: str, pos: int) -> None:
+        if not prefix:
+            self.unindexed.append(pos)
+            return
+        self._prefixes.setdefault(prefix, []).append(pos)
+        if len(prefix) not in self._lengths:
+            self._lengths.append(len(prefix))
+            self._lengths.sort()
+
+    def __bool__(self) -> bool:
+        return bool(self._prefixes or self.unindexed)
+
+    def lookup(self, value: str) -> Iterable[int]:
+        for length in self._lengths:
+            if length > len(value):
+                break
+            yield from self._prefixes.get(value[:length], ())
+
+    def __iter__(self) -> Iterator[int]:
+        for positions in self._prefixes.values():
+            yield from positions
+        yield from self.unindexed
+
+
+class CompiledSchema:
+    def __init__(self, schema: Mapping[str, Any]) -> None:
+        self.rules: Sequence[Rule] = load_schema(schema)
+        # The raw rules this was compiled from, to detect changed schemas that
+        # were saved without bumping their last modified time.
+        self.raw_rules = copy.deepcopy(schema["rules"])
+
+        self._paths = PrefixIndex()
+        self._modules = PrefixIndex()
+        self._codeowners = PrefixIndex()
+        self._codeowners_regexes: MutableMapping[int, Pattern[str]] = {}
+        self._codeowners_unindexed_regex: Optional[Pattern[str]] = None
+        # Rules matched with ``Rule.test``
+        self._other: List[int] = []
+
+        for pos, rule in enumerate(self.rules):
+            matcher_type, pattern = rule.matcher
+            if matcher_type == PATH:
+                self._paths.add(_get_glob_prefix(pattern), pos)
+            elif matcher_type == MODULE:
+                self._modules.add(_get_glob_prefix(pattern), pos)
+            elif matcher_type == CODEOWNERS and pattern:
+                self._codeowners_regexes[pos] = _path_to_regex(pattern)
+                self._codeowners.add(_get_codeowners_prefix(pattern), pos)
+            else:
+                self._other.append(pos)
+
+        if self._codeowners.unindexed:
+            self._codeowners_unindexed_regex = re.compile(
+                "|".join(
+                    f"(?:{self._codeowners_regexes[pos].pattern})"
+                    for pos in self._codeowners.unindexed
+                )
+            )
+
+    def _match_globs(self, index: PrefixIndex, values: Sequence[Any], matched: Set[int]) -> None:
+        for value in values:
+            if isinstance(value, str):
+                candidates = [*index.lookup(_normalize_glob_value(value)), *index.unindexed]
+            else:
+                candidates = list(index)
+            for pos in candidates:
+                if pos not in matched and glob_match(
+                    value, self.rules[pos].matcher.pattern, ignorecase=True, path_normalize=True
+                ):
+                    matched.add(pos)
+
+    def _match_codeowners(self, values: Sequence[Any], matched: Set[int]) -> None:
+        index = self._codeowners
+        for value in values:
+            candidates: List[int] = []
+            if isinstance(value, str):
+                candidates.extend(index.lookup(value))
+                if value.startswith("/"):
+                    candidates.extend(index.lookup(value[1:]))
+                if self._codeowners_unindexed_regex is not None and (
+                    self._codeowners_unindexed_regex.search(value)
+                ):
+                    candidates.extend(index.unindexed)
+            else:
+                candidates.extend(self._codeowners_regexes)
+            for pos in candidates:
+                if pos not in matched and self._codeowners_regexes[pos].search(value):
+                    matched.add(pos)
+
+    def matching_rules(self, data: PathSearchable) -> Sequence[Rule]:
+        """Return the rules matching the event data, in schema order."""
+        matched: Set[int] = set()
+
+        if self._paths or self._codeowners:
+            path_values = _get_frame_values(*Matcher.munge_if_needed(data))
+            if self._paths:
+                self._match_globs(self._paths, path_values, matched)
+            if self._codeowners:
+                self._match_codeowners(path_values, matched)
+
+        if self._modules:
+            module_values = _get_frame_values(find_stack_frames(data), ["module"])
+            self._match_globs(self._modules, module_values, matched)
+
+        for pos in self._other:
+            if self.rules[pos].test(data):
+                matched.add(pos)
+
+        return [rule for pos, rule in enumerate(self.rules) if pos in matched]
+
+
+def get_compiled_schema(key: Hashable, schema: Mapping[str, Any]) -> CompiledSchema:
+    """
+    Return the compiled ``schema``. ``key`` identifies a version of the
+    schema, usually the project and the last modified time of its models.
+    """
+    compiled: Optional[CompiledSchema] = _local_cache.get(key)
+    if compiled is not None and compiled.raw_rules == schema["rules"]:
+        metrics.incr("ownership.compiled_schema.cache", tags={"hit": "true"})
+        return compiled
+
+    metrics.incr("ownership.compiled_schema.cache", tags={"hit": "false"})
+    compiled = CompiledSchema(schema)
+    _local_cache.set(key, compiled)
+    return compiled
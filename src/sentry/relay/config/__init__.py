@@ -1,7 +1,16 @@
 import logging
 import uuid
 from datetime import datetime
-from typing import Any, Collection, Mapping, Optional, Sequence, TypedDict
+from typing import (
+    Any,
+    Collection,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    TypedDict,
+    Union,
+)
 
 import sentry_sdk
 from pytz import utc
@@ -18,7 +27,7 @@ from sentry.ingest.inbound_filters import (
     get_filter_key,
 )
 from sentry.interfaces.security import DEFAULT_DISALLOWED_SOURCES
-from sentry.models import Project
+from sentry.models import Organization, Project, ProjectKeyStatus, ProjectOption
 from sentry.relay.config.metric_extraction import get_metric_conditional_tagging_rules
 from sentry.relay.utils import to_camel_case_name
 from sentry.utils import metrics
@@ -31,14 +40,63 @@ EXPOSABLE_FEATURES = ["organizations:profiling", "organizations:session-replay"]
 logger = logging.getLogger(__name__)
 
 
-def get_exposed_features(project: Project) -> Sequence[str]:
+class FeatureBatch:
+    """
+    Checks feature flags for the projects of one organization. Each project
+    feature is checked for all projects at once with ``has_for_batch``, and
+    each flag is only checked once.
+    """
+
+    def __init__(self, organization: Organization, projects: Sequence[Project]) -> None:
+        self.organization = organization
+        self.projects = projects
+        self._results: MutableMapping[str, Any] = {}
+
+    def _has_for_projects(self, name: str) -> Mapping[Project, bool]:
+        # Prefer the entity handler, like ``get_features_for_projects`` does.
+        batch_features = features.batch_has(
+            [name], projects=self.projects, organization=self.organization
+        )
+        if batch_features:
+            results = {
+                project: batch_features.get(f"project:{project.id}", {}).get(name)
+                for project in self.projects
+            }
+            if all(flag is not None for flag in results.values()):
+                return results
+
+        return features.has_for_batch(name, self.organization, self.projects)
+
+    def has(self, name: str, entity: Union[Organization, Project]) -> bool:
+        if name not in self._results:
+            if name.startswith("organizations:"):
+                self._results[name] = features.has(name, self.organization)
+            else:
+                self._results[name] = self._has_for_projects(name)
+
+        if name.startswith("organizations:"):
+            return bool(self._results[name])
+        return bool(self._results[name][entity])
+
+
+def _has_feature(
+    name: str, entity: Union[Organization, Project], feature_batch: Optional[FeatureBatch] = None
+) -> bool:
+    if feature_batch is not None:
+        return feature_batch.has(name, entity)
+    return features.has(name, entity)
+
+
+def get_exposed_features(
+    project: Project, feature_batch: Optional[FeatureBatch] = None
+) -> Sequence[str]:
 
     active_features = []
     for feature in EXPOSABLE_FEATURES:
         if feature.startswith("organizations:"):
-            has_feature = features.has(feature, project.organization)
+            has_feature = _has_feature(feature, project.organization, feature_batch)
         elif feature.startswith("projects:"):
-            has_feature = features.has(feature, project)
+            has_feature = _has_feature(feature, project, feature_batch)
         else:
             raise RuntimeError("EXPOSABLE_FEATURES must start with 'organizations:' or 'projects:'")
 
@@ -85,7 +143,7 @@ def get_public_key_configs(project, full_config, project_keys=None):
     return public_keys
 
 
-def get_filter_settings(project):
+def get_filter_settings(project, feature_batch=None):
     filter_settings = {}
 
     for flt in get_all_filter_specs():
@@ -93,7 +151,7 @@ def get_filter_settings(project):
         settings = _load_filter_settings(flt, project)
         filter_settings[filter_id] = settings
 
-    if features.has("projects:custom-inbound-filters", project):
+    if _has_feature("projects:custom-inbound-filters", project, feature_batch):
         invalid_releases = project.get_option(f"sentry:{FilterTypes.RELEASES}")
         if invalid_releases:
             filter_settings["releases"] = {"releases": invalid_releases}
@@ -120,7 +178,7 @@ def get_quotas(project, keys=None):
     return [quota.to_json() for quota in quotas.get_quotas(project, keys=keys)]
 
 
-def get_project_config(project, full_config=True, project_keys=None):
+def get_project_config(project, full_config=True, project_keys=None, feature_batch=None):
     """Constructs the ProjectConfig information.
 
     :param project: The project to load configuration for. Ensure that
@@ -133,16 +191,47 @@ def get_project_config(project, full_config=True, project_keys=None):
         no project keys are provided it is assumed that the config does not
         need to contain auth information (this is the case when used in
         python's StoreView)
+    :param feature_batch: A :class:`FeatureBatch` to check feature flags
+        with, when computing the configs of many projects of an organization.
 
     :return: a ProjectConfig object for the given project
     """
     with sentry_sdk.push_scope() as scope:
         scope.set_tag("project", project.id)
         with metrics.timer("relay.config.get_project_config.duration"):
-            return _get_project_config(project, full_config=full_config, project_keys=project_keys)
+            return _get_project_config(
+                project,
+                full_config=full_config,
+                project_keys=project_keys,
+                feature_batch=feature_batch,
+            )
+
+
+def get_project_key_configs(organization, project_keys):
+    """Computes the full configs of many project keys of one organization.
 
+    The keys must have their project bound, and the projects their organization.
+    The options and feature flags of all projects are loaded in bulk before the
+    configs are computed.
 
-def _get_project_config(project, full_config=True, project_keys=None):
+    :returns: A dict mapping the public keys to their config.
+    """
+    projects = list({key.project_id: key.project for key in project_keys}.values())
+    ProjectOption.objects.get_all_values_bulk(projects)
+    feature_batch = FeatureBatch(organization, projects)
+
+    configs = {}
+    for key in project_keys:
+        if key.status != ProjectKeyStatus.ACTIVE:
+            configs[key.public_key] = {"disabled": True}
+        else:
+            configs[key.public_key] = get_project_config(
+                key.project, project_keys=[key], full_config=True, feature_batch=feature_batch
+            ).to_dict()
+    return configs
+
+
+def _get_project_config(project, full_config=True, project_keys=None, feature_batch=None):
     if project.status != ObjectStatus.VISIBLE:
         return ProjectConfig(project, disabled=True)
 
@@ -166,14 +255,15 @@ def _get_project_config(project, full_config=True, project_keys=None):
                 ],
                 "piiConfig": get_pii_config(project),
                 "datascrubbingSettings": get_datascrubbing_settings(project),
-                "features": get_exposed_features(project),
+                "features": get_exposed_features(project, feature_batch),
             },
             "organizationId": project.organization_id,
             "projectId": project.id,  # XXX: Unused by Relay, required by Python store
         }
-    allow_dynamic_sampling = features.has(
+    allow_dynamic_sampling = _has_feature(
         "organizations:server-side-sampling",
         project.organization,
+        feature_batch,
     )
     if allow_dynamic_sampling:
         dynamic_sampling = project.get_option("sentry:dynamic_sampling")
@@ -187,9 +277,9 @@ def _get_project_config(project, full_config=True, project_keys=None):
         # This is all we need for external Relay processors
         return ProjectConfig(project, **cfg)
 
-    if features.has("organizations:performance-ops-breakdown", project.organization):
+    if _has_feature("organizations:performance-ops-breakdown", project.organization, feature_batch):
         cfg["config"]["breakdownsV2"] = project.get_option("sentry:breakdowns")
-    if _should_extract_transaction_metrics(project):
+    if _should_extract_transaction_metrics(project, feature_batch):
         cfg["config"]["transactionMetrics"] = get_transaction_metrics_settings(
             project, cfg["config"].get("breakdownsV2")
         )
@@ -203,16 +293,16 @@ def _get_project_config(project, full_config=True, project_keys=None):
             )
         except Exception:
             capture_exception()
-    if features.has("organizations:metrics-extraction", project.organization):
+    if _has_feature("organizations:metrics-extraction", project.organization, feature_batch):
         cfg["config"]["sessionMetrics"] = {
             "version": 1,
             "drop": False,
         }
 
-    if features.has("projects:performance-suspect-spans-ingestion", project=project):
+    if _has_feature("projects:performance-suspect-spans-ingestion", project, feature_batch):
         cfg["config"]["spanAttributes"] = project.get_option("sentry:span_attributes")
     with Hub.current.start_span(op="get_filter_settings"):
-        cfg["config"]["filterSettings"] = get_filter_settings(project)
+        cfg["config"]["filterSettings"] = get_filter_settings(project, feature_batch)
     with Hub.current.start_span(op="get_grouping_config_dict_for_project"):
         cfg["config"]["groupingConfig"] = get_grouping_config_dict_for_project(project)
     with Hub.current.start_span(op="get_event_retention"):
@@ -431,10 +521,14 @@ class TransactionMetricsSettings(TypedDict):
     customMeasurements: CustomMeasurementSettings
 
 
-def _should_extract_transaction_metrics(project: Project) -> bool:
+def _should_extract_transaction_metrics(
+    project: Project, feature_batch: Optional[FeatureBatch] = None
+) -> bool:
     return (
         sample_modulo("relay.transaction-metrics-org-sample-rate", project.organization_id)
-        or features.has("organizations:transaction-metrics-extraction", project.organization)
+        or _has_feature(
+            "organizations:transaction-metrics-extraction", project.organization, feature_batch
+        )
     ) and not killswitches.killswitch_matches_context(
         "relay.drop-transaction-metrics", {"project_id": project.id}
     )
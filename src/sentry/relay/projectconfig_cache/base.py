@@ -1,8 +1,35 @@
+import hashlib
+
+from sentry.utils import json
 from sentry.utils.services import Service
 
+# Fields of a project config that do not contribute to its revision.
+_UNVERSIONED_FIELDS = ("lastFetch", "revision")
+
+_canonical_encoder = json.JSONEncoder(
+    separators=(",", ":"),
+    sort_keys=True,
+    ignore_nan=True,
+    default=json.better_default_encoder,
+)
+
+
+def get_config_digest(value):
+    """Returns a digest of a JSON value that is independent of key order."""
+    return hashlib.sha1(_canonical_encoder.encode(value).encode("utf-8")).hexdigest()
+
+
+def get_config_revision(config):
+    """Returns the revision of a project config.
+
+    The revision only changes when the contents of the config change, so that
+    Relays can skip configs they already have.
+    """
+    return get_config_digest({k: v for k, v in config.items() if k not in _UNVERSIONED_FIELDS})
+
 
 class ProjectConfigCache(Service):
-    __all__ = ("set_many", "delete_many", "get")
+    __all__ = ("set_many", "delete_many", "get", "get_many")
 
     def __init__(self, **options):
         pass
@@ -15,3 +42,6 @@ class ProjectConfigCache(Service):
 
     def get(self, public_key):
         raise NotImplementedError()
+
+    def get_many(self, public_keys):
+        return {public_key: self.get(public_key) for public_key in public_keys}
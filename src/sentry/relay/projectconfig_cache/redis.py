@@ -1,9 +1,17 @@
-from sentry.relay.projectconfig_cache.base import ProjectConfigCache
+from sentry import options
+from sentry.relay.projectconfig_cache.base import (
+    ProjectConfigCache,
+    get_config_digest,
+    get_config_revision,
+)
 from sentry.utils import json, metrics, redis
 from sentry.utils.redis import validate_dynamic_cluster
 
 REDIS_CACHE_TIMEOUT = 3600  # 1 hr
 
+# Key in a stored config that references its shared ``config`` section.
+SECTION_REF = "$configSection"
+
 
 class RedisProjectConfigCache(ProjectConfigCache):
     def __init__(self, **options):
@@ -18,16 +26,42 @@ class RedisProjectConfigCache(ProjectConfigCache):
     def __get_redis_key(self, public_key):
         return f"relayconfig:{public_key}"
 
+    def __get_section_key(self, digest):
+        return f"relayconfig-section:{digest}"
+
     def set_many(self, configs):
         metrics.incr("relay.projectconfig_cache.write", amount=len(configs), tags={"action": "set"})
 
+        shared_sections = options.get("relay.project-config-cache.shared-sections")
+        sections = {}
+
         # Note: Those are multiple pipelines, one per cluster node
         p = self.cluster.pipeline()
         for public_key, config in configs.items():
+            if isinstance(config, dict) and isinstance(config.get("config"), dict):
+                config = dict(config, revision=get_config_revision(config))
+                if shared_sections:
+                    section = config.pop("config")
+                    digest = get_config_digest(section)
+                    sections[digest] = section
+                    config[SECTION_REF] = digest
+
             p.setex(self.__get_redis_key(public_key), REDIS_CACHE_TIMEOUT, json.dumps(config))
 
+        # Sections are written after the configs that reference them, so they
+        # never expire before any of those configs.
+        for digest, section in sections.items():
+            p.setex(self.__get_section_key(digest), REDIS_CACHE_TIMEOUT, json.dumps(section))
+
         p.execute()
 
+        if sections:
+            metrics.incr(
+                "relay.projectconfig_cache.write",
+                amount=len(sections),
+                tags={"action": "set_section"},
+            )
+
     def delete_many(self, public_keys):
         # Note: Those are multiple pipelines, one per cluster node
         with self.cluster.pipeline() as p:
@@ -40,7 +74,49 @@ class RedisProjectConfigCache(ProjectConfigCache):
         )
 
     def get(self, public_key):
-        rv = self.cluster.get(self.__get_redis_key(public_key))
-        if rv is not None:
-            return json.loads(rv)
-        return None
+        return self.get_many([public_key])[public_key]
+
+    def get_many(self, public_keys):
+        public_keys = list(public_keys)
+
+        # Note: Those are multiple pipelines, one per cluster node
+        with self.cluster.pipeline() as p:
+            for public_key in public_keys:
+                p.get(self.__get_redis_key(public_key))
+            return_values = p.execute()
+
+        configs = {
+            public_key: json.loads(rv) if rv is not None else None
+            for public_key, rv in zip(public_keys, return_values)
+        }
+
+        digests = {
+            config[SECTION_REF]
+            for config in configs.values()
+            if isinstance(config, dict) and SECTION_REF in config
+        }
+        if not digests:
+            return configs
+
+        digests = list(digests)
+        with self.cluster.pipeline() as p:
+            for digest in digests:
+                p.get(self.__get_section_key(digest))
+            return_values = p.execute()
+
+        # Configs referencing the same section share one instance of it.
+        sections = {
+            digest: json.loads(rv) for digest, rv in zip(digests, return_values) if rv is not None
+        }
+        for public_key, config in configs.items():
+            if not isinstance(config, dict) or SECTION_REF not in config:
+                continue
+            section = sections.get(config.pop(SECTION_REF))
+            if section is None:
+                # The section was evicted, treat the config as missing so that
+                # it is computed again.
+                configs[public_key] = None
+            else:
+                config["config"] = section
+
+        return configs
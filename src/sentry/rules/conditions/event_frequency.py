@@ -4,14 +4,15 @@ import abc
 import contextlib
 import logging
 import re
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Any, Mapping
+from typing import Any, Iterable, Mapping, MutableMapping, Optional, Sequence, Tuple
 
 from django import forms
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import release_health, tsdb
+from sentry import options, release_health, tsdb
 from sentry.eventstore.models import Event
 from sentry.receivers.rules import DEFAULT_RULE_LABEL
 from sentry.rules import EventState
@@ -36,6 +37,13 @@ comparison_intervals = {
     "1w": ("one week", timedelta(days=7)),
     "30d": ("30 days", timedelta(days=30)),
 }
+# How long the event counts of a group are cached for when batching is enabled.
+EVENT_COUNT_CACHE_TTL = 10
+
+# ``(environment_id, duration, offset)``, an interval of ``duration`` ending
+# ``offset`` before now.
+Window = Tuple[Optional[int], timedelta, timedelta]
+
 COMPARISON_TYPE_COUNT = "count"
 COMPARISON_TYPE_PERCENT = "percent"
 comparison_types = {
@@ -82,10 +90,92 @@ class EventFrequencyForm(forms.Form):  # type: ignore
         return cleaned_data
 
 
+def _get_event_count_cache_key(group_id: int, window: Window) -> str:
+    environment_id, duration, offset = window
+    return "r.c.efc:{}-{}-{}-{}".format(
+        group_id, environment_id, int(duration.total_seconds()), int(offset.total_seconds())
+    )
+
+
+def query_group_event_counts(
+    tsdb_: Any, group_id: int, windows: Iterable[Window], now: datetime
+) -> Mapping[Window, int]:
+    """
+    Count the events of a group in every window.
+
+    Windows with the same environment and offset that resolve to the same
+    rollup end in the same bucket, so the buckets of each of them are a
+    suffix of the buckets of the longest one. They are all computed from a
+    single range read of the longest window.
+    """
+    windows_by_range: MutableMapping[Tuple[Any, ...], list[Window]] = defaultdict(list)
+    for window in set(windows):
+        environment_id, duration, offset = window
+        end = now - offset
+        rollup = tsdb_.get_optimal_rollup(end - duration, end)
+        windows_by_range[(environment_id, offset, rollup)].append(window)
+
+    rv = {}
+    for (environment_id, offset, rollup), range_windows in windows_by_range.items():
+        end = now - offset
+        duration = max(duration for _, duration, _ in range_windows)
+        points = tsdb_.get_range(
+            model=tsdb_.models.group,
+            keys=[group_id],
+            start=end - duration,
+            end=end,
+            rollup=rollup,
+            environment_ids=[environment_id] if environment_id is not None else None,
+            use_cache=True,
+        ).get(group_id, [])
+        metrics.timing("rules.conditions.event_frequency.windows_per_read", len(range_windows))
+
+        for window in range_windows:
+            _, duration, _ = window
+            _, series = tsdb_.get_optimal_rollup_series(end - duration, end, rollup)
+            rv[window] = sum(count for timestamp, count in points if timestamp >= series[0])
+
+    return rv
+
+
+def get_group_event_counts(
+    tsdb_: Any, group_id: int, windows: Sequence[Window]
+) -> Mapping[Window, int]:
+    """
+    Return the event counts of a group for every window, from a short-lived
+    cache shared by all frequency conditions or from TSDB.
+    """
+    cache_keys = {window: _get_event_count_cache_key(group_id, window) for window in windows}
+    cached = cache.get_many(list(cache_keys.values()))
+
+    rv = {window: cached[key] for window, key in cache_keys.items() if key in cached}
+    missing = [window for window in cache_keys if window not in rv]
+    metrics.incr("rules.conditions.event_frequency.cache", amount=len(rv), tags={"hit": "true"})
+    metrics.incr(
+        "rules.conditions.event_frequency.cache", amount=len(missing), tags={"hit": "false"}
+    )
+
+    if missing:
+        counts = query_group_event_counts(tsdb_, group_id, missing, timezone.now())
+        cache.set_many(
+            {cache_keys[window]: count for window, count in counts.items()}, EVENT_COUNT_CACHE_TTL
+        )
+        rv.update(counts)
+
+    return rv
+
+
+def is_event_count_batching_enabled() -> bool:
+    return options.get("rules.event-frequency-batching")
+
+
 class BaseEventFrequencyCondition(EventCondition, abc.ABC):
     intervals = standard_intervals
     form_cls = EventFrequencyForm
     label: str
+    # Whether ``query_hook`` counts the events of the group, in which case
+    # ``get_rate`` can be served by ``get_group_event_counts``.
+    counts_group_events = False
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.tsdb = kwargs.pop("tsdb", tsdb)
@@ -135,7 +225,31 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
         """ """
         raise NotImplementedError  # subclass must implement
 
+    def get_windows(self, interval: str, environment_id: Optional[int]) -> Sequence[Window]:
+        """
+        Return the window of the interval and, for percent comparisons, the
+        window it is compared to.
+        """
+        _, duration = self.intervals[interval]
+        windows = [(environment_id, duration, timedelta())]
+        if self.get_option("comparisonType", COMPARISON_TYPE_COUNT) == COMPARISON_TYPE_PERCENT:
+            comparison_interval = comparison_intervals[self.get_option("comparisonInterval")][1]
+            windows.append((environment_id, duration, comparison_interval))
+        return windows
+
+    def get_percent_change(self, result: int, comparison_result: int) -> int:
+        return (
+            int(max(0, ((result / comparison_result) * 100) - 100)) if comparison_result > 0 else 0
+        )
+
     def get_rate(self, event: Event, interval: str, environment_id: str) -> int:
+        if self.counts_group_events and is_event_count_batching_enabled():
+            windows = self.get_windows(interval, environment_id)  # type: ignore
+            counts = get_group_event_counts(self.tsdb, event.group_id, windows)
+            if len(windows) > 1:
+                return self.get_percent_change(counts[windows[0]], counts[windows[1]])
+            return counts[windows[0]]
+
         _, duration = self.intervals[interval]
         end = timezone.now()
 
@@ -156,11 +270,7 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
                 comparison_result = self.query(
                     event, comparison_end - duration, comparison_end, environment_id=environment_id
                 )
-                result = (
-                    int(max(0, ((result / comparison_result) * 100) - 100))
-                    if comparison_result > 0
-                    else 0
-                )
+                result = self.get_percent_change(result, comparison_result)
 
         return result
 
@@ -184,6 +294,7 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
 class EventFrequencyCondition(BaseEventFrequencyCondition):
     id = "sentry.rules.conditions.event_frequency.EventFrequencyCondition"
     label = "The issue is seen more than {value} times in {interval}"
+    counts_group_events = True
 
     def query_hook(self, event: Event, start: datetime, end: datetime, environment_id: str) -> int:
         sums: Mapping[int, int] = self.tsdb.get_sums(
@@ -0,0 +1,242 @@
+"""
+Skips rules that cannot match an event without instantiating their
+conditions and filters.
+
+Some conditions only look at cheap, deterministic properties of the event:
+the first seen/regression/reappeared state, the level, whether a tag key is
+set, or the value of a few top-level event attributes. For every rule of a
+project, ``RulePrefilter`` compiles those into clauses over *literals*. A
+rule can only pass if every one of its clauses has a literal that holds.
+Literals are evaluated at most once per event, no matter how many rules
+share them.
+
+Conditions the prefilter does not understand are never used to skip a rule,
+those rules are evaluated by ``RuleProcessor`` as usual.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Hashable, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+from sentry import tagstore
+from sentry.constants import LOG_LEVELS_MAP
+from sentry.eventstore.models import Event
+from sentry.models import Rule
+from sentry.rules import EventState, MatchType, rules
+from sentry.utils import metrics
+from sentry.utils.cache import cache
+
+CACHE_TTL = 60
+
+# ``(literal, negated)``
+Literal = Tuple[Tuple[Hashable, ...], bool]
+Clause = Tuple[Literal, ...]
+
+STATE_CONDITIONS = {
+    "sentry.rules.conditions.regression_event.RegressionEventCondition": "is_regression",
+    "sentry.rules.conditions.reappeared_event.ReappearedEventCondition": "has_reappeared",
+}
+FIRST_SEEN_CONDITION = "sentry.rules.conditions.first_seen_event.FirstSeenEventCondition"
+LEVEL_CONDITIONS = frozenset(
+    ["sentry.rules.conditions.level.LevelCondition", "sentry.rules.filters.level.LevelFilter"]
+)
+TAGGED_EVENT_CONDITIONS = frozenset(
+    [
+        "sentry.rules.conditions.tagged_event.TaggedEventCondition",
+        "sentry.rules.filters.tagged_event.TaggedEventFilter",
+    ]
+)
+EVENT_ATTRIBUTE_CONDITIONS = frozenset(
+    [
+        "sentry.rules.conditions.event_attribute.EventAttributeCondition",
+        "sentry.rules.filters.event_attribute.EventAttributeFilter",
+    ]
+)
+# Event attributes that are compared by equality without loading interfaces
+INDEXED_ATTRIBUTES = frozenset(["platform", "environment", "type"])
+
+
+def get_cache_key(project_id: int) -> str:
+    return f"project:{project_id}:rules-prefilter"
+
+
+def _compile_condition(condition: Mapping[str, Any], rule: Rule) -> Optional[Literal]:
+    """
+    Return the literal a condition is equivalent to, or ``None`` if the
+    condition has to be evaluated by its class.
+    """
+    condition_id = condition.get("id")
+
+    if condition_id == FIRST_SEEN_CONDITION:
+        if rule.environment_id is None:
+            return ("state", "is_new"), False
+        return ("state", "is_new_group_environment"), False
+
+    if condition_id in STATE_CONDITIONS:
+        return ("state", STATE_CONDITIONS[condition_id]), False
+
+    if condition_id in LEVEL_CONDITIONS:
+        match = condition.get("match")
+        level_raw = condition.get("level")
+        if not level_raw or match not in (
+            MatchType.EQUAL,
+            MatchType.GREATER_OR_EQUAL,
+            MatchType.LESS_OR_EQUAL,
+        ):
+            return None
+        try:
+            level = int(level_raw)
+        except (TypeError, ValueError):
+            return None
+        return ("level", match, level), False
+
+    if condition_id in TAGGED_EVENT_CONDITIONS:
+        key = condition.get("key")
+        match = condition.get("match")
+        if not key or match not in (MatchType.IS_SET, MatchType.NOT_SET):
+            return None
+        return ("tag", key.lower()), match == MatchType.NOT_SET
+
+    if condition_id in EVENT_ATTRIBUTE_CONDITIONS:
+        attribute = (condition.get("attribute") or "").lower()
+        match = condition.get("match")
+        value = condition.get("value")
+        if (
+            attribute not in INDEXED_ATTRIBUTES
+            or match not in (MatchType.EQUAL, MatchType.NOT_EQUAL)
+            or not value
+        ):
+            return None
+        return ("attribute", attribute, value.lower()), match == MatchType.NOT_EQUAL
+
+    return None
+
+
+def _compile_predicates(
+    conditions: Sequence[Mapping[str, Any]], match: str, rule: Rule
+) -> Sequence[Clause]:
+    if not conditions:
+        return []
+
+    literals = [_compile_condition(condition, rule) for condition in conditions]
+
+    if match == "all":
+        return [(literal,) for literal in literals if literal is not None]
+    elif match == "none":
+        return [((key, not negated),) for key, negated in filter(None, literals)]
+    elif match == "any" and all(literal is not None for literal in literals):
+        return [tuple(literals)]  # type: ignore
+    return []
+
+
+def _get_rule_snapshot(rule: Rule) -> Tuple[Any, ...]:
+    # Everything the clauses of a rule are compiled from, used to detect a
+    # prefilter that was built from an outdated version of the rule.
+    return (
+        rule.environment_id,
+        rule.data.get("action_match"),
+        rule.data.get("filter_match"),
+        rule.data.get("conditions"),
+    )
+
+
+def compile_rule(rule: Rule) -> Sequence[Clause]:
+    condition_list = []
+    filter_list = []
+    for condition in rule.data.get("conditions", ()):
+        condition_cls = rules.get(condition["id"])
+        if condition_cls is None:
+            continue
+        if condition_cls.rule_type == "condition/event":
+            condition_list.append(condition)
+        else:
+            filter_list.append(condition)
+
+    condition_match = rule.data.get("action_match") or Rule.DEFAULT_CONDITION_MATCH
+    filter_match = rule.data.get("filter_match") or Rule.DEFAULT_FILTER_MATCH
+
+    return [
+        *_compile_predicates(filter_list, filter_match, rule),
+        *_compile_predicates(condition_list, condition_match, rule),
+    ]
+
+
+def _evaluate(literal: Tuple[Hashable, ...], event: Event, state: EventState) -> bool:
+    kind = literal[0]
+
+    if kind == "state":
+        return bool(getattr(state, literal[1]))  # type: ignore
+
+    if kind == "level":
+        _, match, desired_level = literal
+        level = LOG_LEVELS_MAP.get(event.get_tag("level"))
+        if level is None:
+            return False
+        if match == MatchType.EQUAL:
+            return level == desired_level
+        elif match == MatchType.GREATER_OR_EQUAL:
+            return level >= desired_level  # type: ignore
+        return level <= desired_level  # type: ignore
+
+    if kind == "tag":
+        key = literal[1]
+        return any(
+            k.lower() == key or tagstore.get_standardized_key(k) == key for k, _ in event.tags
+        )
+
+    if kind == "attribute":
+        _, attribute, value = literal
+        if attribute == "platform":
+            values = [event.platform]
+        elif attribute == "environment":
+            values = [event.get_tag("environment")]
+        else:
+            values = [event.data.get("type")]
+        return any(str(v).lower() == value for v in values if v is not None)
+
+    raise ValueError(f"Unknown literal {literal!r}")
+
+
+class RulePrefilter:
+    def __init__(self, rules_: Sequence[Rule]) -> None:
+        # rule id -> (snapshot, clauses)
+        self.rules: MutableMapping[int, Tuple[Tuple[Any, ...], Sequence[Clause]]] = {}
+        for rule in rules_:
+            clauses = compile_rule(rule)
+            if clauses:
+                self.rules[rule.id] = (_get_rule_snapshot(rule), clauses)
+
+    def filter(self, rules_: Sequence[Rule], event: Event, state: EventState) -> Sequence[Rule]:
+        """
+        Return the rules that might pass for the event, in their original
+        order.
+        """
+        values: MutableMapping[Tuple[Hashable, ...], bool] = {}
+
+        def holds(literal: Literal) -> bool:
+            key, negated = literal
+            if key not in values:
+                values[key] = _evaluate(key, event, state)
+            return values[key] != negated
+
+        rv = []
+        for rule in rules_:
+            compiled = self.rules.get(rule.id)
+            if (
+                compiled is None
+                or compiled[0] != _get_rule_snapshot(rule)
+                or all(any(holds(literal) for literal in clause) for clause in compiled[1])
+            ):
+                rv.append(rule)
+
+        metrics.incr("rules.prefilter.skipped", amount=len(rules_) - len(rv))
+        return rv
+
+
+def get_rule_prefilter(project_id: int, rules_: Sequence[Rule]) -> RulePrefilter:
+    cache_key = get_cache_key(project_id)
+    prefilter: Optional[RulePrefilter] = cache.get(cache_key)
+    if prefilter is None:
+        prefilter = RulePrefilter(rules_)
+        cache.set(cache_key, prefilter, CACHE_TTL)
+    return prefilter
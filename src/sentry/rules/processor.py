@@ -8,10 +8,16 @@ from typing import Any, Callable, Iterable, List, Mapping, MutableMapping, Seque
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import analytics
+from sentry import analytics, options, tsdb
 from sentry.eventstore.models import Event
 from sentry.models import GroupRuleStatus, Rule
 from sentry.rules import EventState, history, rules
+from sentry.rules.conditions.event_frequency import (
+    Window,
+    get_group_event_counts,
+    is_event_count_batching_enabled,
+)
+from sentry.rules.prefilter import get_rule_prefilter
 from sentry.types.rules import RuleFuture
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
@@ -48,6 +54,12 @@ class RuleProcessor:
         rules_: Sequence[Rule] = Rule.get_for_project(self.project.id)
         return rules_
 
+    def prefilter_rules(self, rules_: Sequence[Rule]) -> Sequence[Rule]:
+        """Drop the rules whose cheap conditions can not match this event."""
+        prefilter = get_rule_prefilter(self.project.id, rules_)
+        state = self.get_state()
+        return prefilter.filter(rules_, self.event, state)
+
     def _build_rule_status_cache_key(self, rule_id: int) -> str:
         return "grouprulestatus:1:%s" % hash_values([self.group.id, rule_id])
 
@@ -109,6 +121,44 @@ class RuleProcessor:
 
         return rule_statuses
 
+    def prefetch_group_event_counts(
+        self, rules_: Sequence[Rule], rule_statuses: Mapping[int, GroupRuleStatus]
+    ) -> None:
+        """
+        Count the events of the group for the windows of every frequency
+        condition up front, so that the conditions of all rules are served
+        from one batch of range reads.
+        """
+        environment_id = self.event.get_environment().id
+        now = timezone.now()
+        windows: Set[Window] = set()
+        for rule in rules_:
+            if rule.environment_id is not None and rule.environment_id != environment_id:
+                continue
+
+            # Skip rules that `apply_rule` won't evaluate because they fired recently
+            frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
+            last_active = rule_statuses[rule.id].last_active
+            if last_active and last_active > now - timedelta(minutes=frequency):
+                continue
+
+            for condition in rule.data.get("conditions", ()):
+                condition_cls = rules.get(condition["id"])
+                if condition_cls is None or not getattr(
+                    condition_cls, "counts_group_events", False
+                ):
+                    continue
+
+                condition_inst = condition_cls(self.project, data=condition, rule=rule)
+                interval = condition_inst.get_option("interval")
+                if interval not in condition_inst.intervals:
+                    continue
+
+                windows.update(condition_inst.get_windows(interval, rule.environment_id))
+
+        if windows:
+            get_group_event_counts(tsdb, self.group.id, list(windows))
+
     def condition_matches(
         self, condition: Mapping[str, Any], state: EventState, rule: Rule
     ) -> bool | None:
@@ -256,7 +306,13 @@ class RuleProcessor:
 
         self.grouped_futures.clear()
         rules = self.get_rules()
+        if options.get("rules.prefilter-enabled"):
+            rules = self.prefilter_rules(rules)
         rule_statuses = self.bulk_get_rule_status(rules)
+        if is_event_count_batching_enabled():
+            safe_execute(
+                self.prefetch_group_event_counts, rules, rule_statuses, _with_transaction=False
+            )
         for rule in rules:
             self.apply_rule(rule, rule_statuses[rule.id])
         return self.grouped_futures.values()
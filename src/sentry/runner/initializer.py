@@ -524,6 +524,27 @@ def bind_cache_to_option_store():
 
     default_store.cache = default_cache
 
+    if settings.SENTRY_OPTIONS_SNAPSHOT_INTERVAL:
+        publisher = subscriber = None
+        if settings.SENTRY_OPTIONS_PUBSUB:
+            from sentry.utils.pubsub import QueuedPublisherService, RedisPublisher, RedisSubscriber
+
+            publisher = QueuedPublisherService(RedisPublisher(settings.SENTRY_OPTIONS_PUBSUB))
+            # Started by the store in every process that reads options, as
+            # this runs before Celery and uWSGI fork their workers.
+            subscriber = RedisSubscriber(
+                settings.SENTRY_OPTIONS_PUBSUB,
+                settings.SENTRY_OPTIONS_PUBSUB_CHANNEL,
+                default_store.invalidate_snapshot,
+            )
+
+        default_store.enable_snapshots(
+            settings.SENTRY_OPTIONS_SNAPSHOT_INTERVAL,
+            publisher=publisher,
+            channel=settings.SENTRY_OPTIONS_PUBSUB_CHANNEL,
+            subscriber=subscriber,
+        )
+
 
 def apply_legacy_settings(settings):
     from sentry import options
@@ -0,0 +1,23 @@
+-- Writes grouphash cache entries only if the project's cache generation has
+-- not changed since the caller looked it up. Invalidations bump the
+-- generation, so a write based on GroupHash rows that were read before a
+-- merge, unmerge or deletion is dropped instead of resurrecting the mapping.
+--
+-- Input:
+-- keys:
+--  generation_key, hash_key...
+-- args:
+--  expected_generation, ttl, group_id
+--
+-- Output:
+-- 1 if the entries were written, 0 otherwise
+local generation = redis.call('GET', KEYS[1]) or '0'
+if generation ~= ARGV[1] then
+    return 0
+end
+
+for i = 2, #KEYS do
+    redis.call('SETEX', KEYS[i], ARGV[2], ARGV[3])
+end
+
+return 1
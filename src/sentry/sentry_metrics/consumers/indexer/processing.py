@@ -167,6 +167,13 @@ def process_messages(
     with metrics.timer("metrics_consumer.bulk_record"):
         record_result = indexer.bulk_record(use_case_id=use_case_id, org_strings=org_strings)
 
+    for tier, (lookups, hits) in record_result.get_cache_lookups().items():
+        tags = {"tier": tier.value}
+        metrics.incr("process_messages.indexer_cache.lookups", amount=lookups, tags=tags)
+        metrics.incr("process_messages.indexer_cache.hits", amount=hits, tags=tags)
+        if lookups:
+            metrics.gauge("process_messages.indexer_cache.hit_rate", hits / lookups, tags=tags)
+
     mapping = record_result.get_mapped_results()
     bulk_record_meta = record_result.get_fetch_metadata()
 
@@ -24,6 +24,11 @@ class FetchType(Enum):
     FIRST_SEEN = "f"
 
 
+class CacheTier(Enum):
+    LOCAL = "local"
+    SHARED = "shared"
+
+
 KR = TypeVar("KR", bound="KeyResult")
 
 
@@ -86,6 +91,7 @@ class KeyResults:
     def __init__(self) -> None:
         self.results: MutableMapping[int, MutableMapping[str, int]] = defaultdict(dict)
         self.meta: MutableMapping[str, Tuple[int, FetchType]] = dict()
+        self.cache_lookups: MutableMapping[CacheTier, Tuple[int, int]] = dict()
 
     def add_key_result(self, key_result: KeyResult, fetch_type: Optional[FetchType] = None) -> None:
         self.results[key_result.org_id].update({key_result.string: key_result.id})
@@ -100,6 +106,14 @@ class KeyResults:
             if fetch_type:
                 self.meta[key_result.string] = (key_result.id, fetch_type)
 
+    def add_cache_lookups(self, tier: CacheTier, lookups: int, hits: int) -> None:
+        """
+        Record how many keys were looked up in a cache tier and how many of
+        them were found.
+        """
+        prev_lookups, prev_hits = self.cache_lookups.get(tier, (0, 0))
+        self.cache_lookups[tier] = (prev_lookups + lookups, prev_hits + hits)
+
     def get_mapped_results(self) -> Mapping[int, Mapping[str, int]]:
         """
         Only return results that have org_ids with string/int mappings.
@@ -143,6 +157,12 @@ class KeyResults:
     def get_fetch_metadata(self) -> Mapping[str, Tuple[int, FetchType]]:
         return self.meta
 
+    def get_cache_lookups(self) -> Mapping[CacheTier, Tuple[int, int]]:
+        """
+        Return the number of lookups and hits per cache tier.
+        """
+        return self.cache_lookups
+
     def merge(self, other: "KeyResults") -> "KeyResults":
         new_results: "KeyResults" = KeyResults()
 
@@ -152,6 +172,9 @@ class KeyResults:
         new_results.meta.update(self.meta)
         new_results.meta.update(other.meta)
 
+        for tier, (lookups, hits) in [*self.cache_lookups.items(), *other.cache_lookups.items()]:
+            new_results.add_cache_lookups(tier, lookups, hits)
+
         return new_results
 
     # For brevity, allow callers to address the mapping directly
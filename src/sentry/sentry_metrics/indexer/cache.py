@@ -5,6 +5,7 @@ from typing import Mapping, MutableMapping, Optional, Sequence
 from django.conf import settings
 
 from sentry.utils.cache import cache
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.hashlib import md5_text
 
 logger = logging.getLogger(__name__)
@@ -80,5 +81,61 @@ class StringIndexerCache:
         cache.delete_many(cache_keys, version=self.version)
 
 
+class LocalStringIndexerCache:
+    """
+    A bounded in-process cache for the indexer, consulted before
+    ``StringIndexerCache``. It maps keys formatted like "org_id:string" to
+    their id, and ids back to their string for ``reverse_resolve``.
+
+    Entries expire after the shared cache TTL, the cache is disabled if
+    ``maxsize`` is 0.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.enabled = maxsize > 0
+        if self.enabled:
+            self._ids = LRUCache(maxsize, ttl=ttl)
+            self._strings = LRUCache(maxsize, ttl=ttl)
+
+    def get_many(
+        self, keys: Sequence[str], cache_namespace: str
+    ) -> MutableMapping[str, Optional[int]]:
+        if not self.enabled:
+            return {key: None for key in keys}
+        return {key: self._ids.get((cache_namespace, key)) for key in keys}
+
+    def set_many(self, key_values: Mapping[str, int], cache_namespace: str) -> None:
+        if not self.enabled:
+            return
+        for key, value in key_values.items():
+            self._ids.set((cache_namespace, key), value)
+            self._strings.set((cache_namespace, value), key.split(":", 1)[1])
+
+    def get(self, key: str, cache_namespace: str) -> Optional[int]:
+        return self.get_many([key], cache_namespace)[key]
+
+    def set(self, key: str, value: int, cache_namespace: str) -> None:
+        self.set_many({key: value}, cache_namespace)
+
+    def get_string(self, id: int, cache_namespace: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        result: Optional[str] = self._strings.get((cache_namespace, id))
+        return result
+
+    def set_string(self, id: int, string: str, cache_namespace: str) -> None:
+        if self.enabled:
+            self._strings.set((cache_namespace, id), string)
+
+    def clear(self) -> None:
+        if self.enabled:
+            self._ids.clear()
+            self._strings.clear()
+
+
 # todo: dont hard code 1 as the version
 indexer_cache = StringIndexerCache(version=1)
+local_indexer_cache = LocalStringIndexerCache(
+    maxsize=settings.SENTRY_METRICS_INDEXER_LOCAL_CACHE_SIZE,
+    ttl=settings.SENTRY_METRICS_INDEXER_CACHE_TTL,
+)
@@ -5,8 +5,14 @@ from typing import Any, Mapping, Optional, Set, Type
 from django.db.models import Q
 
 from sentry.sentry_metrics.configuration import DbKey, UseCaseKey, get_ingest_config
-from sentry.sentry_metrics.indexer.base import KeyCollection, KeyResult, KeyResults, StringIndexer
-from sentry.sentry_metrics.indexer.cache import indexer_cache
+from sentry.sentry_metrics.indexer.base import (
+    CacheTier,
+    KeyCollection,
+    KeyResult,
+    KeyResults,
+    StringIndexer,
+)
+from sentry.sentry_metrics.indexer.cache import indexer_cache, local_indexer_cache
 from sentry.sentry_metrics.indexer.models import BaseIndexer, PerfStringIndexer
 from sentry.sentry_metrics.indexer.models import StringIndexer as StringIndexerTable
 from sentry.sentry_metrics.indexer.strings import REVERSE_SHARED_STRINGS, SHARED_STRINGS
@@ -53,7 +59,7 @@ class PGStringIndexerV2(StringIndexer):
         string -> id mapping, for each string in the set.
 
         There are three steps to getting the ids for strings:
-            1. ids from cache
+            1. ids from cache, the in-process cache first if it is enabled
             2. ids from existing db records
             3. ids from newly created db records
 
@@ -80,7 +86,22 @@ class PGStringIndexerV2(StringIndexer):
         cache_keys = KeyCollection(org_strings)
         metrics.gauge("sentry_metrics.indexer.lookups_per_batch", value=cache_keys.size)
         cache_key_strs = cache_keys.as_strings()
-        cache_results = indexer_cache.get_many(cache_key_strs, use_case_id.value)
+        cache_key_results = KeyResults()
+
+        if local_indexer_cache.enabled:
+            local_results = local_indexer_cache.get_many(cache_key_strs, use_case_id.value)
+            local_hits = [
+                KeyResult.from_string(k, v) for k, v in local_results.items() if v is not None
+            ]
+            cache_key_results.add_key_results(local_hits, FetchType.CACHE_HIT)
+            cache_key_results.add_cache_lookups(
+                CacheTier.LOCAL, len(local_results), len(local_hits)
+            )
+            cache_key_strs = [k for k, v in local_results.items() if v is None]
+
+        cache_results = (
+            indexer_cache.get_many(cache_key_strs, use_case_id.value) if cache_key_strs else {}
+        )
 
         hits = [k for k, v in cache_results.items() if v is not None]
         metrics.incr(
@@ -99,11 +120,12 @@ class PGStringIndexerV2(StringIndexer):
             amount=cache_keys.size,
         )
 
-        cache_key_results = KeyResults()
         cache_key_results.add_key_results(
             [KeyResult.from_string(k, v) for k, v in cache_results.items() if v is not None],
             FetchType.CACHE_HIT,
         )
+        cache_key_results.add_cache_lookups(CacheTier.SHARED, len(cache_results), len(hits))
+        local_indexer_cache.set_many({k: cache_results[k] for k in hits}, use_case_id.value)
 
         db_read_keys = cache_key_results.get_unmapped_keys(cache_keys)
 
@@ -134,6 +156,7 @@ class PGStringIndexerV2(StringIndexer):
 
         if db_write_keys.size == 0:
             indexer_cache.set_many(new_results_to_cache, use_case_id.value)
+            local_indexer_cache.set_many(new_results_to_cache, use_case_id.value)
             return cache_key_results.merge(db_read_key_results)
 
         new_records = []
@@ -160,6 +183,7 @@ class PGStringIndexerV2(StringIndexer):
 
         new_results_to_cache.update(db_write_key_results.get_mapped_key_strings_to_ints())
         indexer_cache.set_many(new_results_to_cache, use_case_id.value)
+        local_indexer_cache.set_many(new_results_to_cache, use_case_id.value)
 
         return cache_key_results.merge(db_read_key_results).merge(db_write_key_results)
 
@@ -177,11 +201,16 @@ class PGStringIndexerV2(StringIndexer):
 
         """
         key = f"{org_id}:{string}"
+        result = local_indexer_cache.get(key, use_case_id.value)
+        if result is not None:
+            return result
+
         result = indexer_cache.get(key, use_case_id.value)
         table = self._table(use_case_id)
 
         if result and isinstance(result, int):
             metrics.incr(_INDEXER_CACHE_METRIC, tags={"cache_hit": "true", "caller": "resolve"})
+            local_indexer_cache.set(key, result, use_case_id.value)
             return result
 
         metrics.incr(_INDEXER_CACHE_METRIC, tags={"cache_hit": "false", "caller": "resolve"})
@@ -190,6 +219,7 @@ class PGStringIndexerV2(StringIndexer):
         except table.DoesNotExist:
             return None
         indexer_cache.set(key, id, use_case_id.value)
+        local_indexer_cache.set(key, id, use_case_id.value)
 
         return id
 
@@ -200,12 +230,17 @@ class PGStringIndexerV2(StringIndexer):
 
         Returns None if the entry cannot be found.
         """
+        string = local_indexer_cache.get_string(id, use_case_id.value)
+        if string is not None:
+            return string
+
         table = self._table(use_case_id)
         try:
-            string: str = table.objects.get_from_cache(id=id, use_replica=True).string
+            string = table.objects.get_from_cache(id=id, use_replica=True).string
         except table.DoesNotExist:
             return None
 
+        local_indexer_cache.set_string(id, string, use_case_id.value)
         return string
 
     def _table(self, use_case_id: UseCaseKey) -> IndexerTable:
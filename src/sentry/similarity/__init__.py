@@ -139,4 +139,5 @@ def _build_dispatcher(methodname):
 
 merge = _build_dispatcher("merge")
 record = _build_dispatcher("record")
+bulk_record = _build_dispatcher("bulk_record")
 delete = _build_dispatcher("delete")
@@ -14,6 +14,15 @@ class AbstractIndexBackend(metaclass=ABCMeta):
     def record(self, scope, key, items, timestamp=None):
         pass
 
+    def record_many(self, scope, records):
+        """
+        Record many keys at once. ``records`` is a sequence of ``(key, items,
+        timestamp)`` tuples, with the arguments of ``record``.
+        """
+        return [
+            self.record(scope, key, items, timestamp=timestamp) for key, items, timestamp in records
+        ]
+
     @abstractmethod
     def merge(self, scope, destination, items, timestamp=None):
         pass
@@ -32,12 +32,15 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
         self.retention = retention
         self.candidate_set_limit = candidate_set_limit
 
-    def _build_signature_arguments(self, features):
+    def _build_signature_arguments(self, features, signature=None):
         if not features:
             return [0] * self.bands
 
+        if signature is None:
+            signature = self.signature_builder(features)
+
         arguments = []
-        for bucket in band(self.bands, self.signature_builder(features)):
+        for bucket in band(self.bands, signature):
             arguments.extend([1, ",".join(map("{}".format, bucket)), 1])
         return arguments
 
@@ -118,10 +121,7 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
 
         return self._as_search_result(self.__index(scope, arguments))
 
-    def record(self, scope, key, items, timestamp=None):
-        if not items:
-            return  # nothing to do
-
+    def _build_record_arguments(self, scope, key, items, timestamp, signatures=None):
         if timestamp is None:
             timestamp = int(time.time())
 
@@ -139,9 +139,35 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
 
         for idx, features in items:
             arguments.append(idx)
-            arguments.extend(self._build_signature_arguments(features))
+            signature = next(signatures) if signatures is not None and features else None
+            arguments.extend(self._build_signature_arguments(features, signature))
 
-        return self.__index(scope, arguments)
+        return arguments
+
+    def record(self, scope, key, items, timestamp=None):
+        if not items:
+            return  # nothing to do
+
+        return self.__index(scope, self._build_record_arguments(scope, key, items, timestamp))
+
+    def record_many(self, scope, records):
+        # Build the signatures of all records together, they share most of
+        # their features.
+        signatures = iter(
+            self.signature_builder.build_many(
+                [features for _, items, _ in records for _, features in items if features]
+            )
+        )
+
+        results = []
+        for key, items, timestamp in records:
+            if not items:
+                results.append(None)
+                continue
+
+            arguments = self._build_record_arguments(scope, key, items, timestamp, signatures)
+            results.append(self.__index(scope, arguments))
+        return results
 
     def merge(self, scope, destination, items, timestamp=None):
         if timestamp is None:
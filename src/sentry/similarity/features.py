@@ -95,6 +95,23 @@ class FeatureSet:
                 )
         return results
 
+    def __encode(self, event, label, features):
+        try:
+            return map(self.encoder.dumps, features)
+        except Exception as error:
+            log = (
+                logger.debug
+                if isinstance(error, self.expected_encoding_errors)
+                else functools.partial(logger.warning, exc_info=True)
+            )
+            log(
+                "Could not encode features from %r for %r due to error: %r",
+                event,
+                label,
+                error,
+            )
+            return None
+
     def record(self, events):
         if not events:
             return []
@@ -121,26 +138,37 @@ class FeatureSet:
                         self.__get_key(event.group) == key
                     ), "all events must be associated with the same group"
 
-                try:
-                    features = map(self.encoder.dumps, features)
-                except Exception as error:
-                    log = (
-                        logger.debug
-                        if isinstance(error, self.expected_encoding_errors)
-                        else functools.partial(logger.warning, exc_info=True)
-                    )
-                    log(
-                        "Could not encode features from %r for %r due to error: %r",
-                        event,
-                        label,
-                        error,
-                    )
-                else:
-                    if features:
-                        items.append((self.aliases[label], features))
+                features = self.__encode(event, label, features)
+                if features:
+                    items.append((self.aliases[label], features))
 
         return self.index.record(scope, key, items, timestamp=int(to_timestamp(event.datetime)))  # type: ignore
 
+    def bulk_record(self, events):
+        """
+        Record the features of events of any groups and projects, with one
+        index call per project.
+        """
+        records = {}
+        for event in events:
+            if not event.group_id:
+                continue
+
+            items = []
+            for label, features in self.extract(event).items():
+                features = self.__encode(event, label, features)
+                if features:
+                    items.append((self.aliases[label], features))
+            if not items:
+                continue
+
+            records.setdefault(self.__get_scope(event.project), []).append(
+                (self.__get_key(event.group), items, int(to_timestamp(event.datetime)))
+            )
+
+        for scope, scope_records in records.items():
+            self.index.record_many(scope, scope_records)
+
     def classify(self, events, limit=None, thresholds=None):
         if not events:
             return []
@@ -161,24 +189,10 @@ class FeatureSet:
                         self.__get_scope(event.project) == scope
                     ), "all events must be associated with the same project"
 
-                try:
-                    features = map(self.encoder.dumps, features)
-                except Exception as error:
-                    log = (
-                        logger.debug
-                        if isinstance(error, self.expected_encoding_errors)
-                        else functools.partial(logger.warning, exc_info=True)
-                    )
-                    log(
-                        "Could not encode features from %r for %r due to error: %r",
-                        event,
-                        label,
-                        error,
-                    )
-                else:
-                    if features:
-                        items.append((self.aliases[label], thresholds.get(label, 0), features))
-                        labels.append(label)
+                features = self.__encode(event, label, features)
+                if features:
+                    items.append((self.aliases[label], thresholds.get(label, 0), features))
+                    labels.append(label)
 
         return map(
             lambda key__scores: (int(key__scores[0]), dict(zip(labels, key__scores[1]))),
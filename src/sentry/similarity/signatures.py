@@ -15,3 +15,23 @@ class MinHashSignatureBuilder:
             ),
             range(self.columns),
         )
+
+    def build_many(self, feature_sets):
+        """
+        Build the signatures of many feature sets at once. Every distinct
+        feature is only hashed once, however many sets contain it.
+        """
+        hashes = {}
+        signatures = []
+        for features in feature_sets:
+            rows = []
+            for feature in features:
+                row = hashes.get(feature)
+                if row is None:
+                    row = hashes[feature] = [
+                        mmh3.hash(feature, column) % self.rows for column in range(self.columns)
+                    ]
+                rows.append(row)
+            # The signature is the minimum of every column
+            signatures.append([min(column) for column in zip(*rows)])
+        return signatures
@@ -1,3 +1,4 @@
+import copy
 import logging
 from collections import OrderedDict, namedtuple
 from datetime import datetime
@@ -5,14 +6,24 @@ from datetime import datetime
 import sentry_sdk
 from django.utils import timezone
 
+from sentry import options
 from sentry.models import Project, Release
 from sentry.stacktraces.functions import set_in_app, trim_function_name
+from sentry.utils import json, metrics
 from sentry.utils.cache import cache
-from sentry.utils.hashlib import hash_values
+from sentry.utils.datastructures import LRUCache
+from sentry.utils.hashlib import hash_values, md5_text
 from sentry.utils.safe import get_path, safe_execute
 
 logger = logging.getLogger(__name__)
 
+FRAME_RESULT_CACHE_TIMEOUT = 3600
+FRAME_RESULT_LOCAL_CACHE_SIZE = 10000
+
+# Results of ``process_frame`` that are shared between the events of this
+# process, in front of the shared cache.
+_frame_result_local_cache = LRUCache(FRAME_RESULT_LOCAL_CACHE_SIZE)
+
 StacktraceInfo = namedtuple(
     "StacktraceInfo", ["stacktrace", "container", "platforms", "is_exception"]
 )
@@ -30,6 +41,8 @@ class ProcessableFrame:
         self.data = None
         self.cache_key = None
         self.cache_value = None
+        self.result_cache_key = None
+        self.cached_result = None
         self.processable_frames = processable_frames
 
     def __repr__(self):
@@ -77,11 +90,33 @@ class ProcessableFrame:
         self.cache_key = rv = "pf:%s" % h
         return rv
 
+    def set_result_cache_key_from_values(self, values):
+        """Sets the key under which the result of ``process_frame`` for this
+        frame is cached.  The key covers the processor, its frame result
+        cache version, the given values and the frame itself.
+        """
+        if values is None:
+            self.result_cache_key = None
+            return
+
+        processor_name = self.processor.__class__.__name__
+        h = hash_values(
+            [
+                self.processor.frame_result_cache_version,
+                values,
+                md5_text(json.dumps(self.frame)).hexdigest(),
+            ],
+            seed=processor_name,
+        )
+        self.result_cache_key = rv = f"pfr:{processor_name}:{h}"
+        return rv
+
 
 class StacktraceProcessingTask:
     def __init__(self, processable_stacktraces, processors):
         self.processable_stacktraces = processable_stacktraces
         self.processors = processors
+        self.frame_results_to_cache = {}
 
     def close(self):
         for frame in self.iter_processable_frames():
@@ -101,6 +136,10 @@ class StacktraceProcessingTask:
 
 
 class StacktraceProcessor:
+    #: Bump this whenever ``process_frame`` changes its results for the same
+    #: input, to invalidate frame results cached by earlier versions.
+    frame_result_cache_version = 1
+
     def __init__(self, data, stacktrace_infos, project=None):
         self.data = data
         self.stacktrace_infos = stacktrace_infos
@@ -163,6 +202,14 @@ class StacktraceProcessor:
         """
         return False
 
+    def get_frame_result_cache_values(self, processable_frame):
+        """Returns the values which, together with the frame itself, fully
+        determine the result of ``process_frame`` for this frame, or `None`
+        if the result must not be shared with other events.  This is invoked
+        after the preprocessing step.
+        """
+        return None
+
 
 def find_stacktraces_in_data(data, include_raw=False, with_exceptions=False):
     """Finds all stacktraces in a given data blob and returns it
@@ -370,10 +417,21 @@ def process_single_stacktrace(processing_task, stacktrace_info, processable_fram
         if idx in processable_frames:
             processable_frame = processable_frames[idx]
             assert processable_frame.frame is bare_frame
-            try:
-                rv = processable_frame.processor.process_frame(processable_frame, processing_task)
-            except Exception:
-                logger.exception("Failed to process frame")
+            if processable_frame.cached_result is not None:
+                rv = processable_frame.cached_result or None
+            else:
+                try:
+                    rv = processable_frame.processor.process_frame(
+                        processable_frame, processing_task
+                    )
+                except Exception:
+                    logger.exception("Failed to process frame")
+                else:
+                    if processable_frame.result_cache_key is not None:
+                        # Later steps modify the frames of the event in place
+                        processing_task.frame_results_to_cache[
+                            processable_frame.result_cache_key
+                        ] = copy.deepcopy(rv or ())
 
         expand_processed, expand_raw, errors = rv or (None, None, None)
 
@@ -441,12 +499,65 @@ def get_crash_frame_from_event_data(data, frame_filter=None):
 
 
 def lookup_frame_cache(keys):
-    rv = {}
+    rv = cache.get_many(list(keys))
     for key in keys:
-        rv[key] = cache.get(key)
+        rv.setdefault(key, None)
     return rv
 
 
+def lookup_frame_results(processing_task):
+    """Looks up the cached ``process_frame`` results of all frames of the
+    task, first in the local cache and then in one batch in the shared cache.
+    A frame for which ``process_frame`` returned nothing gets an empty tuple.
+    """
+    by_key = {}
+    for processor in processing_task.iter_processors():
+        for processable_frame in processing_task.iter_processable_frames(processor):
+            values = processor.get_frame_result_cache_values(processable_frame)
+            key = processable_frame.set_result_cache_key_from_values(values)
+            if key is not None:
+                by_key.setdefault(key, []).append(processable_frame)
+
+    if not by_key:
+        return
+
+    results = {}
+    for key in by_key:
+        result = _frame_result_local_cache.get(key)
+        if result is not None:
+            results[key] = result
+
+    missing = [key for key in by_key if key not in results]
+    if missing:
+        for key, result in cache.get_many(missing).items():
+            if result is not None:
+                _frame_result_local_cache.set(key, result)
+                results[key] = result
+
+    for key, result in results.items():
+        for processable_frame in by_key[key]:
+            processable_frame.cached_result = copy.deepcopy(result)
+
+    metrics.incr(
+        "stacktraces.frame_result_cache.lookup", amount=len(results), tags={"result": "hit"}
+    )
+    metrics.incr(
+        "stacktraces.frame_result_cache.lookup",
+        amount=len(by_key) - len(results),
+        tags={"result": "miss"},
+    )
+
+
+def store_frame_results(processing_task):
+    to_cache = processing_task.frame_results_to_cache
+    if not to_cache:
+        return
+
+    for key, result in to_cache.items():
+        _frame_result_local_cache.set(key, result)
+    cache.set_many(to_cache, FRAME_RESULT_CACHE_TIMEOUT)
+
+
 def get_stacktrace_processing_task(infos, processors):
     """Returns a list of all tasks for the processors.  This can skip over
     processors that seem to not handle any frames.
@@ -517,6 +628,10 @@ def process_stacktraces(data, make_processors=None, set_raw_stacktrace=True):
                     changed = True
                     span.set_data("data_changed", True)
 
+        use_frame_result_cache = options.get("processing.frame-result-cache-enabled")
+        if use_frame_result_cache:
+            lookup_frame_results(processing_task)
+
         # Process all stacktraces
         for stacktrace_info, processable_frames in processing_task.iter_processable_stacktraces():
             # Let the stacktrace processors touch the exception
@@ -557,6 +672,9 @@ def process_stacktraces(data, make_processors=None, set_raw_stacktrace=True):
                 data.setdefault("_metrics", {})["flag.processing.error"] = True
                 changed = True
 
+        if use_frame_result_cache:
+            store_frame_results(processing_task)
+
     except Exception:
         logger.exception("stacktraces.processing.crash")
         data.setdefault("_metrics", {})["flag.processing.fatal"] = True
@@ -1,12 +1,14 @@
 import logging
 import time
 
+from sentry import options
 from sentry.digests import get_option_key
 from sentry.digests.backends.base import InvalidState
 from sentry.digests.notifications import build_digest, split_key
 from sentry.models import Project, ProjectOption
 from sentry.tasks.base import instrumented_task
 from sentry.utils import snuba
+from sentry.utils.iterators import chunked
 
 logger = logging.getLogger(__name__)
 
@@ -28,14 +30,40 @@ def schedule_digests():
     timeout = 300
     digests.maintenance(deadline - timeout)
 
+    batch_size = options.get("digests.delivery-batch-size")
+    if batch_size > 0:
+        for entries in chunked(digests.schedule(deadline), batch_size):
+            deliver_digests.delay([entry.key for entry in entries])
+        return
+
     for entry in digests.schedule(deadline):
         deliver_digest.delay(entry.key, entry.timestamp)
 
 
+def _get_minimum_delay(project):
+    return ProjectOption.objects.get_value(project, get_option_key("mail", "minimum_delay"))
+
+
+def _notify_digest(project, digest, logs, target_type, target_identifier):
+    from sentry.mail import mail_adapter
+
+    if digest:
+        mail_adapter.notify_digest(project, digest, target_type, target_identifier)
+    else:
+        logger.info(
+            "Skipped digest delivery due to empty digest",
+            extra={
+                "project": project.id,
+                "target_type": target_type.value,
+                "target_identifier": target_identifier,
+                "build_digest_logs": logs,
+            },
+        )
+
+
 @instrumented_task(name="sentry.tasks.digests.deliver_digest", queue="digests.delivery")
 def deliver_digest(key, schedule_timestamp=None):
     from sentry import digests
-    from sentry.mail import mail_adapter
 
     try:
         project, target_type, target_identifier = split_key(key)
@@ -44,9 +72,7 @@ def deliver_digest(key, schedule_timestamp=None):
         digests.delete(key)
         return
 
-    minimum_delay = ProjectOption.objects.get_value(
-        project, get_option_key("mail", "minimum_delay")
-    )
+    minimum_delay = _get_minimum_delay(project)
 
     with snuba.options_override({"consistent": True}):
         try:
@@ -56,15 +82,45 @@ def deliver_digest(key, schedule_timestamp=None):
             logger.info(f"Skipped digest delivery: {error}", exc_info=True)
             return
 
-        if digest:
-            mail_adapter.notify_digest(project, digest, target_type, target_identifier)
-        else:
-            logger.info(
-                "Skipped digest delivery due to empty digest",
-                extra={
-                    "project": project.id,
-                    "target_type": target_type.value,
-                    "target_identifier": target_identifier,
-                    "build_digest_logs": logs,
-                },
-            )
+        _notify_digest(project, digest, logs, target_type, target_identifier)
+
+
+@instrumented_task(name="sentry.tasks.digests.deliver_digests", queue="digests.delivery")
+def deliver_digests(keys):
+    """
+    Deliver the digests of several timelines, opening and closing all of them
+    with one backend call. Timelines whose digest fails to build are left
+    open to be rescheduled.
+    """
+    from sentry import digests
+
+    targets = {}
+    minimum_delays = {}
+    for key in keys:
+        try:
+            targets[key] = split_key(key)
+        except Project.DoesNotExist as error:
+            logger.info(f"Cannot deliver digest {key} due to error: {error}")
+            digests.delete(key)
+            continue
+        minimum_delays[key] = _get_minimum_delay(targets[key][0])
+
+    with snuba.options_override({"consistent": True}):
+        results = []
+        with digests.digest_many(minimum_delays) as timelines:
+            for key, records in list(timelines.items()):
+                project, target_type, target_identifier = targets[key]
+                try:
+                    digest, logs = build_digest(project, records)
+                except Exception:
+                    logger.exception("Failed to build digest", extra={"key": key})
+                    del timelines[key]
+                    continue
+                results.append((project, digest, logs, target_type, target_identifier))
+
+        skipped = set(minimum_delays) - set(timelines)
+        if skipped:
+            logger.info("Skipped delivery of digests", extra={"keys": sorted(skipped)})
+
+        for result in results:
+            _notify_digest(*result)
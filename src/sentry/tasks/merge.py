@@ -5,6 +5,7 @@ from django.db.models import F
 
 from sentry import eventstream, similarity
 from sentry.app import tsdb
+from sentry.grouping import grouphash_cache
 from sentry.tasks.base import instrumented_task, track_group_async_operation
 
 logger = logging.getLogger("sentry.merge")
@@ -216,6 +217,8 @@ def _get_event_environment(event, project, cache):
 
 
 def merge_objects(models, group, new_group, limit=1000, logger=None, transaction_id=None):
+    from sentry.models import GroupHash
+
     has_more = False
     for model in models:
         all_fields = [f.name for f in model._meta.get_fields()]
@@ -238,7 +241,8 @@ def merge_objects(models, group, new_group, limit=1000, logger=None, transaction
         else:
             queryset = project_qs.filter(group_id=group.id)
 
-        for obj in queryset[:limit]:
+        objs = list(queryset[:limit])
+        for obj in objs:
             try:
                 with transaction.atomic(using=router.db_for_write(model)):
                     if has_group:
@@ -269,6 +273,10 @@ def merge_objects(models, group, new_group, limit=1000, logger=None, transaction
                     )
             has_more = True
 
+        if model is GroupHash and objs:
+            # Only the hashes moved in this chunk changed their group
+            grouphash_cache.invalidate_hashes(group.project_id, [obj.hash for obj in objs])
+
         if has_more:
             return True
     return has_more
@@ -120,22 +120,7 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
         # it could be possible that refrequent invalidations cause the task to take excessive time
         # to complete.
         for organization in Organization.objects.filter(id=organization_id):
-            for project in Project.objects.filter(organization_id=organization_id):
-                project.set_cached_field_value("organization", organization)
-                for key in ProjectKey.objects.filter(project_id=project.id):
-                    key.set_cached_field_value("project", project)
-                    # If we find the config in the cache it means it was active.  As such we want to
-                    # recalculate it.  If the config was not there at all, we leave it and avoid the
-                    # cost of re-computation.
-                    if projectconfig_cache.get(key.public_key) is not None:
-                        configs[key.public_key] = compute_projectkey_config(key)
-                        action = "recompute"
-                    else:
-                        action = "not-cached"
-                    metrics.incr(
-                        "relay.projectconfig_cache.invalidation.recompute",
-                        tags={"action": action, "scope": "organization"},
-                    )
+            configs.update(compute_organization_configs(organization))
     elif project_id:
         for project in Project.objects.filter(id=project_id):
             for key in ProjectKey.objects.filter(project_id=project_id):
@@ -174,6 +159,49 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
     return configs
 
 
+def compute_organization_configs(organization):
+    """Computes the configs of all project keys in an organization in bulk.
+
+    Projects, keys, project options and feature flags are loaded with a fixed
+    number of queries and the cache is checked with a single ``get_many``.
+    Only the configs of keys that are found in the cache are computed.
+
+    :returns: A dict mapping the affected public keys to their config, which
+       can be passed to ``projectconfig_cache.set_many``.
+    """
+    from sentry.models import Project, ProjectKey
+    from sentry.relay.config import get_project_key_configs
+
+    projects = {}
+    for project in Project.objects.filter(organization_id=organization.id):
+        project.set_cached_field_value("organization", organization)
+        projects[project.id] = project
+
+    keys = list(ProjectKey.objects.filter(project__organization_id=organization.id))
+    cached_configs = projectconfig_cache.get_many([key.public_key for key in keys])
+
+    # If we find the config in the cache it means it was active.  As such we want to
+    # recalculate it.  If the config was not there at all, we leave it and avoid the
+    # cost of re-computation.
+    keys_to_compute = []
+    for key in keys:
+        key.set_cached_field_value("project", projects[key.project_id])
+        if cached_configs.get(key.public_key) is not None:
+            keys_to_compute.append(key)
+
+    for action, amount in (
+        ("recompute", len(keys_to_compute)),
+        ("not-cached", len(keys) - len(keys_to_compute)),
+    ):
+        metrics.incr(
+            "relay.projectconfig_cache.invalidation.recompute",
+            amount=amount,
+            tags={"action": action, "scope": "organization"},
+        )
+
+    return get_project_key_configs(organization, keys_to_compute)
+
+
 def compute_projectkey_config(key):
     """Computes a single config for the given :class:`ProjectKey`.
 
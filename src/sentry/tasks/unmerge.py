@@ -9,6 +9,7 @@ from sentry import eventstore, similarity
 from sentry.app import tsdb
 from sentry.constants import DEFAULT_LOGGER_NAME, LOG_LEVELS_MAP
 from sentry.event_manager import generate_culprit
+from sentry.grouping import grouphash_cache
 from sentry.models import (
     Activity,
     Environment,
@@ -433,8 +434,7 @@ def repair_denormalizations(caches, project, events):
     repair_group_release_data(caches, project, events)
     repair_tsdb_data(caches, project, events)
 
-    for event in events:
-        similarity.record(project, [event])
+    similarity.bulk_record(project, events)
 
 
 def lock_hashes(project_id, source_id, fingerprints):
@@ -451,7 +451,9 @@ def lock_hashes(project_id, source_id, fingerprints):
             state=GroupHash.State.LOCKED_IN_MIGRATION
         )
 
-    return [h.hash for h in eligible_hashes]
+    locked_hashes = [h.hash for h in eligible_hashes]
+    grouphash_cache.invalidate_hashes(project_id, locked_hashes)
+    return locked_hashes
 
 
 def unlock_hashes(project_id, locked_primary_hashes):
@@ -461,6 +463,8 @@ def unlock_hashes(project_id, locked_primary_hashes):
         state=GroupHash.State.LOCKED_IN_MIGRATION,
     ).update(state=GroupHash.State.UNLOCKED)
 
+    grouphash_cache.invalidate_hashes(project_id, locked_primary_hashes)
+
 
 @instrumented_task(name="sentry.tasks.unmerge", queue="unmerge")
 def unmerge(*posargs, **kwargs):
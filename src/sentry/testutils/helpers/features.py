@@ -64,11 +64,30 @@ def Feature(names):
             feature_names = {name: True for name in names if name.startswith("organization")}
             return {f"organization:{organization.id}": feature_names}
 
+    default_prefetch_for_projects = sentry.features.prefetch_for_projects
+
+    def prefetch_for_projects_override(feature_names, organization, projects, *args, **kwargs):
+        result = dict(
+            default_prefetch_for_projects(
+                [name for name in feature_names if name not in names],
+                organization,
+                projects,
+                *args,
+                **kwargs,
+            )
+        )
+        for name in feature_names:
+            if name in names:
+                result[name] = {project: names[name] for project in projects}
+        return result
+
     with patch("sentry.features.has") as features_has:
         features_has.side_effect = features_override
         with patch("sentry.features.batch_has") as features_batch_has:
             features_batch_has.side_effect = batch_features_override
-            yield
+            with patch("sentry.features.prefetch_for_projects") as features_prefetch_for_projects:
+                features_prefetch_for_projects.side_effect = prefetch_for_projects_override
+                yield
 
 
 def with_feature(feature):
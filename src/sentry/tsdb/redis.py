@@ -1,6 +1,7 @@
 import itertools
 import logging
 import random
+import struct
 import uuid
 from collections import defaultdict, namedtuple
 from functools import reduce
@@ -11,7 +12,7 @@ from django.utils import timezone
 from django.utils.encoding import force_bytes
 from pkg_resources import resource_string
 
-from sentry.tsdb.base import BaseTSDB
+from sentry.tsdb.base import BaseTSDB, TSDBModel
 from sentry.utils.compat import crc32, map
 from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.redis import SentryScript, check_cluster_versions, get_cluster_from_options
@@ -52,6 +53,16 @@ class SuppressionWrapper:
         return True
 
 
+def decode_counters(value):
+    """\
+    Decodes a block of counters in the columnar layout, a string of
+    big-endian unsigned 32 bit integers as written by ``BITFIELD``.
+    """
+    if not value:
+        return ()
+    return struct.unpack(">%dI" % (len(value) // 4), value[: len(value) // 4 * 4])
+
+
 class RedisTSDB(BaseTSDB):
     """
     A time series storage backend for Redis.
@@ -80,6 +91,23 @@ class RedisTSDB(BaseTSDB):
             ...
         }
 
+    Models listed in ``columnar_models`` store simple counters in a columnar
+    layout instead. Every key has one string per block of
+    ``columnar_block_size`` consecutive rollup intervals, which holds one
+    unsigned 32 bit counter per interval, updated with ``BITFIELD``::
+
+        {
+            "<model>:c<rollup>:<block>:<key>": <uint32><uint32>...,
+            ...
+        }
+
+    This needs a lot less memory for keys that see events in most
+    intervals, and a range is read with a handful of ``GET`` commands instead
+    of one ``HGET`` per interval. Blocks expire together with their last
+    interval. Models listed in ``columnar_dual_write_models`` are written in
+    both layouts but still read from hashes, so the columnar layout can be
+    filled before a model is switched over.
+
     Distinct counters are stored using HyperLogLog, which provides a
     cardinality estimate with a standard error of 0.8%. The data layout looks
     something like this::
@@ -114,6 +142,13 @@ class RedisTSDB(BaseTSDB):
         self.prefix = prefix
         self.vnodes = vnodes
         self.enable_frequency_sketches = options.pop("enable_frequency_sketches", False)
+        self.columnar_models = frozenset(
+            TSDBModel[model] for model in options.pop("columnar_models", ())
+        )
+        self.columnar_dual_write_models = frozenset(
+            TSDBModel[model] for model in options.pop("columnar_dual_write_models", ())
+        )
+        self.columnar_block_size = options.pop("columnar_block_size", 64)
         super().__init__(**options)
 
     def validate(self):
@@ -183,6 +218,55 @@ class RedisTSDB(BaseTSDB):
             self.add_environment_parameter(model_key, environment_id),
         )
 
+    def make_columnar_key(self, model, rollup, block, key, environment_id):
+        """
+        Make a key that is used for a block of counter values in the columnar
+        layout.
+        """
+        return self.add_environment_parameter(
+            "{prefix}{model}:c{rollup}:{block}:{key}".format(
+                prefix=self.prefix,
+                model=model.value,
+                rollup=rollup,
+                block=block,
+                key=self.get_model_key(key),
+            ),
+            environment_id,
+        )
+
+    def get_columnar_position(self, rollup, timestamp):
+        """
+        Returns a 2-tuple of the block and the offset within the block of the
+        counter for ``timestamp`` in the columnar layout.
+        """
+        return divmod(self.normalize_to_rollup(timestamp, rollup), self.columnar_block_size)
+
+    def calculate_columnar_expiry(self, rollup, samples, block):
+        """
+        Calculate the expiration time of a block, which is the expiration
+        time of its last counter.
+        """
+        last_interval = (block + 1) * self.columnar_block_size - 1
+        return (last_interval + samples) * rollup
+
+    def is_columnar_write(self, model):
+        return model in self.columnar_models or model in self.columnar_dual_write_models
+
+    def write_columnar_counters(self, client, operations, expiries, command="INCRBY"):
+        """
+        Apply ``{key: {offset: value}}`` to the blocks of the columnar layout
+        with one ``BITFIELD`` per block. ``client`` must be a fanout client.
+        """
+        for key, values in operations.items():
+            arguments = ["OVERFLOW", "SAT"]
+            for offset, value in sorted(values.items()):
+                arguments.extend([command, "u32", f"#{offset}", value])
+
+            c = client.target_key(key)
+            c.execute_command("BITFIELD", key, *arguments)
+            # Also sets an expiry for blocks that ``SET`` just created.
+            c.expireat(key, expiries[key])
+
     def get_model_key(self, key):
         # We specialize integers so that a pure int-map can be optimized by
         # Redis, whereas long strings (say tag values) will store in a more
@@ -228,6 +312,11 @@ class RedisTSDB(BaseTSDB):
             if not durable:
                 manager = SuppressionWrapper(manager)
 
+            # columnar key -> offset -> count
+            columnar_operations = defaultdict(lambda: defaultdict(int))
+            # columnar key -> expiration
+            columnar_expiries = {}
+
             with manager as client:
                 # (hash_key, hash_field) -> count
                 key_operations = defaultdict(lambda: 0)
@@ -248,6 +337,19 @@ class RedisTSDB(BaseTSDB):
                         expiry = self.calculate_expiry(rollup, max_values, timestamp)
 
                         for environment_id in environment_ids:
+                            if self.is_columnar_write(model):
+                                block, offset = self.get_columnar_position(rollup, timestamp)
+                                columnar_key = self.make_columnar_key(
+                                    model, rollup, block, key, environment_id
+                                )
+                                columnar_operations[columnar_key][offset] += count
+                                columnar_expiries[columnar_key] = self.calculate_columnar_expiry(
+                                    rollup, max_values, block
+                                )
+
+                            if model in self.columnar_models:
+                                continue
+
                             hash_key, hash_field = self.make_counter_key(
                                 model, rollup, timestamp, key, environment_id
                             )
@@ -262,6 +364,14 @@ class RedisTSDB(BaseTSDB):
                     if key_expiries.get(hash_key):
                         client.expireat(hash_key, key_expiries.pop(hash_key))
 
+            if columnar_operations:
+                manager = cluster.fanout()
+                if not durable:
+                    manager = SuppressionWrapper(manager)
+
+                with manager as client:
+                    self.write_columnar_counters(client, columnar_operations, columnar_expiries)
+
     def get_range(
         self,
         model,
@@ -291,6 +401,9 @@ class RedisTSDB(BaseTSDB):
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
         series = map(to_datetime, series)
 
+        if model in self.columnar_models:
+            return self.get_range_columnar(model, keys, rollup, series, environment_id)
+
         results = []
         cluster, _ = self.get_cluster(environment_id)
         with cluster.map() as client:
@@ -311,6 +424,36 @@ class RedisTSDB(BaseTSDB):
             results_by_key[key] = sorted(points.items())
         return dict(results_by_key)
 
+    def get_range_columnar(self, model, keys, rollup, series, environment_id):
+        positions = [
+            (to_timestamp(timestamp),) + self.get_columnar_position(rollup, timestamp)
+            for timestamp in series
+        ]
+        blocks = {block for _, block, _ in positions}
+
+        cluster, _ = self.get_cluster(environment_id)
+        with cluster.map() as client:
+            promises = {
+                (key, block): client.get(
+                    self.make_columnar_key(model, rollup, block, key, environment_id)
+                )
+                for key in keys
+                for block in blocks
+            }
+
+        counters = {k: decode_counters(promise.value) for k, promise in promises.items()}
+
+        results_by_key = {}
+        for key in keys:
+            points = []
+            for epoch, block, offset in positions:
+                block_counters = counters[(key, block)]
+                points.append(
+                    (epoch, block_counters[offset] if offset < len(block_counters) else 0)
+                )
+            results_by_key[key] = sorted(points)
+        return results_by_key
+
     def merge(self, model, destination, sources, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
             [None]
@@ -320,6 +463,12 @@ class RedisTSDB(BaseTSDB):
 
         rollups = self.get_active_series(timestamp=timestamp)
 
+        if self.is_columnar_write(model):
+            self.merge_columnar(model, destination, sources, rollups, environment_ids)
+
+        if model in self.columnar_models:
+            return
+
         for (cluster, durable), environment_ids in self.get_cluster_groups(environment_ids):
             manager = cluster.map()
             if not durable:
@@ -359,6 +508,54 @@ class RedisTSDB(BaseTSDB):
                                     self.calculate_expiry(rollup, self.rollups[rollup], timestamp),
                                 )
 
+    def merge_columnar(self, model, destination, sources, rollups, environment_ids):
+        for (cluster, durable), environment_ids in self.get_cluster_groups(environment_ids):
+            # rollup -> block -> offsets of the active series in the block
+            active_offsets = {}
+            for rollup, series in rollups.items():
+                active_offsets[rollup] = defaultdict(set)
+                for timestamp in series:
+                    block, offset = self.get_columnar_position(rollup, timestamp)
+                    active_offsets[rollup][block].add(offset)
+
+            manager = cluster.map()
+            if not durable:
+                manager = SuppressionWrapper(manager)
+
+            with manager as client:
+                promises = []
+                for rollup, blocks in active_offsets.items():
+                    for block in blocks:
+                        for source in sources:
+                            for environment_id in environment_ids:
+                                source_key = self.make_columnar_key(
+                                    model, rollup, block, source, environment_id
+                                )
+                                promises.append(
+                                    (rollup, block, environment_id, client.get(source_key))
+                                )
+                                client.delete(source_key)
+
+            operations = defaultdict(lambda: defaultdict(int))
+            expiries = {}
+            for rollup, block, environment_id, promise in promises:
+                for offset, count in enumerate(decode_counters(promise.value)):
+                    if count and offset in active_offsets[rollup][block]:
+                        destination_key = self.make_columnar_key(
+                            model, rollup, block, destination, environment_id
+                        )
+                        operations[destination_key][offset] += count
+                        expiries[destination_key] = self.calculate_columnar_expiry(
+                            rollup, self.rollups[rollup], block
+                        )
+
+            manager = cluster.fanout()
+            if not durable:
+                manager = SuppressionWrapper(manager)
+
+            with manager as client:
+                self.write_columnar_counters(client, operations, expiries)
+
     def delete(self, models, keys, start=None, end=None, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
             [None]
@@ -368,6 +565,18 @@ class RedisTSDB(BaseTSDB):
 
         rollups = self.get_active_series(start, end, timestamp)
 
+        columnar_models = [model for model in models if self.is_columnar_write(model)]
+        if columnar_models:
+            self.delete_columnar(
+                columnar_models,
+                keys,
+                rollups,
+                environment_ids,
+                whole_blocks=start is None and end is None,
+            )
+
+        models = [model for model in models if model not in self.columnar_models]
+
         for (cluster, durable), environment_ids in self.get_cluster_groups(environment_ids):
             manager = cluster.map()
             if not durable:
@@ -385,6 +594,46 @@ class RedisTSDB(BaseTSDB):
 
                                     client.hdel(hash_key, hash_field)
 
+    def delete_columnar(self, models, keys, rollups, environment_ids, whole_blocks=False):
+        """
+        Reset the counters of the given series. If ``whole_blocks`` is set,
+        the series covers everything that is retained and the blocks are
+        deleted instead.
+        """
+        for (cluster, durable), environment_ids in self.get_cluster_groups(environment_ids):
+            operations = defaultdict(dict)
+            expiries = {}
+            for rollup, series in rollups.items():
+                for timestamp in series:
+                    block, offset = self.get_columnar_position(rollup, timestamp)
+                    for model in models:
+                        for key in keys:
+                            for environment_id in environment_ids:
+                                columnar_key = self.make_columnar_key(
+                                    model, rollup, block, key, environment_id
+                                )
+                                operations[columnar_key][offset] = 0
+                                expiries[columnar_key] = self.calculate_columnar_expiry(
+                                    rollup, self.rollups[rollup], block
+                                )
+
+            if whole_blocks:
+                manager = cluster.map()
+                if not durable:
+                    manager = SuppressionWrapper(manager)
+
+                with manager as client:
+                    for columnar_key in operations:
+                        client.delete(columnar_key)
+                continue
+
+            manager = cluster.fanout()
+            if not durable:
+                manager = SuppressionWrapper(manager)
+
+            with manager as client:
+                self.write_columnar_counters(client, operations, expiries, command="SET")
+
     def record(self, model, key, values, timestamp=None, environment_id=None):
         self.validate_arguments([model], [environment_id])
 
@@ -68,6 +68,10 @@ class CanonicalKeyView(Mapping):
             elif all(k not in keys for k in canonicals):
                 yield canonicals[0]
 
+    def __contains__(self, key):
+        canonical = get_canonical_name(key)
+        return any(k in self.data for k in (canonical,) + LEGACY_KEY_MAPPING.get(canonical, ()))
+
     def __getitem__(self, key):
         canonical = get_canonical_name(key)
         for k in (canonical,) + LEGACY_KEY_MAPPING.get(canonical, ()):
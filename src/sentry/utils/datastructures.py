@@ -1,3 +1,6 @@
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Hashable, MutableMapping
 
 __unset__ = object()
@@ -59,3 +62,99 @@ class BidirectionalMapping(MutableMapping):
 
     def inverse(self):
         return self.__inverse.copy()
+
+
+class LRUCache:
+    """\
+    A thread-safe, size-bounded in-process cache that evicts the least
+    recently used entry once ``maxsize`` is exceeded.
+
+    If ``ttl`` is given (in seconds), entries older than that are treated as
+    missing. This bounds how long a process can serve a value that has been
+    invalidated by another process.
+
+    By default ``maxsize`` is a number of entries. If ``sizeof`` is given, it
+    is called with every value and ``maxsize`` bounds the sum of the results
+    instead. Values larger than ``maxsize`` on their own are not cached.
+    """
+
+    def __init__(self, maxsize, ttl=None, sizeof=None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.__data = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def size(self):
+        """The total size of all entries, as measured by ``sizeof``."""
+        return self.__size
+
+    def __pop(self, key):
+        _, _, size = self.__data.pop(key)
+        self.__size -= size
+
+    def get(self, key, default=None):
+        with self.__lock:
+            try:
+                value, expires_at, _ = self.__data[key]
+            except KeyError:
+                return default
+
+            if expires_at is not None and expires_at <= time.monotonic():
+                self.__pop(key)
+                return default
+
+            self.__data.move_to_end(key)
+            return value
+
+    def get_many(self, keys):
+        """Return a dictionary of all keys that are present in the cache."""
+        rv = {}
+        for key in keys:
+            value = self.get(key, __unset__)
+            if value is not __unset__:
+                rv[key] = value
+        return rv
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        size = self.sizeof(value) if self.sizeof is not None else 1
+        with self.__lock:
+            if key in self.__data:
+                self.__pop(key)
+            if size > self.maxsize:
+                return
+
+            self.__data[key] = (value, expires_at, size)
+            self.__size += size
+            while self.__size > self.maxsize:
+                self.__pop(next(iter(self.__data)))
+
+    def set_many(self, items):
+        for key, value in items.items():
+            self.set(key, value)
+
+    def delete(self, key):
+        with self.__lock:
+            if key in self.__data:
+                self.__pop(key)
+
+    def delete_many(self, keys):
+        for key in keys:
+            self.delete(key)
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
+            self.__size = 0
+
+    def __contains__(self, key):
+        return self.get(key, __unset__) is not __unset__
+
+    def __len__(self):
+        return len(self.__data)
@@ -1,6 +1,8 @@
 import logging
+import os
+import time
 from queue import Full, Queue
-from threading import Thread
+from threading import Lock, Thread
 
 import redis
 
@@ -62,6 +64,59 @@ class RedisPublisher:
             self.rds.publish(channel, value)
 
 
+class RedisSubscriber:
+    """
+    Calls ``callback`` with the value of every message published to a
+    channel, from a background thread.
+
+    Messages published while the connection is down are lost, so this
+    should only be used to speed up the propagation of changes that are
+    also picked up by other means.
+
+    The background thread does not survive ``fork``. ``start`` is cheap once
+    the subscriber runs, and starts it again in forked processes, so it can
+    be called lazily from the code that relies on the messages.
+    """
+
+    def __init__(self, connection, channel, callback, retry_delay=1.0):
+        self.connection = connection
+        self.channel = channel
+        self.callback = callback
+        self.retry_delay = retry_delay
+        self._pid = None
+        self._lock = Lock()
+
+    def _listen(self):
+        pubsub = redis.StrictRedis(**self.connection).pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        for message in pubsub.listen():
+            self.callback(message["data"])
+
+    def start(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        with self._lock:
+            if self._pid == pid:
+                return
+
+            def worker():
+                while True:
+                    try:
+                        self._listen()
+                    except Exception as e:
+                        logger = logging.getLogger("sentry.errors")
+                        logger.debug("could not receive pubsub messages: %s" % e)
+                    time.sleep(self.retry_delay)
+
+            t = Thread(target=worker)
+            t.setDaemon(True)
+            t.start()
+
+            self._pid = pid
+
+
 class KafkaPublisher:
     def __init__(self, connection, asynchronous=True):
         from confluent_kafka import Producer
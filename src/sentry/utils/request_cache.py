@@ -33,6 +33,19 @@ def request_cache(func):
     return wrapped
 
 
+def get_request_cache(namespace):
+    """
+    Returns a dict to memoize values in for the duration of the current
+    request, or None if there is no request.
+    """
+    if app.env.request is None:
+        return None
+
+    if not hasattr(_cache, "items"):
+        _cache.items = {}
+    return _cache.items.setdefault(namespace, {})
+
+
 def clear_cache(**kwargs):
     _cache.items = {}
 
@@ -6,7 +6,7 @@ import re
 import time
 from collections import OrderedDict, namedtuple
 from concurrent.futures import ThreadPoolExecutor
-from contextlib import contextmanager
+from contextlib import ExitStack, contextmanager
 from copy import deepcopy
 from datetime import datetime, timedelta
 from hashlib import sha1
@@ -40,6 +40,7 @@ from sentry.snuba.events import Columns
 from sentry.utils import json, metrics
 from sentry.utils.compat import map
 from sentry.utils.dates import outside_retention_with_modified_start, to_timestamp
+from sentry.utils.locking import UnableToAcquireLock
 
 logger = logging.getLogger(__name__)
 
@@ -717,8 +718,8 @@ def get_cache_key(query: SnubaQuery) -> str:
     else:
         hashable = json.dumps(query, sort_keys=True)
 
-    # sqc - Snuba Query Cache
-    return f"sqc:{sha1(hashable.encode('utf-8')).hexdigest()}"
+    # sqc - Snuba Query Cache, v2 values carry the time they are fresh until
+    return f"sqc2:{sha1(hashable.encode('utf-8')).hexdigest()}"
 
 
 def bulk_raw_query(
@@ -730,6 +731,46 @@ def bulk_raw_query(
     return _apply_cache_and_build_results(params, referrer=referrer, use_cache=use_cache)
 
 
+def _get_query_cache_lock(cache_key: str):
+    from sentry.app import locks
+
+    # The lock must outlive the query it guards.
+    return locks.get(
+        f"{cache_key}:lock", duration=settings.SENTRY_SNUBA_TIMEOUT, name="snuba_query_cache"
+    )
+
+
+def _load_cached_result(cached_value: str) -> Tuple[Any, bool]:
+    """
+    Returns a result of the query cache, and whether it is stale.
+    """
+    fresh_until, result = json.loads(cached_value)
+    return result, time.time() >= fresh_until
+
+
+def _cache_result(cache_key: str, result: Any) -> None:
+    # Results are kept beyond their TTL for the stale-while-revalidate window.
+    ttl = settings.SENTRY_SNUBA_CACHE_TTL_SECONDS
+    cache.set(
+        cache_key,
+        json.dumps([time.time() + ttl, result]),
+        ttl + settings.SENTRY_SNUBA_CACHE_STALE_SECONDS,
+    )
+
+
+def _query_and_cache_results(
+    to_query: Sequence[Tuple[int, SnubaQueryBody, Optional[str]]],
+    headers: Mapping[str, str],
+) -> List[Tuple[int, Any]]:
+    results = []
+    query_results = _bulk_snuba_query(map(itemgetter(1), to_query), headers)
+    for result, (query_pos, _, cache_key) in zip(query_results, to_query):
+        if cache_key:
+            _cache_result(cache_key, result)
+        results.append((query_pos, result))
+    return results
+
+
 def _apply_cache_and_build_results(
     snuba_param_list: Sequence[SnubaQueryBody],
     referrer: Optional[str] = None,
@@ -745,27 +786,84 @@ def _apply_cache_and_build_results(
     results = []
 
     if use_cache:
+        metric_tags = {"referrer": referrer} if referrer else None
+        coalesce = settings.SENTRY_SNUBA_CACHE_COALESCE_TIMEOUT_SECONDS > 0
+        serve_stale = settings.SENTRY_SNUBA_CACHE_STALE_SECONDS > 0
+
         cache_keys = [get_cache_key(query_params[0]) for _, query_params in query_param_list]
         cache_data = cache.get_many(cache_keys)
         to_query: List[Tuple[int, SnubaQueryBody, Optional[str]]] = []
-        for (query_pos, query_params), cache_key in zip(query_param_list, cache_keys):
-            cached_result = cache_data.get(cache_key)
-            metric_tags = {"referrer": referrer} if referrer else None
-            if cached_result is None:
+        to_wait = []
+
+        # Locks held by this caller are released once the results are cached.
+        with ExitStack() as stack:
+            for (query_pos, query_params), cache_key in zip(query_param_list, cache_keys):
+                cached_value = cache_data.get(cache_key)
+                if cached_value is not None:
+                    cached_result, stale = _load_cached_result(cached_value)
+                    if not stale:
+                        metrics.incr("snuba.query_cache.hit", tags=metric_tags)
+                        results.append((query_pos, cached_result))
+                        continue
+
+                    if serve_stale:
+                        # A single caller refreshes a stale result while the
+                        # others keep serving it.
+                        try:
+                            stack.enter_context(_get_query_cache_lock(cache_key).acquire())
+                        except UnableToAcquireLock:
+                            metrics.incr("snuba.query_cache.stale", tags=metric_tags)
+                            results.append((query_pos, cached_result))
+                            continue
+
+                        metrics.incr("snuba.query_cache.refresh", tags=metric_tags)
+                        to_query.append((query_pos, query_params, cache_key))
+                        continue
+
+                if coalesce:
+                    # Wait for the result of another caller running the same
+                    # query, instead of running it as well.
+                    lock = _get_query_cache_lock(cache_key)
+                    try:
+                        stack.enter_context(lock.acquire())
+                    except UnableToAcquireLock:
+                        to_wait.append((query_pos, query_params, cache_key, lock))
+                        continue
+
                 metrics.incr("snuba.query_cache.miss", tags=metric_tags)
                 to_query.append((query_pos, query_params, cache_key))
-            else:
-                metrics.incr("snuba.query_cache.hit", tags=metric_tags)
-                results.append((query_pos, json.loads(cached_result)))
+
+            if to_query:
+                results.extend(_query_and_cache_results(to_query, headers))
+
+        to_query = []
+        with ExitStack() as stack:
+            for query_pos, query_params, cache_key, lock in to_wait:
+                try:
+                    stack.enter_context(
+                        lock.blocking_acquire(
+                            initial_delay=0.05,
+                            timeout=settings.SENTRY_SNUBA_CACHE_COALESCE_TIMEOUT_SECONDS,
+                        )
+                    )
+                except UnableToAcquireLock:
+                    pass
+                else:
+                    cached_value = cache.get(cache_key)
+                    if cached_value is not None:
+                        metrics.incr("snuba.query_cache.coalesced", tags=metric_tags)
+                        results.append((query_pos, _load_cached_result(cached_value)[0]))
+                        continue
+
+                metrics.incr("snuba.query_cache.miss", tags=metric_tags)
+                to_query.append((query_pos, query_params, cache_key))
+
+            if to_query:
+                results.extend(_query_and_cache_results(to_query, headers))
     else:
         to_query = [(query_pos, query_params, None) for query_pos, query_params in query_param_list]
-
-    if to_query:
-        query_results = _bulk_snuba_query(map(itemgetter(1), to_query), headers)
-        for result, (query_pos, _, cache_key) in zip(query_results, to_query):
-            if cache_key:
-                cache.set(cache_key, json.dumps(result), settings.SENTRY_SNUBA_CACHE_TTL_SECONDS)
-            results.append((query_pos, result))
+        if to_query:
+            results.extend(_query_and_cache_results(to_query, headers))
 
     # Sort so that we get the results back in the original param list order
     results.sort()
@@ -38,7 +38,7 @@ def relay(relay_id, public_key):
 
 @pytest.fixture
 def call_endpoint(client, relay, private_key, default_projectkey):
-    def inner(full_config, public_keys=None):
+    def inner(full_config, public_keys=None, revisions=None):
         path = reverse("sentry-api-0-relay-projectconfigs") + "?version=3"
 
         if public_keys is None:
@@ -47,9 +47,10 @@ def call_endpoint(client, relay, private_key, default_projectkey):
         if full_config is None:
             raw_json, signature = private_key.pack({"publicKeys": public_keys, "no_cache": False})
         else:
-            raw_json, signature = private_key.pack(
-                {"publicKeys": public_keys, "fullConfig": full_config, "no_cache": False}
-            )
+            data = {"publicKeys": public_keys, "fullConfig": full_config, "no_cache": False}
+            if revisions is not None:
+                data["revisions"] = revisions
+            raw_json, signature = private_key.pack(data)
 
         resp = client.post(
             path,
@@ -108,6 +109,35 @@ def test_return_full_config_if_in_cache(
     }
 
 
+@pytest.mark.django_db
+def test_skip_unchanged_revisions(call_endpoint, default_projectkey, monkeypatch):
+    config = {"is_mock_config": True, "revision": "abc"}
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.get", lambda *args, **kwargs: config)
+
+    result, status_code = call_endpoint(
+        full_config=True, revisions={default_projectkey.public_key: "abc"}
+    )
+    assert status_code < 400
+    assert result == {"configs": {}, "pending": [], "unchanged": [default_projectkey.public_key]}
+
+    result, status_code = call_endpoint(
+        full_config=True, revisions={default_projectkey.public_key: "def"}
+    )
+    assert status_code < 400
+    assert result == {
+        "configs": {default_projectkey.public_key: config},
+        "pending": [],
+        "unchanged": [],
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("revisions", [["abc"], "abc", {"key": 1}])
+def test_invalid_revisions(call_endpoint, projectconfig_cache_get_mock_config, revisions):
+    _, status_code = call_endpoint(full_config=True, revisions=revisions)
+    assert status_code == 400
+
+
 @pytest.mark.django_db
 def test_return_partial_config_if_in_cache(
     monkeypatch,
@@ -1,9 +1,10 @@
 from datetime import timedelta
 from unittest import mock
 
+from django.db import connection
 from django.utils import timezone
 
-from sentry.buffer.base import Buffer
+from sentry.buffer.base import Buffer, _get_cast_type
 from sentry.models import Group, Organization, Project, Release, ReleaseProject, Team
 from sentry.testutils import TestCase
 
@@ -69,3 +70,42 @@ class BufferTest(TestCase):
         self.buf.process(Group, columns, filters, {"last_seen": the_date}, signal_only=True)
         group.refresh_from_db()
         assert group.times_seen == prev_times_seen
+
+    def test_process_batch(self):
+        group = Group.objects.create(project=Project(id=1))
+        group2 = Group.objects.create(project=Project(id=1))
+        group3 = Group.objects.create(project=Project(id=1))
+        the_date = timezone.now() + timedelta(days=5)
+        filters = {"project_id": self.project.id, "release_id": self.release.id}
+
+        self.buf.process_batch(
+            [
+                (Group, {"times_seen": 2}, {"id": group.id}, {"last_seen": the_date}, None),
+                (Group, {"times_seen": 3}, {"pk": group2.id}, {"last_seen": the_date}, None),
+                (ReleaseProject, {"new_groups": 1}, filters, None, None),
+            ]
+        )
+        # The single update is applied the same way as a batched one
+        self.buf.process(Group, {"times_seen": 2}, {"id": group3.id}, {"last_seen": the_date})
+
+        group_ = Group.objects.get(id=group.id)
+        assert group_.times_seen == group.times_seen + 2
+        assert group_.last_seen == the_date
+        assert group_.score == Group.objects.get(id=group3.id).score
+        assert Group.objects.get(id=group2.id).times_seen == group2.times_seen + 3
+        assert ReleaseProject.objects.filter(new_groups=1, **filters).exists()
+
+    def test_process_batch_casts(self):
+        assert _get_cast_type(Group._meta.pk, connection) in ("integer", "bigint")
+        assert _get_cast_type(Group._meta.get_field("times_seen"), connection) == "integer"
+
+        group = Group.objects.create(project=Project(id=1))
+        group2 = Group.objects.create(project=Project(id=1))
+        self.buf.process_batch(
+            [
+                (Group, {"times_seen": 1}, {"id": group.id}, None, None),
+                (Group, {"times_seen": 1}, {"id": group2.id}, None, None),
+            ]
+        )
+        assert Group.objects.get(id=group.id).times_seen == group.times_seen + 1
+        assert Group.objects.get(id=group2.id).times_seen == group2.times_seen + 1
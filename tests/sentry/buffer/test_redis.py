@@ -103,6 +103,23 @@ class RedisBufferTest(TestCase):
         group = Group.objects.get_from_cache(id=self.group.id)
         assert group.times_seen == orig_times_seen + times_seen_incr
 
+    @freeze_time()
+    @mock.patch("sentry.buffer.redis.process_incr")
+    def test_process_pending_bulk(self, process_incr):
+        group2 = self.create_group()
+        self.buf.bulk_batch_size = 1
+        for group in (self.group, group2):
+            self.buf.incr(Group, {"times_seen": 2}, {"pk": group.id}, {"last_seen": timezone.now()})
+
+        with self.options({"buffer.redis.bulk-flush": True}):
+            self.buf.process_pending()
+
+        assert not process_incr.apply_async.called
+        for group in (self.group, group2):
+            assert Group.objects.get(id=group.id).times_seen == group.times_seen + 2
+        client = self.buf.cluster.get_routing_client()
+        assert client.zrange("b:p", 0, -1) == []
+
     def test_get(self):
         model = mock.Mock()
         model.__name__ = "Mock"
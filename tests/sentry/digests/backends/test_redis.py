@@ -151,3 +151,34 @@ class RedisBackendTestCase(TestCase):
 
         with backend.digest("timeline", 0) as records:
             assert len(set(records)) == n
+
+    def test_digest_many(self):
+        backend = RedisBackend()
+
+        record_1 = Record("record:1", "value", time.time())
+        record_2 = Record("record:2", "value", time.time())
+        record_3 = Record("record:3", "value", time.time())
+        backend.add("timeline:1", record_1)
+        backend.add("timeline:2", record_2)
+        backend.add("timeline:3", record_3)
+
+        # Timelines that are not ready are left out.
+        with backend.digest_many(
+            {"timeline:1": 0, "timeline:2": 0, "timeline:3": None, "timeline:4": 0}
+        ) as digests:
+            assert digests == {
+                "timeline:1": [record_1],
+                "timeline:2": [record_2],
+                "timeline:3": [record_3],
+            }
+            # Removing a timeline keeps its digest open.
+            del digests["timeline:2"]
+
+        # Only the closed timelines with a minimum delay of 0 are due again.
+        assert {entry.key for entry in backend.schedule(time.time())} == {"timeline:1"}
+
+        with backend.digest("timeline:2", 0) as records:
+            assert records == [record_2]
+
+        with backend.digest_many({"timeline:1": 0}) as digests:
+            assert digests == {"timeline:1": []}
@@ -0,0 +1,38 @@
+from sentry.digests.codecs import CompressedPickleCodec, NotificationReferenceCodec
+from sentry.digests.notifications import Notification
+from sentry.eventstore.models import Event
+from sentry.testutils import TestCase
+from sentry.testutils.helpers.datetime import before_now, iso_format
+
+
+class NotificationReferenceCodecTestCase(TestCase):
+    def test_encode_decode(self):
+        codec = NotificationReferenceCodec()
+        event = self.store_event(
+            data={"timestamp": iso_format(before_now(minutes=1)), "message": "hello"},
+            project_id=self.project.id,
+        )
+        missing = Event(self.project.id, "a" * 32, group_id=event.group_id)
+
+        values = [
+            codec.encode(Notification(event, [1, 2])),
+            codec.encode(Notification(missing, [1])),
+            CompressedPickleCodec().encode(Notification(event, [3])),
+            None,
+        ]
+        assert len(values[0]) < len(values[2])
+
+        decoded, decoded_missing, decoded_pickle, decoded_none = codec.decode_many(values)
+        assert decoded.rules == [1, 2]
+        assert decoded.event.event_id == event.event_id
+        assert decoded.event.group_id == event.group_id
+        assert decoded.event.data["logentry"] == event.data["logentry"]
+
+        # Events that are no longer in nodestore can't be rebuilt
+        assert decoded_missing is None
+
+        # Records written with the previous codec are still readable
+        assert decoded_pickle.rules == [3]
+        assert decoded_pickle.event.event_id == event.event_id
+
+        assert decoded_none is None
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytz
+
+from sentry import tsdb
+from sentry.event_manager import _tsdb_record_all_metrics
+
+
+def make_job(group_id, environment_id, timestamp):
+    return {
+        "project_id": 1,
+        "event": Mock(datetime=timestamp),
+        "group": Mock(id=group_id),
+        "release": None,
+        "environment": Mock(id=environment_id),
+        "user": None,
+    }
+
+
+def test_batches_by_environment_and_rollup(monkeypatch):
+    incr_multi = Mock()
+    monkeypatch.setattr(tsdb, "incr_multi", incr_multi)
+    monkeypatch.setattr(tsdb, "record_multi", Mock())
+    monkeypatch.setattr(tsdb, "record_frequency_multi", Mock())
+
+    timestamp = datetime(2022, 1, 1, tzinfo=pytz.utc)
+    later = timestamp + timedelta(seconds=max(tsdb.get_rollups()))
+
+    _tsdb_record_all_metrics(
+        [
+            make_job(1, 1, timestamp),
+            make_job(2, 1, timestamp),
+            make_job(3, 2, timestamp),
+            make_job(4, 1, later),
+        ]
+    )
+
+    calls = [(call.args[0], call.kwargs) for call in incr_multi.call_args_list]
+    assert calls == [
+        (
+            [
+                (tsdb.models.project, 1),
+                (tsdb.models.group, 1),
+                (tsdb.models.project, 1),
+                (tsdb.models.group, 2),
+            ],
+            {"timestamp": timestamp, "environment_id": 1},
+        ),
+        (
+            [(tsdb.models.project, 1), (tsdb.models.group, 3)],
+            {"timestamp": timestamp, "environment_id": 2},
+        ),
+        (
+            [(tsdb.models.project, 1), (tsdb.models.group, 4)],
+            {"timestamp": later, "environment_id": 1},
+        ),
+    ]
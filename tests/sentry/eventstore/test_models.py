@@ -1,9 +1,11 @@
 import pickle
+from unittest import mock
 
 import pytest
+from django.http import HttpRequest
 
-from sentry import eventstore, nodestore
-from sentry.db.models.fields.node import NodeData, NodeIntegrityFailure
+from sentry import app, eventstore, nodestore
+from sentry.db.models.fields.node import NodeData, NodeIntegrityFailure, clear_pending_nodes
 from sentry.eventstore.models import Event
 from sentry.grouping.enhancer import Enhancements
 from sentry.models import Environment
@@ -384,6 +386,50 @@ class EventNodeStoreTest(TestCase):
         event.data.bind_ref(event)
         assert event.data.ref == event.project.id
 
+    def test_request_batching(self):
+        self.store_event(data={"event_id": "a" * 32}, project_id=self.project.id)
+        self.store_event(data={"event_id": "b" * 32}, project_id=self.project.id)
+
+        app.env.request = HttpRequest()
+        try:
+            with self.options({"nodestore.request-batching-enabled": True}):
+                event_a = Event(project_id=self.project.id, event_id="a" * 32)
+                event_b = Event(project_id=self.project.id, event_id="b" * 32)
+
+                with mock.patch.object(
+                    nodestore, "get_multi", wraps=nodestore.get_multi
+                ) as get_multi, mock.patch.object(nodestore, "get") as get:
+                    assert event_a.data["event_id"] == "a" * 32
+                    assert event_b.data["event_id"] == "b" * 32
+
+                assert get_multi.call_count == 1
+                assert sorted(get_multi.call_args[0][0]) == sorted(
+                    [event_a.data.id, event_b.data.id]
+                )
+                assert not get.called
+        finally:
+            app.env.request = None
+            clear_pending_nodes()
+
+    def test_lazy_decode(self):
+        with self.options({"nodestore.framed-encoding": True}):
+            self.store_event(
+                data={"event_id": "a" * 32, "message": "hello"}, project_id=self.project.id
+            )
+        nodestore.cache.clear()
+
+        with self.options({"nodestore.lazy-decode": True}):
+            event = Event(project_id=self.project.id, event_id="a" * 32)
+            assert event.data["logentry"]["formatted"] == "hello"
+            assert "logentry" in event.data
+            assert event.data._node_data is None
+            assert event.data.ref == self.project.id
+
+            # Any other access loads the full node
+            assert dict(event.data)["event_id"] == "a" * 32
+            assert event.data._node_data is not None
+            assert "_ref" not in event.data
+
     def test_basic_ref_binding(self):
         event = self.store_event(data={}, project_id=self.project.id)
         assert event.data.get_ref(event) == event.project.id
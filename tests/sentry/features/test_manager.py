@@ -3,10 +3,11 @@ from unittest import mock
 
 from django.conf import settings
 
-from sentry import features
+from sentry import app, features
 from sentry.features import Feature
 from sentry.models import User
 from sentry.testutils import TestCase
+from sentry.utils.request_cache import clear_cache
 
 
 class MockBatchHandler(features.BatchFeatureHandler):
@@ -239,3 +240,67 @@ class FeatureManagerTest(TestCase):
             NotImplementedError, "User flags not allowed with entity_feature=True"
         ):
             manager.add("users:feature-2", features.UserFeature, True)
+
+    def test_request_cache(self):
+        manager = features.FeatureManager()
+        manager.add("projects:feature", features.ProjectFeature)
+        handler = mock.Mock(features={"projects:feature"})
+        handler.return_value = True
+        manager.add_handler(handler)
+
+        # Outside of requests nothing is memoized
+        assert manager.has("projects:feature", self.project, actor=self.user)
+        assert manager.has("projects:feature", self.project, actor=self.user)
+        assert handler.call_count == 2
+
+        with mock.patch.object(app.env, "request", mock.Mock()):
+            try:
+                assert manager.has("projects:feature", self.project, actor=self.user)
+                assert manager.has("projects:feature", self.project, actor=self.user)
+                assert handler.call_count == 3
+
+                # The actor is part of the key
+                assert manager.has("projects:feature", self.project, actor=self.create_user())
+                assert handler.call_count == 4
+            finally:
+                clear_cache()
+
+    def test_prefetch_for_projects(self):
+        project_flag = "projects:feature"
+        other_flag = "projects:other-feature"
+        projects = [self.create_project(organization=self.organization) for i in range(3)]
+
+        class ProjectTestHandler(features.BatchFeatureHandler):
+            features = frozenset([project_flag])
+
+            def __init__(self):
+                self.hit_counter = 0
+
+            def _check_for_batch(self, feature_name, organization, actor):
+                self.hit_counter += 1
+                return True
+
+        manager = features.FeatureManager()
+        manager.add(project_flag, features.ProjectFeature)
+        manager.add(other_flag, features.ProjectFeature)
+        handler = ProjectTestHandler()
+        manager.add_handler(handler)
+
+        with mock.patch.object(app.env, "request", mock.Mock()):
+            try:
+                result = manager.prefetch_for_projects(
+                    [project_flag, other_flag], self.organization, projects, actor=self.user
+                )
+                assert result == {
+                    project_flag: {p: True for p in projects},
+                    other_flag: {p: False for p in projects},
+                }
+                assert handler.hit_counter == 1
+
+                # Later checks are served from the request cache
+                for project in projects:
+                    assert manager.has(project_flag, project, actor=self.user)
+                    assert not manager.has(other_flag, project, actor=self.user)
+                assert handler.hit_counter == 1
+            finally:
+                clear_cache()
@@ -412,3 +412,49 @@ def test_sentinel_and_prefix(action, type):
     actions[0][1].update_frame_components_contributions([component], frames, 0)
     expected = action == "+"
     assert getattr(component, f"is_{type}_frame") is expected
+
+
+def test_rule_index_candidates():
+    enhancement = Enhancements.from_config_string(
+        """
+function:std::*                 -app
+path:/app/node_modules/**       -app
+package:/usr/lib/**             -app
+family:native                   max-frames=3
+!function:foo                   +app
+""",
+    )
+    frames = [
+        {"function": "std::rt::lang_start", "platform": "native"},
+        {"function": "main", "abs_path": "app\\node_modules\\foo.js", "platform": "javascript"},
+        {"function": "foo", "package": "usr/lib/libc.so", "platform": "native"},
+    ]
+    match_frames = [create_match_frame(frame, "native") for frame in frames]
+
+    def get_candidates(index):
+        return [
+            (rule.matchers[0].description, list(frame_indices))
+            for rule, frame_indices in index.iter_candidates(match_frames)
+        ]
+
+    # Rules without a literal prefix or family (the negated function match)
+    # are candidates for every frame.
+    assert get_candidates(enhancement._modifier_index) == [
+        ("function:std::*", [0]),
+        ("path:/app/node_modules/**", [1]),
+        ("package:/usr/lib/**", [2]),
+        ("function:foo", [0, 1, 2]),
+    ]
+    assert get_candidates(enhancement._updater_index) == [
+        ("function:std::*", [0]),
+        ("path:/app/node_modules/**", [1]),
+        ("package:/usr/lib/**", [2]),
+        ("family:native", [0, 2]),
+        ("function:foo", [0, 1, 2]),
+    ]
+
+
+def test_loads_is_cached():
+    enhancement = Enhancements.from_config_string("function:foo -app", bases=["common:v1"])
+    dumped = enhancement.dumps()
+    assert Enhancements.loads(dumped) is Enhancements.loads(dumped)
@@ -0,0 +1,95 @@
+import uuid
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from sentry.event_manager import EventManager, _find_existing_grouphash
+from sentry.grouping import grouphash_cache
+from sentry.models import GroupHash, GroupStatus
+from sentry.testutils import TestCase
+
+
+def make_event(**kwargs):
+    result = {"event_id": uuid.uuid1().hex, "message": "foo", "fingerprint": ["a" * 32]}
+    result.update(kwargs)
+    return result
+
+
+class GrouphashCacheTest(TestCase):
+    def save_event(self, **kwargs):
+        manager = EventManager(make_event(**kwargs), project=self.project)
+        manager.normalize()
+        with self.options({"store.grouphash-cache-enabled": True}):
+            return manager.save(self.project.id)
+
+    def test_existing_group_is_cached(self):
+        event = self.save_event()
+        (hash,) = event.get_hashes().hashes
+
+        # Group creation does not populate the cache, the next event does.
+        assert grouphash_cache.get_group_ids(self.project.id, [hash]) == {}
+        self.save_event()
+        assert grouphash_cache.get_group_ids(self.project.id, [hash]) == {hash: event.group_id}
+
+        with mock.patch(
+            "sentry.event_manager._find_existing_grouphash"
+        ) as find_existing_grouphash, CaptureQueriesContext(connection) as queries:
+            event2 = self.save_event()
+
+        assert not find_existing_grouphash.called
+        assert event2.group_id == event.group_id
+        assert not [q for q in queries.captured_queries if "sentry_grouphash" in q["sql"]]
+
+    def test_partial_hit_is_a_miss(self):
+        generation = grouphash_cache.get_generation(self.project.id)
+        assert grouphash_cache.set_group_id(self.project.id, ["a" * 32], 1, generation)
+        assert grouphash_cache.get_group_id(self.project.id, ["a" * 32, "b" * 32]) is None
+        assert grouphash_cache.get_group_id(self.project.id, ["a" * 32]) == 1
+
+    def test_set_group_id_after_invalidation(self):
+        generation = grouphash_cache.get_generation(self.project.id)
+
+        # A concurrent merge moved the hash after the writer looked at the
+        # generation, its write must not bring the old mapping back.
+        grouphash_cache.invalidate_hashes(self.project.id, ["a" * 32])
+        assert not grouphash_cache.set_group_id(self.project.id, ["a" * 32], 1, generation)
+        assert grouphash_cache.get_group_ids(self.project.id, ["a" * 32]) == {}
+
+        _, generation = grouphash_cache.lookup(self.project.id, ["a" * 32])
+        assert grouphash_cache.set_group_id(self.project.id, ["a" * 32], 1, generation)
+        assert grouphash_cache.get_group_ids(self.project.id, ["a" * 32]) == {"a" * 32: 1}
+
+    def test_pending_merge_falls_back(self):
+        self.save_event()
+        event = self.save_event()
+        event.group.update(status=GroupStatus.PENDING_MERGE)
+
+        with mock.patch(
+            "sentry.event_manager._find_existing_grouphash", wraps=_find_existing_grouphash
+        ) as find_existing_grouphash:
+            self.save_event()
+
+        assert find_existing_grouphash.called
+
+    def test_invalidate_groups(self):
+        self.save_event()
+        event = self.save_event()
+        (hash,) = event.get_hashes().hashes
+        assert grouphash_cache.get_group_ids(self.project.id, [hash])
+
+        grouphash_cache.invalidate_groups([event.group_id])
+        assert grouphash_cache.get_group_ids(self.project.id, [hash]) == {}
+
+    def test_deleted_group_falls_back(self):
+        self.save_event()
+        event = self.save_event()
+        (hash,) = event.get_hashes().hashes
+
+        # Simulate a stale cache entry in another process.
+        GroupHash.objects.filter(group_id=event.group_id).delete()
+        event.group.delete()
+
+        event2 = self.save_event()
+        assert event2.group_id != event.group_id
+        assert GroupHash.objects.get(project=self.project, hash=hash).group_id == event2.group_id
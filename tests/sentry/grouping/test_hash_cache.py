@@ -0,0 +1,83 @@
+import uuid
+from unittest import mock
+
+from sentry.event_manager import EventManager
+from sentry.eventstore.models import Event
+from sentry.grouping import hash_cache
+from sentry.grouping.api import get_default_grouping_config_dict, load_grouping_config
+from sentry.grouping.result import CalculatedHashes
+from sentry.testutils import TestCase
+
+
+def make_event(function="foo", **kwargs):
+    result = {
+        "event_id": uuid.uuid1().hex,
+        "platform": "python",
+        "exception": {
+            "values": [
+                {
+                    "type": "ValueError",
+                    "value": "bad value",
+                    "stacktrace": {
+                        "frames": [
+                            {"function": "main", "module": "app", "in_app": True},
+                            {
+                                "function": function,
+                                "module": "app",
+                                "in_app": True,
+                                "vars": {"x": uuid.uuid4().hex},
+                            },
+                        ]
+                    },
+                }
+            ]
+        },
+    }
+    result.update(kwargs)
+    return result
+
+
+def get_fingerprint(data):
+    config = data.get("grouping_config") or get_default_grouping_config_dict()
+    return hash_cache.get_fingerprint(data, config, load_grouping_config(config))
+
+
+class GroupingHashCacheTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        hash_cache._local_cache.clear()
+
+    def save_event(self, options=None, **kwargs):
+        manager = EventManager(make_event(**kwargs), project=self.project)
+        manager.normalize()
+        with self.options({"store.grouping-hash-cache-enabled": True, **(options or {})}):
+            return manager.save(self.project.id)
+
+    def test_repeated_event_is_cached(self):
+        event = self.save_event()
+
+        with mock.patch.object(Event, "get_hashes") as get_hashes:
+            event2 = self.save_event()
+
+        assert not get_hashes.called
+        assert event2.data["hashes"] == event.data["hashes"]
+        assert event2.group_id == event.group_id
+
+    def test_fingerprint(self):
+        assert get_fingerprint(make_event()) == get_fingerprint(make_event())
+        assert get_fingerprint(make_event()) != get_fingerprint(make_event(function="bar"))
+        assert get_fingerprint(make_event(platform="native")) != get_fingerprint(make_event())
+
+        assert get_fingerprint(make_event(fingerprint=["{{ default }}", "foo"])) is None
+        assert get_fingerprint(make_event(checksum="a" * 32)) is None
+
+    def test_verify_mismatch(self):
+        event = self.save_event()
+        fingerprint = get_fingerprint(event.data)
+
+        bogus = CalculatedHashes(hashes=["b" * 32], hierarchical_hashes=[], tree_labels=[])
+        hash_cache.set_hashes(fingerprint, bogus)
+
+        event2 = self.save_event(options={"store.grouping-hash-cache-verify-sample-rate": 1.0})
+        assert event2.data["hashes"] == event.data["hashes"]
+        assert hash_cache.get_hashes(fingerprint) is None
@@ -1,18 +1,21 @@
 import datetime
 import time
 import uuid
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 
+from sentry import eventstore, tsdb
 from sentry.event_manager import EventManager
+from sentry.eventstore.processing import event_processing_store
 from sentry.ingest.ingest_consumer import (
     process_attachment_chunk,
     process_event,
+    process_event_batch,
     process_individual_attachment,
     process_userreport,
 )
-from sentry.models import EventAttachment, EventUser, File, UserReport
+from sentry.models import EventAttachment, EventUser, File, Group, UserReport
 from sentry.utils import json
 
 
@@ -70,6 +73,164 @@ def test_deduplication_works(default_project, task_runner, preprocess_event):
     }
 
 
+@pytest.mark.django_db
+def test_event_batch_saves_events(default_project, task_runner, preprocess_event):
+    project_id = default_project.id
+    start_time = time.time() - 3600
+    payloads = [
+        get_normalized_event({"message": "hello world", "release": "foo@1.0"}, default_project)
+        for _ in range(3)
+    ]
+
+    process_event_batch(
+        [
+            {
+                "payload": json.dumps(payload),
+                "start_time": start_time,
+                "event_id": payload["event_id"],
+                "project_id": project_id,
+                "remote_addr": "127.0.0.1",
+            }
+            for payload in payloads
+        ],
+        projects={default_project.id: default_project},
+    )
+
+    assert not preprocess_event
+
+    events = [eventstore.get_event_by_id(project_id, payload["event_id"]) for payload in payloads]
+    assert len({event.group_id for event in events}) == 1
+    assert all(event.release == "foo@1.0" for event in events)
+
+    for payload in payloads:
+        cached = event_processing_store.get(f"e:{payload['event_id']}:{project_id}")
+        assert cached["culprit"]
+
+
+@pytest.mark.django_db
+def test_event_batch_falls_back_to_tasks(default_project, task_runner, preprocess_event):
+    project_id = default_project.id
+    start_time = time.time() - 3600
+    payloads = [get_normalized_event({"message": "hello world"}, default_project) for _ in range(2)]
+
+    with patch("sentry.event_manager.save_error_events", side_effect=ValueError):
+        process_event_batch(
+            [
+                {
+                    "payload": json.dumps(payload),
+                    "start_time": start_time,
+                    "event_id": payload["event_id"],
+                    "project_id": project_id,
+                    "remote_addr": "127.0.0.1",
+                }
+                for payload in payloads
+            ],
+            projects={default_project.id: default_project},
+        )
+
+    assert [kwargs["event_id"] for kwargs in preprocess_event] == [
+        payload["event_id"] for payload in payloads
+    ]
+
+
+@pytest.mark.django_db
+def test_event_batch_finishes_aggregated_events(default_project, task_runner, preprocess_event):
+    from sentry import event_manager
+
+    project_id = default_project.id
+    start_time = time.time() - 3600
+    payloads = [get_normalized_event({"message": "hello world"}, default_project) for _ in range(2)]
+
+    nodestore_save_many = event_manager._nodestore_save_many
+    calls = []
+
+    def fail_once(jobs):
+        calls.append(len(jobs))
+        if len(calls) == 1:
+            raise ValueError
+        nodestore_save_many(jobs)
+
+    with patch("sentry.event_manager._nodestore_save_many", side_effect=fail_once):
+        process_event_batch(
+            [
+                {
+                    "payload": json.dumps(payload),
+                    "start_time": start_time,
+                    "event_id": payload["event_id"],
+                    "project_id": project_id,
+                    "remote_addr": "127.0.0.1",
+                }
+                for payload in payloads
+            ],
+            projects={default_project.id: default_project},
+        )
+
+    # The failed batch is finished event by event instead of saving it again
+    assert calls == [2, 1, 1]
+    assert not preprocess_event
+
+    events = [eventstore.get_event_by_id(project_id, payload["event_id"]) for payload in payloads]
+    (group_id,) = {event.group_id for event in events}
+    assert Group.objects.get(id=group_id).times_seen == 2
+
+    start = min(event.datetime for event in events)
+    end = max(event.datetime for event in events)
+    assert tsdb.get_sums(tsdb.models.group, [group_id], start, end)[group_id] == 2
+
+
+@pytest.mark.django_db
+def test_event_batch_dispatches_events_needing_processing(
+    default_project, task_runner, preprocess_event
+):
+    project_id = default_project.id
+    start_time = time.time() - 3600
+    payload = get_normalized_event(
+        {
+            "message": "hello world",
+            "debug_meta": {
+                "images": [
+                    {
+                        "type": "macho",
+                        "debug_id": "c05ae580-9ae0-3d09-ba8e-6a5e5e6ba2f6",
+                        "image_addr": "0x1000",
+                        "image_size": 4096,
+                    }
+                ]
+            },
+            "exception": {
+                "values": [
+                    {
+                        "type": "Error",
+                        "stacktrace": {
+                            "frames": [{"instruction_addr": "0x1100", "platform": "native"}]
+                        },
+                    }
+                ]
+            },
+            "platform": "native",
+        },
+        default_project,
+    )
+    event_id = payload["event_id"]
+
+    process_event_batch(
+        [
+            {
+                "payload": json.dumps(payload),
+                "start_time": start_time,
+                "event_id": event_id,
+                "project_id": project_id,
+                "remote_addr": "127.0.0.1",
+            }
+        ],
+        projects={default_project.id: default_project},
+    )
+
+    (kwargs,) = preprocess_event
+    assert kwargs["cache_key"] == f"e:{event_id}:{project_id}"
+    assert eventstore.get_event_by_id(project_id, event_id) is None
+
+
 @pytest.mark.django_db
 def test_transactions_spawn_save_event_transaction(
     default_project,
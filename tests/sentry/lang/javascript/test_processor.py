@@ -1,5 +1,6 @@
 import errno
 import re
+import threading
 import unittest
 import zipfile
 from copy import deepcopy
@@ -9,7 +10,7 @@ from unittest.mock import ANY, MagicMock, call, patch
 import pytest
 import responses
 from requests.exceptions import RequestException
-from symbolic import SourceMapTokenMatch
+from symbolic import SourceMapTokenMatch, SourceMapView
 
 from sentry import http, options
 from sentry.lang.javascript.errormapping import REACT_MAPPING_URL, rewrite_exception
@@ -18,6 +19,10 @@ from sentry.lang.javascript.processor import (
     CACHE_CONTROL_MIN,
     JavaScriptStacktraceProcessor,
     UnparseableSourcemap,
+    _artifact_index_cache,
+    _fetch_release_archive,
+    _release_archive_pool,
+    _sourcemap_view_cache,
     cache,
     discover_sourcemap,
     fetch_file,
@@ -579,6 +584,38 @@ class FetchFileTest(TestCase):
         result2 = fetch_file("/example.js", release=release)
         assert result2 == result
 
+    @override_options({"sourcemaps.release-archive-pool-enabled": True})
+    def test_release_archive_pool(self):
+        _release_archive_pool.clear()
+        _artifact_index_cache.clear()
+
+        compressed = BytesIO()
+        with zipfile.ZipFile(compressed, mode="w") as zip_file:
+            manifest = {"files": {}}
+            for name in ("a.js", "b.js"):
+                zip_file.writestr(name, name.encode())
+                manifest["files"][name] = {"url": f"/{name}", "headers": {}}
+            zip_file.writestr("manifest.json", json.dumps(manifest))
+
+        release = Release.objects.create(version="1", organization_id=self.project.organization_id)
+        release.add_project(self.project)
+
+        compressed.seek(0)
+        file_ = File.objects.create(name="foo", type="release.bundle")
+        file_.putfile(compressed)
+        update_artifact_index(release, None, file_)
+
+        with patch(
+            "sentry.lang.javascript.processor._fetch_release_archive",
+            wraps=_fetch_release_archive,
+        ) as fetch_archive:
+            assert fetch_file("/a.js", release=release).body == b"a.js"
+            assert fetch_file("/b.js", release=release).body == b"b.js"
+
+        # The archive was only fetched and opened for the first file
+        assert fetch_archive.call_count == 1
+        assert len(_release_archive_pool) == 1
+
     def _create_archive(self, release, url):
         pseudo_archive = File.objects.create(name="", type="release.bundle")
         pseudo_archive.putfile(BytesIO(b"0123456789"))
@@ -1019,6 +1056,18 @@ class FetchSourcemapTest(TestCase):
         with pytest.raises(UnparseableSourcemap):
             fetch_sourcemap("data:application/json;base64,xxx")
 
+    @override_options({"sourcemaps.view-cache-enabled": True})
+    def test_view_cache(self):
+        _sourcemap_view_cache.clear()
+        with patch(
+            "sentry.lang.javascript.processor.SourceMapView.from_json_bytes",
+            wraps=SourceMapView.from_json_bytes,
+        ) as from_json_bytes:
+            smap_view = fetch_sourcemap(base64_sourcemap)
+            assert fetch_sourcemap(base64_sourcemap.rstrip("=")) is smap_view
+
+        assert from_json_bytes.call_count == 1
+
     @responses.activate
     def test_garbage_json(self):
         responses.add(
@@ -1377,3 +1426,28 @@ class CacheSourceTest(TestCase):
         # now we have an error
         assert len(processor.cache.get_errors(abs_path)) == 1
         assert processor.cache.get_errors(abs_path)[0] == {"url": map_url, "type": "js_no_source"}
+
+    @override_options({"sourcemaps.concurrent-fetch-enabled": True})
+    def test_prefetch_sources(self):
+        project = self.create_project()
+        processor = JavaScriptStacktraceProcessor(data={}, stacktrace_infos=None, project=project)
+
+        # Both fetches have to be in flight at the same time to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fetch_file(url, **kwargs):
+            barrier.wait()
+            if url.endswith("missing.js"):
+                raise http.CannotFetch({"type": EventError.JS_MISSING_SOURCE, "url": url})
+            return http.UrlResult(url, {}, b"console.log(1)", 200, None)
+
+        frames = [{"abs_path": "app:///found.js"}, {"abs_path": "app:///missing.js"}]
+        with patch("sentry.lang.javascript.processor.fetch_file", side_effect=fetch_file):
+            processor.populate_source_cache(frames)
+
+        assert processor.cache.get("app:///found.js")
+        assert processor.cache.get_errors("app:///found.js") == []
+        assert processor.cache.get_errors("app:///missing.js") == [
+            {"type": EventError.JS_MISSING_SOURCE, "url": "app:///missing.js"}
+        ]
+        assert processor.fetch_count == 2
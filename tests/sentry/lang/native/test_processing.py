@@ -8,12 +8,16 @@ from unittest import mock
 
 import pytest
 
+from sentry.cache import default_cache
 from sentry.lang.native.processing import (
     _merge_image,
     get_frames_for_symbolication,
     process_payload,
 )
 from sentry.models.eventerror import EventError
+from sentry.tasks.symbolication import RetrySymbolication
+from sentry.testutils.helpers.options import override_options
+from sentry.utils.locking import UnableToAcquireLock
 from sentry.utils.safe import get_path
 
 
@@ -158,6 +162,87 @@ def test_cocoa_function_name(mock_symbolicator, default_project):
     assert function_name == "thunk for closure"
 
 
+def make_native_data(project_id, event_id, instruction_addr):
+    return {
+        "platform": "native",
+        "project": project_id,
+        "event_id": event_id,
+        "exception": {
+            "values": [{"stacktrace": {"frames": [{"instruction_addr": instruction_addr}]}}]
+        },
+    }
+
+
+@pytest.mark.django_db
+@mock.patch("sentry.lang.native.processing.Symbolicator")
+def test_payload_coalescing(mock_symbolicator, default_project):
+    mock_symbolicator.return_value = mock_symbolicator
+    mock_symbolicator.process_payload.return_value = {
+        "status": "completed",
+        "stacktraces": [{"frames": [{"original_index": 0, "function": "main"}]}],
+        "modules": [],
+    }
+
+    with override_options({"symbolicator.payload-coalescing-enabled": True}):
+        first = process_payload(make_native_data(default_project.id, "1", "0x1000"))
+        second = process_payload(make_native_data(default_project.id, "2", "0x1000"))
+        assert mock_symbolicator.process_payload.call_count == 1
+
+        process_payload(make_native_data(default_project.id, "3", "0x2000"))
+        assert mock_symbolicator.process_payload.call_count == 2
+
+    for data in (first, second):
+        function_name = get_path(
+            data, "exception", "values", 0, "stacktrace", "frames", 0, "function"
+        )
+        assert function_name == "main"
+
+
+@pytest.mark.django_db
+@mock.patch("sentry.lang.native.processing.Symbolicator")
+def test_payload_coalescing_pending(mock_symbolicator, default_project):
+    def pending(task_id_cache_key, **kwargs):
+        default_cache.set(task_id_cache_key, "abc", 60)
+        raise RetrySymbolication(retry_after=1)
+
+    mock_symbolicator.return_value = mock_symbolicator
+    mock_symbolicator.process_payload.side_effect = pending
+
+    with override_options({"symbolicator.payload-coalescing-enabled": True}):
+        with pytest.raises(RetrySymbolication):
+            process_payload(make_native_data(default_project.id, "1", "0x1000"))
+
+        # The second event polls the request of the first one
+        mock_symbolicator.process_payload.side_effect = None
+        mock_symbolicator.process_payload.return_value = {
+            "status": "completed",
+            "stacktraces": [{"frames": [{"original_index": 0, "function": "main"}]}],
+            "modules": [],
+        }
+        process_payload(make_native_data(default_project.id, "2", "0x1000"))
+
+        # The completed response is cached for everyone else
+        process_payload(make_native_data(default_project.id, "1", "0x1000"))
+
+    first_call, second_call = mock_symbolicator.process_payload.call_args_list
+    assert first_call.kwargs["task_id_cache_key"] == second_call.kwargs["task_id_cache_key"]
+
+
+@pytest.mark.django_db
+@mock.patch("sentry.lang.native.processing.locks")
+@mock.patch("sentry.lang.native.processing.Symbolicator")
+def test_payload_coalescing_locked(mock_symbolicator, mock_locks, default_project):
+    mock_symbolicator.return_value = mock_symbolicator
+    mock_locks.get.return_value.acquire.side_effect = UnableToAcquireLock
+
+    # Another worker is creating the request, retry instead of duplicating it
+    with override_options({"symbolicator.payload-coalescing-enabled": True}):
+        with pytest.raises(RetrySymbolication):
+            process_payload(make_native_data(default_project.id, "1", "0x1000"))
+
+    assert not mock_symbolicator.process_payload.called
+
+
 def test_filter_frames():
 
     frames = [
@@ -243,6 +243,32 @@ class ProjectOwnershipTestCase(TestCase):
             self.project.id, {"stacktrace": {"frames": [frame]}}
         ) == ([ActorTuple(self.team.id, Team)], [rule])
 
+    def test_get_owners_compiled_matcher(self):
+        rule_a = Rule(Matcher("path", "*.py"), [Owner("team", self.team.slug)])
+        rule_b = Rule(Matcher("codeowners", "/src/"), [Owner("user", self.user.email)])
+
+        ownership = ProjectOwnership.objects.create(
+            project_id=self.project.id, schema=dump_schema([rule_a, rule_b]), fallthrough=True
+        )
+        data = {"stacktrace": {"frames": [{"filename": "src/foo.py"}]}}
+
+        with self.options({"ownership.compiled-matcher-enabled": True}):
+            self.assert_ownership_equals(
+                ProjectOwnership.get_owners(self.project.id, data),
+                (
+                    [ActorTuple(self.team.id, Team), ActorTuple(self.user.id, User)],
+                    [rule_a, rule_b],
+                ),
+            )
+
+            # Schema changes are picked up even if last_updated is unchanged
+            ownership.schema = dump_schema([rule_b])
+            ownership.save()
+            self.assert_ownership_equals(
+                ProjectOwnership.get_owners(self.project.id, data),
+                ([ActorTuple(self.user.id, User)], [rule_b]),
+            )
+
 
 class ResolveActorsTestCase(TestCase):
     def test_no_actors(self):
@@ -5,10 +5,11 @@ from unittest import mock
 import pytest
 from django.utils import timezone
 
-from sentry.nodestore.base import json_dumps
+from sentry.nodestore.base import FRAMED_MAGIC, json_dumps
 from sentry.nodestore.django.backend import DjangoNodeStorage
 from sentry.nodestore.django.models import Node
-from sentry.utils.strings import compress
+from sentry.testutils.helpers import override_options
+from sentry.utils.strings import compress, decompress
 
 
 @pytest.mark.django_db
@@ -132,3 +133,18 @@ class TestDjangoNodeStorage:
             self.ns.get("node_4")
             self.ns.get("node_4")
             assert mock_get.call_count == 2
+
+    def test_framed(self):
+        data = {"foo": "a", "breadcrumbs": {"values": [{"message": "hello"}]}}
+        node_id = "d2502ebbd7df41ceba8d3275595cac33"
+
+        with override_options({"nodestore.framed-encoding": True}):
+            self.ns.set_subkeys(node_id, {None: data, "other": "b"})
+        assert decompress(Node.objects.get(id=node_id).data).startswith(FRAMED_MAGIC)
+
+        if self.ns.cache:
+            self.ns.cache.clear()
+        assert self.ns.get(node_id) == data
+        assert self.ns.get(node_id, subkey="other") == "b"
+        assert self.ns.get_multi([node_id]) == {node_id: data}
+        assert self.ns.get(node_id, lazy=True).to_dict() == data
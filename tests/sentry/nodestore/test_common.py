@@ -3,10 +3,13 @@ Testsuite of backend-independent nodestore tests. Add your backend to the
 `ns` fixture to have it tested.
 """
 from contextlib import nullcontext
+from unittest import mock
 
 import pytest
 
+from sentry.nodestore.base import LazyNodePayload, _local_cache
 from sentry.nodestore.django.backend import DjangoNodeStorage
+from sentry.testutils.helpers import override_options
 from tests.sentry.nodestore.bigtable.test_backend import (
     MockedBigtableNodeStorage,
     get_temporary_bigtable_nodestorage,
@@ -91,3 +94,63 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+def test_local_cache(ns):
+    _local_cache.clear()
+    ns.set_subkeys("node_1", {None: {"foo": "a"}, "other": {"foo": "b"}})
+    ns.set("node_2", {"foo": "c"})
+
+    with override_options({"nodestore.local-cache-enabled": True}):
+        assert ns.get("node_1") == {"foo": "a"}
+        assert ns.get_multi(["node_2"]) == {"node_2": {"foo": "c"}}
+
+        with mock.patch.object(ns, "_get_bytes") as get_bytes, mock.patch.object(
+            ns, "_get_bytes_multi"
+        ) as get_bytes_multi:
+            assert ns.get("node_1", subkey="other") == {"foo": "b"}
+            assert ns.get_multi(["node_1", "node_2"]) == {
+                "node_1": {"foo": "a"},
+                "node_2": {"foo": "c"},
+            }
+
+        assert not get_bytes.called
+        assert not get_bytes_multi.called
+
+        # Hits decode into fresh objects
+        ns.get("node_1")["foo"] = "x"
+        assert ns.get("node_1") == {"foo": "a"}
+
+        ns.set("node_1", {"foo": "d"})
+        assert ns.get("node_1") == {"foo": "d"}
+
+        ns.delete("node_1")
+        assert ns.get("node_1") is None
+
+
+def test_framed_encoding(ns):
+    data = {"foo": "a", "breadcrumbs": {"values": [{"message": "hello\nworld"}]}}
+
+    with override_options({"nodestore.framed-encoding": True}):
+        ns.set_subkeys("node_1", {None: data, "other": "b"})
+    with override_options({"nodestore.framed-encoding": False}):
+        ns.set_subkeys("node_2", {None: data, "other": "b"})
+
+    for node_id in ("node_1", "node_2"):
+        assert ns.get(node_id) == data
+        assert ns.get(node_id, subkey="other") == "b"
+        assert ns.get(node_id, subkey="missing") is None
+        assert ns.get_multi([node_id]) == {node_id: data}
+
+    # Lazy payloads are only returned for nodes read from the backend
+    if ns.cache:
+        ns.cache.clear()
+
+    payload = ns.get("node_1", lazy=True)
+    assert isinstance(payload, LazyNodePayload)
+    assert "breadcrumbs" in payload
+    assert payload["foo"] == "a"
+    assert payload.to_dict() == data
+
+    # Legacy nodes are always decoded in full
+    assert ns.get("node_2", lazy=True) == data
@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from uuid import uuid1
 
 import pytest
@@ -7,7 +7,7 @@ from django.core.cache.backends.locmem import LocMemCache
 from exam import before, fixture
 
 from sentry.models import Option
-from sentry.options.store import OptionsStore
+from sentry.options.store import VERSION_CACHE_KEY, OptionsStore
 from sentry.testutils import TestCase
 
 
@@ -149,3 +149,44 @@ class OptionsStoreTest(TestCase):
         mocked_time.return_value = 26
         store.clean_local_cache()
         assert not store._local_cache
+
+    def test_snapshot(self):
+        store, key = self.store, self.key
+        store.enable_snapshots(60)
+        store.set(key, "bar")
+
+        with patch.object(Option.objects, "get_queryset", wraps=Option.objects.get_queryset) as qs:
+            assert store.get(key) == "bar"
+            assert store.get(key) == "bar"
+            assert store.get(self.make_key()) is None
+            # All options are loaded with a single query
+            assert qs.call_count == 1
+
+        # Changes of other processes are picked up once the version changes
+        Option.objects.filter(key=key.name).update(value="lol")
+        assert store.get(key) == "bar"
+        store.bump_version()
+        assert store.get(key) == "lol"
+
+        store.delete(key)
+        assert store.get(key) is None
+
+    def test_snapshot_subscriber(self):
+        store, key = self.store, self.key
+        subscriber = Mock()
+        store.enable_snapshots(60, subscriber=subscriber)
+        assert not subscriber.start.called
+
+        # Subscribers are started lazily, after workers have been forked
+        store.get(key)
+        assert subscriber.start.called
+
+    def test_snapshot_publish(self):
+        store, key = self.store, self.key
+        publisher = Mock()
+        store.enable_snapshots(60, publisher=publisher, channel="options")
+
+        store.set(key, "bar")
+        version = store.cache.get(VERSION_CACHE_KEY)
+        assert version is not None
+        publisher.publish.assert_called_once_with("options", version)
@@ -0,0 +1,53 @@
+from sentry.ownership.grammar import dump_schema, parse_rules
+from sentry.ownership.matcher import CompiledSchema, get_compiled_schema
+
+fixture_data = """
+*.js                      #frontend
+path:src/sentry/*         david@sentry.io
+path:SRC/Utils/*          david@sentry.io
+module:foo.bar            #workflow
+module:foo.*              #workflow
+url:http://google.com/*   #backend
+tags.foo:bar              tagperson@sentry.io
+codeowners:/src/components/  githubuser@sentry.io
+codeowners:frontend/*.ts     githubmod@sentry.io
+codeowners:*.py              githubpy@sentry.io
+codeowners:docs/             githubdocs@sentry.io
+"""
+
+
+def make_event(*frames, **kwargs):
+    return {"stacktrace": {"frames": list(frames)}, **kwargs}
+
+
+def assert_matches(schema, data):
+    rules = parse_rules(fixture_data)
+    assert CompiledSchema(schema).matching_rules(data) == [
+        rule for rule in rules if rule.test(data)
+    ]
+
+
+def test_matching_rules():
+    schema = dump_schema(parse_rules(fixture_data))
+
+    for data in [
+        make_event({"filename": "src/sentry/app.js"}),
+        make_event({"filename": "src\\utils\\foo.py", "module": "foo.baz"}),
+        make_event({"abs_path": "/src/components/button.ts"}, {"filename": "frontend/x.ts"}),
+        make_event({"filename": "/frontend/x.ts"}, {"filename": "a/docs/index.md"}),
+        make_event({"module": "foo.bar"}, request={"url": "http://google.com/search"}),
+        make_event(tags=[["foo", "bar"]]),
+        make_event({"filename": None}, {"filename": "ünïcode/src/sentry/x"}),
+    ]:
+        assert_matches(schema, data)
+
+
+def test_get_compiled_schema():
+    schema = dump_schema(parse_rules(fixture_data))
+    compiled = get_compiled_schema(("test", 1), schema)
+    assert get_compiled_schema(("test", 1), schema) is compiled
+
+    schema["rules"] = schema["rules"][1:]
+    changed = get_compiled_schema(("test", 1), schema)
+    assert changed is not compiled
+    assert len(changed.rules) == len(compiled.rules) - 1
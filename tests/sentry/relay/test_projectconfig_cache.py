@@ -1,6 +1,9 @@
 from unittest import mock
 
 from sentry.relay.projectconfig_cache import redis
+from sentry.relay.projectconfig_cache.base import get_config_digest, get_config_revision
+from sentry.testutils.helpers.options import override_options
+from sentry.utils import json
 
 
 def test_delete_count(monkeypatch):
@@ -14,3 +17,43 @@ def test_delete_count(monkeypatch):
     assert incr_mock.call_args == mock.call(
         "relay.projectconfig_cache.write", amount=1, tags={"action": "delete"}
     )
+
+
+def test_shared_sections():
+    cache = redis.RedisProjectConfigCache()
+    section = {"piiConfig": None, "features": ["organizations:profiling"]}
+    configs = {
+        "a": {"disabled": False, "publicKeys": [{"publicKey": "a"}], "config": section},
+        "b": {"disabled": False, "publicKeys": [{"publicKey": "b"}], "config": dict(section)},
+        "c": {"disabled": True},
+    }
+
+    with override_options({"relay.project-config-cache.shared-sections": True}):
+        cache.set_many(configs)
+
+    # The section is stored once, referenced by both configs
+    digest = get_config_digest(section)
+    for public_key in ("a", "b"):
+        stored = json.loads(cache.cluster.get(f"relayconfig:{public_key}"))
+        assert "config" not in stored
+        assert stored[redis.SECTION_REF] == digest
+
+    result = cache.get_many(["a", "b", "c", "d"])
+    assert result["a"] == dict(configs["a"], revision=get_config_revision(configs["a"]))
+    assert result["b"]["config"] == section
+    assert result["c"] == {"disabled": True}
+    assert result["d"] is None
+    assert cache.get("a") == result["a"]
+
+    # Configs whose section is gone are treated as missing
+    cache.cluster.delete(f"relayconfig-section:{digest}")
+    assert cache.get("a") is None
+
+
+def test_revision():
+    config = {"disabled": False, "lastFetch": "2022-01-01", "config": {"a": 1, "b": 2}}
+    revision = get_config_revision(config)
+
+    assert revision == get_config_revision(dict(config, lastFetch="2022-01-02"))
+    assert revision == get_config_revision(dict(config, config={"b": 2, "a": 1}))
+    assert revision != get_config_revision(dict(config, config={"a": 1}))
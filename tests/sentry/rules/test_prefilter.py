@@ -0,0 +1,107 @@
+from sentry.models import Rule
+from sentry.rules import EventState
+from sentry.rules.prefilter import RulePrefilter
+from sentry.testutils import TestCase
+
+
+class RulePrefilterTest(TestCase):
+    def setUp(self):
+        self.event = self.store_event(
+            data={"level": "error", "platform": "python", "tags": {"foo": "bar"}},
+            project_id=self.project.id,
+        )
+
+    def get_state(self, **kwargs):
+        return EventState(
+            is_new=kwargs.get("is_new", False),
+            is_regression=kwargs.get("is_regression", False),
+            is_new_group_environment=kwargs.get("is_new_group_environment", False),
+            has_reappeared=kwargs.get("has_reappeared", False),
+        )
+
+    def create_rule(self, conditions, **data):
+        return Rule.objects.create(
+            project=self.project, data={"conditions": conditions, "actions": [], **data}
+        )
+
+    def filter(self, rules, **state):
+        return RulePrefilter(rules).filter(rules, self.event, self.get_state(**state))
+
+    def test_state(self):
+        rule = self.create_rule(
+            [{"id": "sentry.rules.conditions.first_seen_event.FirstSeenEventCondition"}]
+        )
+        assert self.filter([rule]) == []
+        assert self.filter([rule], is_new=True) == [rule]
+
+        rule.environment_id = self.environment.id
+        assert self.filter([rule], is_new=True) == []
+        assert self.filter([rule], is_new_group_environment=True) == [rule]
+
+    def test_level(self):
+        gte_warning = self.create_rule(
+            [{"id": "sentry.rules.conditions.level.LevelCondition", "match": "gte", "level": "30"}]
+        )
+        eq_fatal = self.create_rule(
+            [{"id": "sentry.rules.filters.level.LevelFilter", "match": "eq", "level": "50"}]
+        )
+        assert self.filter([gte_warning, eq_fatal]) == [gte_warning]
+
+    def test_tags_and_attributes(self):
+        has_foo = self.create_rule(
+            [
+                {
+                    "id": "sentry.rules.conditions.tagged_event.TaggedEventCondition",
+                    "key": "Foo",
+                    "match": "is",
+                }
+            ]
+        )
+        no_foo = self.create_rule(
+            [
+                {
+                    "id": "sentry.rules.filters.tagged_event.TaggedEventFilter",
+                    "key": "foo",
+                    "match": "ns",
+                }
+            ]
+        )
+        not_python = self.create_rule(
+            [
+                {
+                    "id": "sentry.rules.conditions.event_attribute.EventAttributeCondition",
+                    "attribute": "platform",
+                    "match": "ne",
+                    "value": "Python",
+                }
+            ]
+        )
+        assert self.filter([has_foo, no_foo, not_python]) == [has_foo]
+
+    def test_match_types(self):
+        conditions = [
+            {"id": "sentry.rules.conditions.regression_event.RegressionEventCondition"},
+            {"id": "sentry.rules.conditions.reappeared_event.ReappearedEventCondition"},
+        ]
+        any_rule = self.create_rule(conditions, action_match="any")
+        all_rule = self.create_rule(conditions, action_match="all")
+        none_rule = self.create_rule(conditions, action_match="none")
+        assert self.filter([any_rule, all_rule, none_rule], is_regression=True) == [any_rule]
+
+        # "any" can not be decided when one of the conditions is unknown
+        any_rule.data["conditions"].append(
+            {"id": "sentry.rules.conditions.every_event.EveryEventCondition"}
+        )
+        assert self.filter([any_rule]) == [any_rule]
+
+    def test_stale_rule(self):
+        rule = self.create_rule(
+            [{"id": "sentry.rules.conditions.regression_event.RegressionEventCondition"}]
+        )
+        prefilter = RulePrefilter([rule])
+        assert prefilter.filter([rule], self.event, self.get_state()) == []
+
+        rule.data["conditions"] = [
+            {"id": "sentry.rules.conditions.reappeared_event.ReappearedEventCondition"}
+        ]
+        assert prefilter.filter([rule], self.event, self.get_state()) == [rule]
@@ -7,6 +7,7 @@ from django.db import DEFAULT_DB_ALIAS, connections
 from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
+from sentry import tsdb
 from sentry.models import GroupRuleStatus, GroupStatus, Rule, RuleFireHistory
 from sentry.notifications.types import ActionTargetType
 from sentry.rules import init_registry
@@ -204,6 +205,81 @@ class RuleProcessorTest(TestCase):
         # mock condition first.
         assert passes.call_count == 0
 
+    @patch(
+        "sentry.constants._SENTRY_RULES",
+        [
+            "sentry.mail.actions.NotifyEmailAction",
+            "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+        ],
+    )
+    def test_event_frequency_batching(self):
+        cache.clear()
+        self.rule.delete()
+        for interval in ("1m", "5m", "1h", "1d"):
+            Rule.objects.create(
+                project=self.event.project,
+                data={
+                    "conditions": [
+                        {
+                            "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+                            "interval": interval,
+                            "value": 100,
+                        }
+                    ],
+                    "actions": [EMAIL_ACTION_DATA],
+                },
+            )
+
+        with self.options({"rules.event-frequency-batching": True}), patch(
+            "sentry.rules.processor.rules", init_registry()
+        ), patch.object(tsdb, "get_range", wraps=tsdb.get_range) as get_range:
+            rp = RuleProcessor(
+                self.event,
+                is_new=True,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+            )
+            assert not rp.apply()
+
+        # One read for the 10 second rollup (1m, 5m, 1h), one for the hourly rollup (1d)
+        assert get_range.call_count == 2
+
+    def test_prefilter(self):
+        cache.clear()
+        regression_rule = Rule.objects.create(
+            project=self.event.project,
+            data={
+                "conditions": [
+                    {"id": "sentry.rules.conditions.regression_event.RegressionEventCondition"}
+                ],
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+
+        with self.options({"rules.prefilter-enabled": True}), patch.object(
+            RuleProcessor, "apply_rule", autospec=True
+        ) as apply_rule:
+            rp = RuleProcessor(
+                self.event,
+                is_new=True,
+                is_regression=False,
+                is_new_group_environment=True,
+                has_reappeared=False,
+            )
+            rp.apply()
+            assert [call[0][1] for call in apply_rule.call_args_list] == [self.rule]
+
+            # Saving the rule invalidates the compiled prefilter
+            regression_rule.data["conditions"] = [EVERY_EVENT_COND_DATA]
+            regression_rule.save()
+            apply_rule.reset_mock()
+            rp.apply()
+            assert {call[0][1] for call in apply_rule.call_args_list} == {
+                self.rule,
+                regression_rule,
+            }
+
 
 class MockFilterTrue(EventFilter):
     id = "tests.sentry.rules.test_processor.MockFilterTrue"
@@ -1,7 +1,7 @@
 import pytest
 
 from sentry.sentry_metrics.configuration import UseCaseKey
-from sentry.sentry_metrics.indexer.cache import indexer_cache
+from sentry.sentry_metrics.indexer.cache import LocalStringIndexerCache, indexer_cache
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import md5_text
 
@@ -62,3 +62,25 @@ def test_separate_namespacing() -> None:
     indexer_cache.set("a", 2, UseCaseKey.PERFORMANCE.value)
     assert indexer_cache.get("a", UseCaseKey.RELEASE_HEALTH.value) == 1
     assert indexer_cache.get("a", UseCaseKey.PERFORMANCE.value) == 2
+
+
+def test_local_cache(use_case_id: str) -> None:
+    local_cache = LocalStringIndexerCache(maxsize=2, ttl=60)
+    local_cache.set_many({"1:a": 10, "1:b:c": 11}, use_case_id)
+    assert local_cache.get_many(["1:a", "1:b:c", "2:a"], use_case_id) == {
+        "1:a": 10,
+        "1:b:c": 11,
+        "2:a": None,
+    }
+    assert local_cache.get("1:a", UseCaseKey.PERFORMANCE.value) is None
+    assert local_cache.get_string(11, use_case_id) == "b:c"
+
+    # The least recently used entry is evicted
+    local_cache.set("1:d", 12, use_case_id)
+    assert local_cache.get("1:a", use_case_id) is None
+    assert local_cache.get("1:d", use_case_id) == 12
+
+    disabled = LocalStringIndexerCache(maxsize=0, ttl=60)
+    disabled.set("1:a", 10, use_case_id)
+    assert disabled.get("1:a", use_case_id) is None
+    assert disabled.get_string(10, use_case_id) is None
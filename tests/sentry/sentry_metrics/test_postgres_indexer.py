@@ -1,8 +1,9 @@
 from typing import Mapping, Set, Tuple
+from unittest.mock import patch
 
 from sentry.sentry_metrics.configuration import UseCaseKey
-from sentry.sentry_metrics.indexer.base import KeyCollection, KeyResult, KeyResults
-from sentry.sentry_metrics.indexer.cache import indexer_cache
+from sentry.sentry_metrics.indexer.base import CacheTier, KeyCollection, KeyResult, KeyResults
+from sentry.sentry_metrics.indexer.cache import LocalStringIndexerCache, indexer_cache
 from sentry.sentry_metrics.indexer.models import MetricsKeyIndexer, StringIndexer
 from sentry.sentry_metrics.indexer.postgres import PGStringIndexer
 from sentry.sentry_metrics.indexer.postgres_v2 import (
@@ -260,6 +261,43 @@ class PostgresIndexerV2Test(TestCase):
         assert indexer_cache.get(string.id, self.cache_namespace) is None
         assert indexer_cache.get(key, self.cache_namespace) is None
 
+    def test_local_cache(self) -> None:
+        local_cache = LocalStringIndexerCache(maxsize=100, ttl=60)
+        org_strings = {self.organization.id: self.strings}
+
+        with patch("sentry.sentry_metrics.indexer.postgres_v2.local_indexer_cache", local_cache):
+            results = self.indexer.bulk_record(
+                use_case_id=self.use_case_id, org_strings=org_strings
+            )
+            assert results.get_cache_lookups() == {
+                CacheTier.LOCAL: (3, 0),
+                CacheTier.SHARED: (3, 0),
+            }
+
+            # The shared cache is skipped for strings found in the local one
+            cache.clear()
+            local_results = self.indexer.bulk_record(
+                use_case_id=self.use_case_id, org_strings=org_strings
+            )
+            assert local_results.results == results.results
+            assert local_results.get_cache_lookups() == {
+                CacheTier.LOCAL: (3, 3),
+                CacheTier.SHARED: (0, 0),
+            }
+            assert_fetch_type_for_tag_string_set(
+                local_results.get_fetch_metadata(), FetchType.CACHE_HIT, self.strings
+            )
+
+            id = results[self.organization.id]["hello"]
+            assert local_cache.get_string(id, self.cache_namespace) == "hello"
+            assert self.indexer.reverse_resolve(use_case_id=self.use_case_id, id=id) == "hello"
+            assert (
+                self.indexer.resolve(
+                    use_case_id=self.use_case_id, org_id=self.organization.id, string="hello"
+                )
+                == id
+            )
+
 
 class KeyCollectionTest(TestCase):
     def test_no_data(self) -> None:
@@ -377,3 +415,15 @@ class KeyResultsTest(TestCase):
         )
         assert_fetch_type_for_tag_string_set(meta, FetchType.FIRST_SEEN, set(write_mappings.keys()))
         assert_fetch_type_for_tag_string_set(meta, FetchType.CACHE_HIT, set(cache_mappings.keys()))
+
+    def test_merges_cache_lookups(self):
+        kr_local = KeyResults()
+        kr_local.add_cache_lookups(CacheTier.LOCAL, 3, 2)
+        kr_shared = KeyResults()
+        kr_shared.add_cache_lookups(CacheTier.SHARED, 1, 1)
+        kr_shared.add_cache_lookups(CacheTier.LOCAL, 1, 0)
+
+        assert kr_local.merge(kr_shared).get_cache_lookups() == {
+            CacheTier.LOCAL: (4, 2),
+            CacheTier.SHARED: (1, 1),
+        }
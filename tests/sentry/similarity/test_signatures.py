@@ -28,3 +28,10 @@ class MinHashSignatureBuilderTestCase(TestCase):
         self.assertAlmostEqual(
             similarity, estimation, delta=0.1  # totally made up constant, seems reasonable
         )
+
+    def test_build_many(self):
+        get_signature = MinHashSignatureBuilder(32, 0xFFFF)
+        feature_sets = [{"foo", "bar"}, {"bar", "baz"}, {"foo"}]
+        assert get_signature.build_many(feature_sets) == [
+            get_signature(features) for features in feature_sets
+        ]
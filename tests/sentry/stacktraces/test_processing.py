@@ -0,0 +1,60 @@
+from sentry.stacktraces.processing import (
+    StacktraceProcessor,
+    _frame_result_local_cache,
+    process_stacktraces,
+)
+from sentry.testutils.helpers.options import override_options
+from sentry.utils.safe import get_path
+
+
+class UppercaseProcessor(StacktraceProcessor):
+    calls = 0
+
+    def handles_frame(self, frame, stacktrace_info):
+        return "function" in frame
+
+    def get_frame_result_cache_values(self, processable_frame):
+        return self.data.get("release")
+
+    def process_frame(self, processable_frame, processing_task):
+        UppercaseProcessor.calls += 1
+        raw_frame = dict(processable_frame.frame)
+        new_frame = dict(raw_frame, function=raw_frame["function"].upper())
+        return [new_frame], [raw_frame], []
+
+
+def make_processors(data, infos):
+    return [UppercaseProcessor(data, infos, project=object())]
+
+
+def make_data(release, functions):
+    return {
+        "release": release,
+        "stacktrace": {"frames": [{"function": function} for function in functions]},
+    }
+
+
+def get_functions(data):
+    return [frame["function"] for frame in get_path(data, "stacktrace", "frames")]
+
+
+def test_frame_result_cache():
+    _frame_result_local_cache.clear()
+    UppercaseProcessor.calls = 0
+
+    with override_options({"processing.frame-result-cache-enabled": True}):
+        data = process_stacktraces(make_data("1.0", ["foo", "bar"]), make_processors)
+        assert get_functions(data) == ["FOO", "BAR"]
+        assert UppercaseProcessor.calls == 2
+
+        # Modifying the processed frames must not leak into the cache
+        get_path(data, "stacktrace", "frames", 0)["function"] = "modified"
+
+        data = process_stacktraces(make_data("1.0", ["foo", "baz"]), make_processors)
+        assert get_functions(data) == ["FOO", "BAZ"]
+        assert UppercaseProcessor.calls == 3
+
+        # The processor's values are part of the key
+        data = process_stacktraces(make_data("2.0", ["foo"]), make_processors)
+        assert get_functions(data) == ["FOO"]
+        assert UppercaseProcessor.calls == 4
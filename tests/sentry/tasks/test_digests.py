@@ -6,7 +6,7 @@ import sentry
 from sentry.digests.backends.redis import RedisBackend
 from sentry.digests.notifications import event_to_record
 from sentry.models.rule import Rule
-from sentry.tasks.digests import deliver_digest
+from sentry.tasks.digests import deliver_digest, deliver_digests
 from sentry.testutils import TestCase
 from sentry.testutils.helpers.datetime import before_now, iso_format
 
@@ -45,3 +45,31 @@ class DeliverDigestTest(TestCase):
     def test_no_records(self):
         # This shouldn't error if no records are present
         deliver_digest(f"mail:p:{self.project.id}:IssueOwners:")
+
+
+class DeliverDigestsTest(TestCase):
+    @patch.object(sentry, "digests")
+    def test_deliver_digests(self, digests):
+        backend = RedisBackend(codec={"path": "sentry.digests.codecs.NotificationReferenceCodec"})
+        digests.digest_many = backend.digest_many
+
+        rule = Rule.objects.create(project=self.project, label="Test Rule", data={})
+        keys = [
+            f"mail:p:{self.project.id}:IssueOwners:",
+            f"mail:p:{self.project.id}:Member:{self.user.id}",
+        ]
+        for key in keys:
+            for fingerprint in ("group-1", "group-2"):
+                event = self.store_event(
+                    data={
+                        "timestamp": iso_format(before_now(days=1)),
+                        "fingerprint": [fingerprint],
+                    },
+                    project_id=self.project.id,
+                )
+                backend.add(key, event_to_record(event, [rule]), increment_delay=0, maximum_delay=0)
+
+        with self.tasks():
+            deliver_digests(keys)
+        assert len(mail.outbox) == 2
+        assert all("2 new alerts since" in message.subject for message in mail.outbox)
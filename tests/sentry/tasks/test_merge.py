@@ -1,7 +1,14 @@
 from unittest.mock import patch
 
 from sentry import eventstore, eventstream
-from sentry.models import Group, GroupEnvironment, GroupMeta, GroupRedirect, UserReport
+from sentry.models import (
+    Group,
+    GroupEnvironment,
+    GroupHash,
+    GroupMeta,
+    GroupRedirect,
+    UserReport,
+)
 from sentry.similarity import _make_index_backend
 from sentry.tasks.merge import merge_groups
 from sentry.testutils import TestCase
@@ -104,6 +111,18 @@ class MergeGroupTest(TestCase):
         assert not Group.objects.filter(id=groups[1].id).exists()
         assert GroupRedirect.objects.filter(group_id=groups[2].id).count() == 2
 
+    @patch("sentry.tasks.merge.grouphash_cache")
+    def test_merge_invalidates_moved_grouphashes(self, mock_grouphash_cache):
+        group1 = self.create_group(self.project)
+        group2 = self.create_group(self.project)
+        GroupHash.objects.create(project=self.project, group=group1, hash="a" * 32)
+        GroupHash.objects.create(project=self.project, group=group2, hash="b" * 32)
+
+        with self.tasks():
+            merge_groups([group1.id], group2.id)
+
+        mock_grouphash_cache.invalidate_hashes.assert_called_once_with(self.project.id, ["a" * 32])
+
     def test_merge_updates_tag_values_seen(self):
         project = self.create_project()
         event1 = self.store_event(
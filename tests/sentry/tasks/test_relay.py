@@ -9,6 +9,8 @@ from sentry.relay.projectconfig_cache.redis import RedisProjectConfigCache
 from sentry.relay.projectconfig_debounce_cache.redis import RedisProjectConfigDebounceCache
 from sentry.tasks.relay import (
     build_project_config,
+    compute_organization_configs,
+    compute_projectkey_config,
     invalidate_project_config,
     schedule_build_project_config,
     schedule_invalidate_project_config,
@@ -79,6 +81,7 @@ def redis_cache(monkeypatch):
     monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many", cache.set_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.delete_many", cache.delete_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.get", cache.get)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.get_many", cache.get_many)
 
     return cache
 
@@ -415,6 +418,32 @@ class TestInvalidationTask:
             assert new_cfg is not None
             assert new_cfg != cfg
 
+    @pytest.mark.django_db
+    def test_compute_organization_configs(
+        self,
+        factories,
+        default_project,
+        default_organization,
+        default_projectkey,
+        redis_cache,
+    ):
+        other_project = factories.create_project(organization=default_organization)
+        other_key = factories.create_project_key(project=other_project)
+        redis_cache.set_many({default_projectkey.public_key: "dummy"})
+
+        configs = compute_organization_configs(default_organization)
+
+        # Only configs which are currently cached are computed
+        assert default_projectkey.public_key in configs
+        assert other_key.public_key not in configs
+
+        def _strip(cfg):
+            return {k: v for k, v in cfg.items() if k not in ("lastFetch", "lastChange", "rev")}
+
+        assert _strip(configs[default_projectkey.public_key]) == _strip(
+            compute_projectkey_config(default_projectkey)
+        )
+
 
 @pytest.mark.django_db
 def test_invalidate_hierarchy(
@@ -7,7 +7,7 @@ from django.test import override_settings
 
 from sentry.testutils import TestCase
 from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, TSDBModel
-from sentry.tsdb.redis import CountMinScript, RedisTSDB, SuppressionWrapper
+from sentry.tsdb.redis import CountMinScript, RedisTSDB, SuppressionWrapper, decode_counters
 from sentry.utils.dates import to_datetime, to_timestamp
 
 
@@ -188,6 +188,29 @@ class RedisTSDBTest(TestCase):
         results = self.db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=1)
         assert results == {1: 0, 2: 0}
 
+    def test_simple_columnar(self):
+        self.db.columnar_models = frozenset([TSDBModel.project])
+        self.test_simple()
+
+        with self.db.cluster.all() as client:
+            keys = client.keys("ts:1:*")
+        keys = [key for host_keys in keys.value.values() for key in host_keys]
+        assert keys and all(key.startswith(b"ts:1:c") for key in keys)
+
+    def test_columnar_dual_write(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        self.db.columnar_dual_write_models = frozenset([TSDBModel.project])
+        self.db.incr(TSDBModel.project, 1, now, count=3)
+
+        hash_results = self.db.get_range(TSDBModel.project, [1], now, now)
+        self.db.columnar_models = frozenset([TSDBModel.project])
+        assert self.db.get_range(TSDBModel.project, [1], now, now) == hash_results
+        assert hash_results[1][-1][1] == 3
+
+    def test_decode_counters(self):
+        assert decode_counters(None) == ()
+        assert decode_counters(b"\x00\x00\x00\x01\x00\x00\x01\x00") == (1, 256)
+
     def test_count_distinct(self):
         now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
         dts = [now + timedelta(hours=i) for i in range(4)]
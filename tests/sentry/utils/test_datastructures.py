@@ -1,6 +1,6 @@
 import pytest
 
-from sentry.utils.datastructures import BidirectionalMapping
+from sentry.utils.datastructures import BidirectionalMapping, LRUCache
 
 
 def test_bidirectional_mapping():
@@ -30,3 +30,62 @@ def test_bidirectional_mapping():
     del value["c"]
 
     assert len(value) == len(value.inverse()) == 2
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert len(cache) == 2
+
+    cache.delete("a")
+    assert cache.get("a") is None
+    assert cache.get("a", 42) == 42
+
+    cache.clear()
+    assert len(cache) == 0
+
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+
+def test_lru_cache_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("sentry.utils.datastructures.time.monotonic", lambda: now[0])
+
+    cache = LRUCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    now[0] += 5
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_cache_sizeof():
+    cache = LRUCache(maxsize=10, sizeof=len)
+
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    assert cache.size == 8
+
+    cache.set("c", b"cccc")
+    assert "a" not in cache
+    assert cache.size == 8
+
+    cache.set("b", b"bb")
+    assert cache.size == 6
+
+    # Values that are too large on their own are never cached.
+    cache.set("d", b"d" * 11)
+    assert "d" not in cache
+    assert cache.size == 6
+
+    cache.delete("c")
+    assert cache.size == 2
@@ -1,18 +1,27 @@
+import threading
+import time
 import unittest
 from datetime import datetime, timedelta
 from unittest import mock
 
 import pytest
 import pytz
+from django.core.cache import cache
+from django.test import override_settings
 from django.utils import timezone
 
 from sentry.models import GroupRelease, Project, Release
 from sentry.testutils import TestCase
+from sentry.utils import json
 from sentry.utils.snuba import (
     Dataset,
     SnubaQueryParams,
     UnqualifiedQueryError,
+    _apply_cache_and_build_results,
+    _cache_result,
+    _get_query_cache_lock,
     _prepare_query_params,
+    get_cache_key,
     get_json_type,
     get_query_params_to_update_for_projects,
     get_snuba_column_name,
@@ -374,3 +383,69 @@ class QuantizeTimeTest(unittest.TestCase):
                 break
 
         assert i != j
+
+
+@mock.patch("sentry.utils.snuba._bulk_snuba_query")
+class QueryCacheTest(TestCase):
+    query = ({"selected_columns": ["event_id"]}, None, None)
+
+    def setUp(self):
+        self.cache_key = get_cache_key(self.query[0])
+        cache.delete(self.cache_key)
+
+    def query_cached(self):
+        return list(_apply_cache_and_build_results([self.query], use_cache=True))
+
+    @override_settings(SENTRY_SNUBA_CACHE_STALE_SECONDS=60)
+    def test_stale_while_revalidate(self, _bulk_snuba_query):
+        _bulk_snuba_query.return_value = [{"data": [2]}]
+        cache.set(self.cache_key, json.dumps([time.time() - 1, {"data": [1]}]), 60)
+
+        # Stale results are served while another caller refreshes them
+        with _get_query_cache_lock(self.cache_key).acquire():
+            assert self.query_cached() == [{"data": [1]}]
+        assert _bulk_snuba_query.call_count == 0
+
+        assert self.query_cached() == [{"data": [2]}]
+        assert _bulk_snuba_query.call_count == 1
+
+        assert self.query_cached() == [{"data": [2]}]
+        assert _bulk_snuba_query.call_count == 1
+
+    def test_stale_disabled(self, _bulk_snuba_query):
+        _bulk_snuba_query.return_value = [{"data": [2]}]
+        cache.set(self.cache_key, json.dumps([time.time() - 1, {"data": [1]}]), 60)
+
+        # Without a stale window an expired result is a plain miss
+        with _get_query_cache_lock(self.cache_key).acquire():
+            assert self.query_cached() == [{"data": [2]}]
+        assert _bulk_snuba_query.call_count == 1
+
+    @override_settings(SENTRY_SNUBA_CACHE_COALESCE_TIMEOUT_SECONDS=5)
+    def test_coalesce(self, _bulk_snuba_query):
+        _bulk_snuba_query.return_value = [{"data": [2]}]
+
+        # Wait for the result of the caller holding the lock
+        lock = _get_query_cache_lock(self.cache_key)
+        releaser = lock.acquire()
+        releaser.__enter__()
+
+        def finish():
+            _cache_result(self.cache_key, {"data": [1]})
+            releaser.__exit__(None, None, None)
+
+        timer = threading.Timer(0.1, finish)
+        timer.start()
+        try:
+            assert self.query_cached() == [{"data": [1]}]
+        finally:
+            timer.join()
+        assert _bulk_snuba_query.call_count == 0
+
+        # Identical queries in one batch are only run once
+        cache.delete(self.cache_key)
+        assert list(_apply_cache_and_build_results([self.query, self.query], use_cache=True)) == [
+            {"data": [2]},
+            {"data": [2]},
+        ]
+        assert _bulk_snuba_query.call_count == 1
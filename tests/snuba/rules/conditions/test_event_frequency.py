@@ -188,6 +188,19 @@ class EventFrequencyConditionTestCase(
             )
 
 
+@freeze_time((now() - timedelta(days=2)).replace(hour=12, minute=40, second=0, microsecond=0))
+class EventFrequencyConditionBatchedTestCase(EventFrequencyConditionTestCase):
+    def setUp(self):
+        super().setUp()
+        # The tests expect fresh counts for every assertion, don't cache them.
+        for context in (
+            self.options({"rules.event-frequency-batching": True}),
+            patch("sentry.rules.conditions.event_frequency.EVENT_COUNT_CACHE_TTL", 0),
+        ):
+            context.__enter__()
+            self.addCleanup(context.__exit__, None, None, None)
+
+
 @freeze_time((now() - timedelta(days=2)).replace(hour=12, minute=40, second=0, microsecond=0))
 class EventUniqueUserFrequencyConditionTestCase(
     FrequencyConditionMixin,